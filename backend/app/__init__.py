@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The backend imports the shared modules in scripts/ as scripts.X; those modules import their
+# siblings by plain name, as when the ingestion scripts run from scripts/, so it goes on the path too.
+_SCRIPTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "scripts"))
+if _SCRIPTS_DIR not in sys.path:
+    sys.path.append(_SCRIPTS_DIR)
@@ -3,5 +3,14 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-ELASTICSEARCH_HOST = os.getenv("ELASTICSEARCH_HOST")
-DISASTER_INDEX = os.getenv("DISASTER_INDEX")
+ELASTICSEARCH_HOST = os.getenv("ELASTICSEARCH_HOST", os.getenv("ES_HOST", "http://localhost:9200"))
+DISASTER_INDEX = os.getenv("DISASTER_INDEX", "disasters")
+ALERT_INDEX = os.getenv("ALERT_INDEX", "alerts")
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", 500))  # largest `limit` a search page accepts
+
+# Shared AsyncElasticsearch client (see services/elastic.py)
+ES_CONNECTIONS_PER_NODE = int(os.getenv("ES_CONNECTIONS_PER_NODE", 64))  # pooled keep-alive connections
+ES_REQUEST_TIMEOUT = float(os.getenv("ES_REQUEST_TIMEOUT", 10))          # seconds per request
+ES_MAX_RETRIES = int(os.getenv("ES_MAX_RETRIES", 2))
+ES_STARTUP_TIMEOUT = float(os.getenv("ES_STARTUP_TIMEOUT", 30))          # wait for the cluster at startup
+ES_REQUIRE_READY = os.getenv("ES_REQUIRE_READY", "0") == "1"             # refuse to start if it never comes up
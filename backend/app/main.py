@@ -1,22 +1,80 @@
-from fastapi import FastAPI, Query
-from elasticsearch import Elasticsearch
+import re
+import time
+import logging
+from contextlib import asynccontextmanager
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from fastapi import FastAPI, HTTPException, Query
+from elasticsearch import NotFoundError
+from fastapi.responses import JSONResponse
 from .routes import disasters, alerts  # import alerts router
+from .services import elastic
+from .services.observability import install as install_observability, observed_search, ES_CALL_SECONDS
+from .services.cache import cached_json
+from .services.projection import resolve_fields, DISASTER_PROJECTIONS, DISASTER_FIELDS
+from .services.pagination import Page, search_page, decode_cursor, DISASTER_SORT
+from .config import DISASTER_INDEX, ES_REQUIRE_READY, ELASTICSEARCH_HOST, MAX_PAGE_SIZE
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # one pooled AsyncElasticsearch per worker, warmed before traffic arrives
+    await elastic.connect()
+    if await elastic.wait_until_ready():
+        await elastic.warm_up()
+    elif ES_REQUIRE_READY:
+        await elastic.close()
+        raise RuntimeError(f"Elasticsearch at {ELASTICSEARCH_HOST} not ready")
+    else:
+        logging.warning("Elasticsearch at %s not ready; starting anyway (see /readyz)", ELASTICSEARCH_HOST)
+    yield
+    await elastic.close()
 
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 app.include_router(disasters.router)
 app.include_router(alerts.router)  
-es = Elasticsearch("http://localhost:9200")
-INDEX_NAME = "disasters"
+install_observability(app)
+
+@app.get("/healthz", include_in_schema=False)
+async def healthz():
+    return {"ok": True}
+
+@app.get("/readyz", include_in_schema=False)
+async def readyz():
+    ready = await elastic.get_es().ping()
+    return JSONResponse({"ready": ready}, status_code=200 if ready else 503)
 
 @app.get("/disasters/search")
-def search_disasters(
+async def search_disasters(
     q: str = Query("", description="Search keyword"),
     disaster_type: str = Query("", description="Disaster type"),
     location: str = Query("", description="Location"),
-    limit: int = Query(50, description="Max results")
+    severity: str = Query("", description="Severity (low, medium, high)"),
+    start_date: str = Query("", description="Published on or after (YYYY-MM-DD)"),
+    end_date: str = Query("", description="Published on or before (YYYY-MM-DD)"),
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE, description="Results per page"),
+    fields: str = Query("list", description="'list' (table/map fields), 'full', or comma-separated field names"),
+    cursor: str = Query("", description="X-Next-Cursor of the previous page; the other parameters come from it")
 ):
-    must_clauses = []
+    params = {"q": q, "disaster_type": disaster_type, "location": location, "severity": severity,
+              "start_date": start_date, "end_date": end_date, "limit": limit, "fields": fields}
+    state = None
+    if cursor:
+        params, state = decode_cursor(cursor, params)
+    includes = resolve_fields(params["fields"], DISASTER_PROJECTIONS, DISASTER_FIELDS)
+    after = state["after"] if state else None  # part of the key: each page is cached like the first
+    return await cached_json("/disasters/search", DISASTER_INDEX, dict(params, fields=includes, after=after),
+                             lambda: query_disasters(params, includes, state))
+
+def _day_bound(value: str) -> str:
+    # a bare date means the whole day: rounded down for gte, up for lte
+    return f"{value}||/d" if len(value) == 10 else value
+
+def disaster_query(q: str = "", disaster_type: str = "", location: str = "", severity: str = "",
+                   start_date: str = "", end_date: str = "", **_) -> dict:
+    """The bool query for the search filters, shared by search and aggregations."""
+    must_clauses, filter_clauses = [], []
 
     if q:
         must_clauses.append({"multi_match": {"query": q, "fields": ["title", "description"]}})
@@ -24,11 +82,114 @@ def search_disasters(
         must_clauses.append({"match": {"disaster_type": disaster_type}})
     if location:
         must_clauses.append({"match": {"location": location}})
+    if severity:
+        filter_clauses.append({"term": {"severity": severity}})
+    if start_date or end_date:
+        bounds = {}
+        if start_date:
+            bounds["gte"] = _day_bound(start_date)
+        if end_date:
+            bounds["lte"] = _day_bound(end_date)
+        filter_clauses.append({"range": {"publishedAt": bounds}})
+
+    if not must_clauses and not filter_clauses:
+        return {"match_all": {}}
+    return {"bool": {"must": must_clauses, "filter": filter_clauses}}
+
+async def query_disasters(params: dict, includes=None, state=None) -> Page:
+    query = {"query": disaster_query(**params)}
+    if includes is not None:
+        query["_source"] = includes
+
+    page = await search_page("/disasters/search", DISASTER_INDEX, query, DISASTER_SORT, params["limit"],
+                             params, state)
+
+    # _id (the article URL) is what /disasters/{id} takes
+    alerts = [dict(hit["_source"], id=hit["_id"]) for hit in page.hits]
 
-    query = {"query": {"bool": {"must": must_clauses}}} if must_clauses else {"query": {"match_all": {}}}
+    return Page(alerts, page.next_cursor)
 
-    res = es.search(index=INDEX_NAME, body=query, size=limit)
+STATS_INTERVALS = ("minute", "hour", "day", "week", "month", "quarter", "year")
 
-    alerts = [hit["_source"] for hit in res["hits"]["hits"]]
+def _time_zone(value: str) -> str:
+    # ES takes IANA names and fixed offsets; reject anything else here rather than as a 500
+    if re.fullmatch(r"[+-]\d{2}:\d{2}", value):
+        return value
+    try:
+        ZoneInfo(value)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(status_code=400, detail=f"unknown time_zone {value!r}")
+    return value
+
+@app.get("/disasters/stats")
+async def disaster_stats(
+    q: str = Query("", description="Search keyword"),
+    disaster_type: str = Query("", description="Disaster type"),
+    location: str = Query("", description="Location"),
+    severity: str = Query("", description="Severity (low, medium, high)"),
+    start_date: str = Query("", description="Published on or after (YYYY-MM-DD)"),
+    end_date: str = Query("", description="Published on or before (YYYY-MM-DD)"),
+    interval: str = Query("day", description=f"Timeline bucket: {', '.join(STATS_INTERVALS)}"),
+    time_zone: str = Query("UTC", description="Time zone for bucket boundaries, e.g. Asia/Kolkata or +05:30")
+):
+    """Exact counts for everything matching the search filters: per interval and severity / disaster type."""
+    if interval not in STATS_INTERVALS:
+        raise HTTPException(status_code=400, detail=f"interval must be one of {list(STATS_INTERVALS)}")
+    params = {"q": q, "disaster_type": disaster_type, "location": location, "severity": severity,
+              "start_date": start_date, "end_date": end_date, "interval": interval,
+              "time_zone": _time_zone(time_zone)}
+    return await cached_json("/disasters/stats", DISASTER_INDEX, params, lambda: query_stats(params))
+
+async def query_stats(params: dict) -> dict:
+    breakdown = {
+        "severity": {"terms": {"field": "severity", "size": 10}},
+        "disaster_type": {"terms": {"field": "disaster_type", "size": 20}},
+    }
+    body = {
+        "size": 0,  # counts only, no documents
+        "track_total_hits": True,
+        "query": disaster_query(**params),
+        "aggs": dict(breakdown, timeline={
+            "date_histogram": {"field": "publishedAt", "calendar_interval": params["interval"],
+                               "time_zone": params["time_zone"]},
+            "aggs": breakdown,
+        }),
+    }
+    res = await observed_search("/disasters/stats", elastic.get_es().search, index=DISASTER_INDEX, body=body)
+    aggs = res.get("aggregations", {})
+
+    def counts(agg):
+        return {b["key"]: b["doc_count"] for b in agg.get("buckets", [])}
+
+    return {
+        "total": res["hits"]["total"]["value"],
+        "interval": params["interval"],
+        "time_zone": params["time_zone"],
+        "severity": counts(aggs.get("severity", {})),
+        "disaster_type": counts(aggs.get("disaster_type", {})),
+        "timeline": [
+            {"date": b.get("key_as_string", b["key"]), "count": b["doc_count"],
+             "severity": counts(b["severity"]), "disaster_type": counts(b["disaster_type"])}
+            for b in aggs.get("timeline", {}).get("buckets", [])
+        ],
+    }
+
+@app.get("/disasters/{doc_id:path}")
+async def get_disaster(
+    doc_id: str,
+    fields: str = Query("full", description="'full', 'list', or comma-separated field names")
+):
+    """One disaster document by id (its URL): the whole document unless `fields` narrows it."""
+    includes = resolve_fields(fields, DISASTER_PROJECTIONS, DISASTER_FIELDS)
+    return await cached_json("/disasters/{doc_id}", DISASTER_INDEX, {"id": doc_id, "fields": includes},
+                             lambda: fetch_disaster(doc_id, includes))
 
-    return alerts
\ No newline at end of file
+async def fetch_disaster(doc_id: str, includes=None):
+    start = time.perf_counter()
+    try:
+        res = await elastic.get_es().get(index=DISASTER_INDEX, id=doc_id, source_includes=includes)
+    except NotFoundError:
+        raise HTTPException(status_code=404, detail=f"No disaster with id {doc_id!r}")
+    finally:
+        ES_CALL_SECONDS.observe(time.perf_counter() - start, endpoint="/disasters/{doc_id}")
+    return dict(res["_source"], id=res["_id"])
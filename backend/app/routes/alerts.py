@@ -1,17 +1,31 @@
 from fastapi import APIRouter, Query
-from elasticsearch import Elasticsearch
+from ..config import ALERT_INDEX, MAX_PAGE_SIZE
+from ..services.cache import cached_json
+from ..services.pagination import Page, search_page, decode_cursor, ALERT_SORT
+from ..services.projection import resolve_fields, ALERT_PROJECTIONS, ALERT_FIELDS
 
 router = APIRouter()
-es = Elasticsearch("http://localhost:9200")
-ALERTS_INDEX = "alerts"
 
 @router.get("/alerts/search")
-def search_alerts(
+async def search_alerts(
     q: str = Query(None, description="Keyword search"),
     location: str = Query(None, description="Location filter"),
     severity: str = Query("All", description="Severity filter"),
-    limit: int = Query(50, description="Max results")
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE, description="Results per page"),
+    fields: str = Query("list", description="'list', 'full', or comma-separated field names"),
+    cursor: str = Query("", description="X-Next-Cursor of the previous page; the other parameters come from it")
 ):
+    params = {"q": q, "location": location, "severity": severity, "limit": limit, "fields": fields}
+    state = None
+    if cursor:
+        params, state = decode_cursor(cursor, params)
+    includes = resolve_fields(params["fields"], ALERT_PROJECTIONS, ALERT_FIELDS)
+    after = state["after"] if state else None  # part of the key: each page is cached like the first
+    return await cached_json("/alerts/search", ALERT_INDEX, dict(params, fields=includes, after=after),
+                             lambda: query_alerts(params, includes, state))
+
+async def query_alerts(params: dict, includes=None, state=None) -> Page:
+    q, location, severity = params["q"], params["location"], params["severity"]
     must_clauses = []
 
     # Keyword full-text search (in title + description fields for example)
@@ -41,7 +55,9 @@ def search_alerts(
 
     # Final query
     query = {"query": {"bool": {"must": must_clauses}}} if must_clauses else {"query": {"match_all": {}}}
+    if includes is not None:
+        query["_source"] = includes
 
-    res = es.search(index=ALERTS_INDEX, body=query, size=limit)
-    alerts = [hit["_source"] for hit in res["hits"]["hits"]]
-    return alerts
+    page = await search_page("/alerts/search", ALERT_INDEX, query, ALERT_SORT, params["limit"], params, state)
+    alerts = [hit["_source"] for hit in page.hits]
+    return Page(alerts, page.next_cursor)
@@ -0,0 +1,105 @@
+# backend/app/services/cache.py
+import json
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict
+
+from fastapi.responses import Response
+
+from .observability import metrics
+from .pagination import Page
+from scripts.query_cache import get_query_cache, cache_key, invalidate as _invalidate, QUERY_CACHE_ENABLED  # shared with ingestion
+
+CACHE_REQUESTS = metrics.counter("api_cache_requests_total",
+                                 "Query cache outcomes per endpoint: hit, shared (joined an in-flight query), miss.",
+                                 ("endpoint", "result"))
+
+# key -> future of the serialized entry, for queries currently running in this process
+_inflight: Dict[str, asyncio.Future] = {}
+
+# SQLite calls block (up to QUERY_CACHE_BUSY_TIMEOUT on a locked file), so they run here,
+# never on the event loop; the cache serializes on one connection, so few threads suffice
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="query-cache")
+
+
+async def _io(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(_executor, fn, *args)
+
+
+async def invalidate(scope: str):
+    """Bump `scope`'s generation after an API write; never raises (see scripts.query_cache.invalidate)."""
+    await _io(_invalidate, scope)
+
+
+def _encode(data: Any) -> bytes:
+    return json.dumps(data, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def _serialize(result: Any) -> bytes:
+    """Cache entry for a compute() result: one line of JSON response headers, then the JSON body."""
+    headers = {}
+    if isinstance(result, Page):
+        if result.next_cursor:
+            headers["X-Next-Cursor"] = result.next_cursor
+        result = result.hits
+    return _encode(headers) + b"\n" + _encode(result)
+
+
+def _response(entry: bytes, result: str) -> Response:
+    head, _, body = entry.partition(b"\n")
+    headers = json.loads(head)
+    headers["X-Cache"] = result
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def cached_json(endpoint: str, scope: str, params: Dict, compute: Callable[[], Awaitable[Any]]) -> Response:
+    """
+    JSON response for `endpoint` with `params`, from the shared query cache
+    when a fresh entry of the scope's current generation exists. Otherwise
+    `compute()` runs once per process for all concurrent identical requests
+    (the rest await its result) and the serialized result is cached. A
+    `Page` result is sent as its hits with an X-Next-Cursor header. Cache
+    reads and writes run on a small thread pool, and a cache that cannot be
+    read or written behaves like a miss.
+    """
+    if not QUERY_CACHE_ENABLED:
+        return _response(_serialize(await compute()), "off")
+
+    key = cache_key(endpoint, params)
+    pending = _inflight.get(key)
+    if pending is not None:
+        CACHE_REQUESTS.inc(endpoint=endpoint, result="shared")
+        return _response(await asyncio.shield(pending), "shared")
+
+    cache = get_query_cache()
+    body = await _io(cache.get, key)
+    if body is not None:
+        CACHE_REQUESTS.inc(endpoint=endpoint, result="hit")
+        return _response(body, "hit")
+
+    pending = _inflight.get(key)  # another request may have started the query while we read
+    if pending is not None:
+        CACHE_REQUESTS.inc(endpoint=endpoint, result="shared")
+        return _response(await asyncio.shield(pending), "shared")
+
+    CACHE_REQUESTS.inc(endpoint=endpoint, result="miss")
+    future = asyncio.get_running_loop().create_future()
+    future.add_done_callback(lambda f: f.cancelled() or f.exception())  # no "never retrieved" noise
+    _inflight[key] = future
+    try:
+        try:
+            generation = await _io(cache.generation, scope)  # before the query, so a concurrent bump wins
+            body = _serialize(await compute())
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        future.set_result(body)
+        if generation is not None:  # None: the cache could not be read, so don't store either
+            await _io(cache.put, key, scope, body, generation)
+    finally:
+        _inflight.pop(key, None)  # after the put, so late arrivals share rather than miss
+    return _response(body, "miss")
+
@@ -1,36 +1,102 @@
-from elasticsearch import Elasticsearch
+from elasticsearch import AsyncElasticsearch
 from datetime import datetime
+from typing import Optional
+import asyncio
+import logging
+import time
 import uuid
-import os
 
-# Elasticsearch setup
-ES_HOST = os.getenv("ES_HOST", "http://localhost:9200")
-es = Elasticsearch(hosts=[ES_HOST])
+from .observability import observed_search
+from ..config import (ELASTICSEARCH_HOST, DISASTER_INDEX, ALERT_INDEX, ES_CONNECTIONS_PER_NODE,
+                      ES_REQUEST_TIMEOUT, ES_MAX_RETRIES, ES_STARTUP_TIMEOUT)
 
-ALERT_INDEX = "alerts"
+# Elasticsearch setup: one AsyncElasticsearch (and one aiohttp connection pool)
+# per worker process, opened and closed by the app lifespan.
+_client: Optional[AsyncElasticsearch] = None
+_alert_index_checked = False
 
-# Ensure index exists with proper mapping
-def init_index():
-    if not es.indices.exists(index=ALERT_INDEX):
-        es.indices.create(
+
+def get_es() -> AsyncElasticsearch:
+    if _client is None:
+        raise RuntimeError("Elasticsearch client not started; call connect() from the app lifespan")
+    return _client
+
+
+async def connect() -> AsyncElasticsearch:
+    global _client
+    if _client is None:
+        _client = AsyncElasticsearch(
+            hosts=[ELASTICSEARCH_HOST],
+            connections_per_node=ES_CONNECTIONS_PER_NODE,
+            request_timeout=ES_REQUEST_TIMEOUT,
+            max_retries=ES_MAX_RETRIES,
+            retry_on_timeout=True,
+        )
+    return _client
+
+
+async def close():
+    global _client
+    if _client is not None:
+        await _client.close()
+    _client = None
+
+
+async def wait_until_ready(timeout: float = ES_STARTUP_TIMEOUT) -> bool:
+    """Poll cluster health until it is at least yellow or `timeout` seconds pass."""
+    es = get_es()
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            health = await es.cluster.health(wait_for_status="yellow", timeout="2s")
+            if health["status"] in ("yellow", "green"):
+                return True
+        except Exception as e:
+            logging.info("Waiting for Elasticsearch at %s: %s", ELASTICSEARCH_HOST, e)
+        if time.monotonic() >= deadline:
+            return False
+        await asyncio.sleep(1)
+
+
+async def warm_up(connections: int = 8):
+    """
+    Open a few pooled connections and run one cheap query per index, so the
+    first dashboard polls don't pay for TCP setup or cold index caches.
+    """
+    es = get_es()
+    await asyncio.gather(*(es.ping() for _ in range(connections)))
+    for index in (DISASTER_INDEX, ALERT_INDEX):
+        try:
+            await es.search(index=index, size=0, track_total_hits=False)
+        except Exception as e:
+            logging.warning("Warm-up query on '%s' failed: %s", index, e)
+
+
+# Ensure index exists with proper mapping (checked once per process)
+async def init_index():
+    global _alert_index_checked
+    if _alert_index_checked:
+        return
+    es = get_es()
+    if not await es.indices.exists(index=ALERT_INDEX):
+        await es.indices.create(
             index=ALERT_INDEX,
-            body={
-                "mappings": {
-                    "properties": {
-                        "id": {"type": "keyword"},
-                        "type": {"type": "keyword"},
-                        "severity": {"type": "keyword"},
-                        "description": {"type": "text"},
-                        "location": {"type": "geo_point"},
-                        "created_at": {"type": "date"}
-                    }
+            mappings={
+                "properties": {
+                    "id": {"type": "keyword"},
+                    "type": {"type": "keyword"},
+                    "severity": {"type": "keyword"},
+                    "description": {"type": "text"},
+                    "location": {"type": "geo_point"},
+                    "created_at": {"type": "date"}
                 }
             }
         )
+    _alert_index_checked = True
 
 # Create an alert
-def create_alert(alert_data: dict):
-    init_index()  # make sure index exists
+async def create_alert(alert_data: dict):
+    await init_index()  # make sure index exists
 
     alert = {
         "id": str(uuid.uuid4()),
@@ -40,37 +106,47 @@ def create_alert(alert_data: dict):
         "location": alert_data.get("location"),  # {"lat": xx, "lon": yy}
         "created_at": datetime.utcnow()
     }
-    es.index(index=ALERT_INDEX, id=alert["id"], document=alert)
+    await get_es().index(index=ALERT_INDEX, id=alert["id"], document=alert)
+    from .cache import invalidate  # not at module level: cache -> pagination -> elastic
+    await invalidate(ALERT_INDEX)
     return alert
 
 # Get all alerts (with pagination)
-def get_alerts(limit=100, offset=0):
-    init_index()
-    resp = es.search(
+async def get_alerts(limit=100, offset=0):
+    await init_index()
+    resp = await get_es().search(
         index=ALERT_INDEX,
-        body={"query": {"match_all": {}}},
+        query={"match_all": {}},
         size=limit,
         from_=offset
     )
     return [hit["_source"] for hit in resp["hits"]["hits"]]
 
 # Search alerts by text (optional feature)
-def search_alerts(query: str):
-    init_index()
-    resp = es.search(
+async def search_alerts(query: str):
+    await init_index()
+    resp = await get_es().search(
         index=ALERT_INDEX,
-        body={
-            "query": {
-                "multi_match": {
-                    "query": query,
-                    "fields": ["type", "description", "severity"]
-                }
+        query={
+            "multi_match": {
+                "query": query,
+                "fields": ["type", "description", "severity"]
             }
         }
     )
     return [hit["_source"] for hit in resp["hits"]["hits"]]
 
-# Dummy disaster search (to fix missing import issue)
-def search_disasters(query: str):
-    # You can later hook this to a "disasters" index
-    return search_alerts(query)
+# Disaster search by keyword and/or distance from a point
+async def search_disasters(query: str = None, lat: float = None, lon: float = None,
+                           radius: str = "50km", limit: int = 50):
+    must = [{"multi_match": {"query": query, "fields": ["title", "description"]}}] if query else []
+    filters = []
+    if lat is not None and lon is not None:
+        filters.append({"geo_distance": {"distance": radius, "geo": {"lat": lat, "lon": lon}}})
+    resp = await observed_search(
+        "/", get_es().search,
+        index=DISASTER_INDEX,
+        query={"bool": {"must": must or [{"match_all": {}}], "filter": filters}},
+        size=limit
+    )
+    return [hit["_source"] for hit in resp["hits"]["hits"]]
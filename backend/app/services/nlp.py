@@ -1,19 +1,14 @@
 # backend/app/services/nlp.py
-from geopy.geocoders import Nominatim
-
-geolocator = Nominatim(user_agent="disaster_monitor")
+from scripts.geocache import get_geocoder  # shared on-disk cache with the ingestion scripts
 
 def geocode_location(location: str):
     """Convert location name to geo coordinates"""
     if not location:
         return None
     try:
-        loc = geolocator.geocode(location)
-        if loc:
-            return {"lat": loc.latitude, "lon": loc.longitude}
+        return get_geocoder().geocode(location)
     except Exception:
         return None
-    return None
 
 def detect_severity(text: str):
     """Naive severity detection using keyword rules"""
@@ -0,0 +1,87 @@
+# backend/app/services/observability.py
+import os
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
+
+from scripts.metrics import metrics, SamplingProfiler, LATENCY_BUCKETS, SIZE_BUCKETS, BYTES_BUCKETS  # shared with the pipeline
+
+API_PROFILING = os.getenv("API_PROFILING", "0") == "1"  # allow ?profile=1 / X-Profile: 1 per request
+
+REQUEST_SECONDS = metrics.histogram("api_request_seconds", "Total request latency as seen by the API.",
+                                    LATENCY_BUCKETS, ("endpoint", "method", "status"))
+RESPONSE_BYTES = metrics.histogram("api_response_bytes", "Response body size.", BYTES_BUCKETS, ("endpoint",))
+ES_TOOK_SECONDS = metrics.histogram("api_es_took_seconds", "Query time reported by Elasticsearch (took).",
+                                    LATENCY_BUCKETS, ("endpoint",))
+ES_CALL_SECONDS = metrics.histogram("api_es_call_seconds",
+                                    "Elasticsearch call time in the client, incl. network and JSON decoding.",
+                                    LATENCY_BUCKETS, ("endpoint",))
+RESULT_HITS = metrics.histogram("api_result_hits", "Hits returned per Elasticsearch query.",
+                                SIZE_BUCKETS, ("endpoint",))
+
+
+async def observed_search(endpoint: str, search, **kwargs):
+    """Await `search(**kwargs)` (an AsyncElasticsearch.search) and record ES took vs client time and the hit count."""
+    start = time.perf_counter()
+    res = await search(**kwargs)
+    ES_CALL_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint)
+    if "took" in res:
+        ES_TOOK_SECONDS.observe(res["took"] / 1000, endpoint=endpoint)
+    RESULT_HITS.observe(len(res["hits"]["hits"]), endpoint=endpoint)
+    return res
+
+
+def _endpoint(scope) -> str:
+    # route template, so /disasters/{id} stays one series
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class RequestMetricsMiddleware:
+    """
+    Plain ASGI middleware (no BaseHTTPMiddleware task per request) recording
+    latency, status and response size per endpoint; with API_PROFILING a
+    request carrying ?profile=1 or X-Profile: 1 is stack-sampled and the
+    profile path returned in X-Profile-Path.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        request = Request(scope)
+        profiler = None
+        if API_PROFILING and (request.query_params.get("profile") == "1" or request.headers.get("x-profile") == "1"):
+            profiler = SamplingProfiler().start()
+        start = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                endpoint = _endpoint(scope)
+                for name, value in message.get("headers", []):
+                    if name == b"content-length":
+                        RESPONSE_BYTES.observe(int(value), endpoint=endpoint)
+                if profiler is not None:
+                    path = profiler.stop().save("api" + endpoint.replace("/", "-").replace("{", "").replace("}", ""))
+                    message["headers"] = list(message.get("headers", [])) + [(b"x-profile-path", path.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint=_endpoint(scope),
+                                    method=scope["method"], status=status["code"])
+
+
+def install(app: FastAPI):
+    """Add request timing (and optional per-request profiling) middleware plus GET /metrics."""
+    app.add_middleware(RequestMetricsMiddleware)
+
+    @app.get("/metrics", include_in_schema=False)
+    async def prometheus_metrics():
+        return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
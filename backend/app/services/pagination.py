@@ -0,0 +1,67 @@
+# backend/app/services/pagination.py
+import json
+import base64
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from fastapi import HTTPException
+
+from .elastic import get_es
+from .observability import observed_search
+from ..config import MAX_PAGE_SIZE
+
+# Newest first, with a unique keyword as tiebreaker: search_after on these
+# keys resumes exactly after the last hit, so no hit is skipped or repeated.
+DISASTER_SORT = [{"publishedAt": {"order": "desc", "unmapped_type": "date"}}, {"url": "asc"}]
+ALERT_SORT = [{"created_at": {"order": "desc", "unmapped_type": "date"}}, {"id": "asc"}]
+
+
+class Page(NamedTuple):
+    hits: List[Dict]
+    next_cursor: Optional[str]  # None on the last page
+
+
+def encode_cursor(state: Dict) -> str:
+    raw = json.dumps(state, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, defaults: Dict) -> Tuple[Dict, Dict]:
+    """
+    (params, state) from a next_cursor. Params are the request's `defaults`
+    overridden by the ones the first page was requested with, coerced to the
+    defaults' types; a malformed cursor, or one whose limit is outside
+    1..MAX_PAGE_SIZE, is a 400.
+    """
+    try:
+        state = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        params = dict(defaults)
+        for k, v in state["params"].items():
+            if k in params:
+                params[k] = type(params[k])(v) if params[k] is not None and v is not None else v
+        if not isinstance(state["after"], list):
+            raise ValueError("after")
+        if "limit" in params and not 1 <= params["limit"] <= MAX_PAGE_SIZE:
+            raise ValueError("limit")
+    except (ValueError, TypeError, KeyError, AttributeError):
+        raise HTTPException(status_code=400, detail="invalid cursor")
+    return params, state
+
+
+async def search_page(endpoint: str, index: str, body: Dict, sort: List[Dict], limit: int,
+                      params: Dict, state: Optional[Dict] = None) -> Page:
+    """
+    One page of `limit` hits of `body` in `sort` order, resuming after
+    state["after"] when given. Every page is the same size=limit+1 search,
+    however deep, and holds no server-side state: re-requesting a page (the
+    dashboard refreshes every 10 s) just runs it again, or hits the cache.
+    """
+    body = dict(body, sort=sort, size=limit + 1)  # one extra hit tells whether there is a next page
+    if state is not None:
+        body["search_after"] = state["after"]
+    res = await observed_search(endpoint, get_es().search, index=index, body=body)
+
+    hits = res["hits"]["hits"]
+    if len(hits) <= limit:
+        return Page(hits, None)
+    hits = hits[:limit]
+    return Page(hits, encode_cursor({"params": params, "after": hits[-1]["sort"]}))
@@ -0,0 +1,49 @@
+# backend/app/services/projection.py
+import os
+import json
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException
+
+MAPPINGS_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "..", "elastic", "mappings")
+
+
+def mapped_fields(index: str) -> List[str]:
+    """Top-level fields of an index, from elastic/mappings/<index>.json."""
+    with open(os.path.join(MAPPINGS_DIR, f"{index}.json"), encoding="utf-8") as f:
+        return list(json.load(f)["mappings"]["properties"])
+
+
+DISASTER_FIELDS = mapped_fields("disasters")
+ALERT_FIELDS = mapped_fields("alerts")
+
+# Named projections; None means the whole _source. "list" is what the dashboard
+# table, map and timeline render -- it leaves out description and content,
+# which are most of each document's bytes.
+DISASTER_PROJECTIONS: Dict[str, Optional[List[str]]] = {
+    "list": ["title", "disaster_type", "severity", "location", "publishedAt", "source", "url", "geo"],
+    "full": None,
+}
+ALERT_PROJECTIONS: Dict[str, Optional[List[str]]] = {
+    "list": ["id", "type", "severity", "description", "location", "created_at"],
+    "full": None,
+}
+
+
+def resolve_fields(spec: str, projections: Dict[str, Optional[List[str]]], allowed: List[str]) -> Optional[List[str]]:
+    """
+    `spec` is a projection name or a comma-separated list of fields; returns
+    the _source includes for it (None = everything). Unknown fields are a 400.
+    """
+    spec = (spec or "").strip()
+    if spec in projections:
+        return projections[spec]
+    fields = [f.strip() for f in spec.split(",") if f.strip()]
+    unknown = [f for f in fields if f not in allowed]
+    if unknown or not fields:
+        raise HTTPException(status_code=400, detail={
+            "error": f"unknown fields: {unknown}" if unknown else "no fields given",
+            "projections": list(projections),
+            "fields": allowed,
+        })
+    return fields
@@ -0,0 +1,138 @@
+"""
+Concurrent dashboard-poll load test for the FastAPI backend.
+
+    python benchmarks/bench_api_concurrency.py [--concurrency 2000] [--requests 20000] [--search-latency 0.02]
+
+Starts benchmarks/stub_elasticsearch.py seeded with fixture articles and the
+backend (one uvicorn worker, in its own process) pointed at it, then keeps
+--concurrency clients polling /disasters/search, /disasters/stats and
+/alerts/search like the dashboard does. Prints throughput, latency percentiles and error counts, plus
+the API's own request / response size / ES call / ES took totals from
+/metrics; run with QUERY_CACHE_ENABLED=0 to measure the uncached path. The stub and
+the load generator share this process, so on small hosts they can be the
+bottleneck; compare api_es_took against api_es_call to see queueing.
+"""
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import tempfile
+import subprocess
+import urllib.request
+
+import aiohttp
+
+import stub_elasticsearch
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "newsapi_everything.json")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def seed(state, n_docs: int):
+    with open(FIXTURE, encoding="utf-8") as f:
+        articles = json.load(f)["articles"]
+    for i in range(n_docs):
+        a = articles[i % len(articles)]
+        state["store"][("disasters", f"d{i}")] = dict(a, url=f"{a['url']}?copy={i}")
+        state["store"][("alerts", f"a{i}")] = {"id": f"a{i}", "type": "flood", "severity": "high",
+                                               "description": a["title"], "location": {"lat": 20.0, "lon": 78.0}}
+
+
+def start_api(port: int, es_url: str) -> subprocess.Popen:
+    env = dict(os.environ, ELASTICSEARCH_HOST=es_url)
+    env.setdefault("QUERY_CACHE_PATH", os.path.join(tempfile.mkdtemp(prefix="bench_api_"), "query_cache.sqlite"))
+    proc = subprocess.Popen([sys.executable, "-m", "uvicorn", "backend.app.main:app", "--host", "127.0.0.1",
+                             "--port", str(port), "--backlog", "4096", "--log-level", "warning"], cwd=ROOT, env=env)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/readyz", timeout=1) as resp:
+                if resp.status == 200:
+                    return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("API did not become ready")
+
+
+async def poll(base_url: str, paths, concurrency: int, total: int):
+    latencies, errors = [], 0
+    counter = iter(range(total))
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=60)) as session:
+        async def client():
+            nonlocal errors
+            for i in counter:
+                start = time.perf_counter()
+                try:
+                    async with session.get(base_url + paths[i % len(paths)]) as resp:
+                        await resp.read()
+                        if resp.status != 200:
+                            errors += 1
+                            continue
+                except Exception:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        return latencies, errors, time.perf_counter() - start
+
+
+def percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))] if ordered else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--search-latency", type=float, default=0.02, help="simulated ES query time (s)")
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=50, help="disasters per poll")
+    parser.add_argument("--fields", default="list", help="projection for /disasters/search (list, full, ...)")
+    args = parser.parse_args()
+
+    sys.setswitchinterval(0.0005)  # stub threads and the client loop share this process's GIL
+    es = stub_elasticsearch.serve(0, keep=True, search_latency=args.search_latency)
+    seed(es.RequestHandlerClass.state, args.docs)
+    port = free_port()
+    api = start_api(port, f"http://127.0.0.1:{es.server_port}")
+
+    paths = [f"/disasters/search?limit={args.limit}&fields={args.fields}", "/disasters/stats?interval=day",
+             "/alerts/search?limit=20"]
+    latencies, errors, elapsed = asyncio.run(poll(f"http://127.0.0.1:{port}", paths, args.concurrency,
+                                                  args.requests))
+    ordered = sorted(latencies)
+    print(f"requests: {args.requests}  concurrency: {args.concurrency}  errors: {errors}")
+    print(f"throughput: {len(ordered) / elapsed:.1f} req/s over {elapsed:.2f}s")
+    for q in (0.5, 0.95, 0.99):
+        value = percentile(ordered, q)
+        print(f"p{int(q * 100)}: {value * 1000:.1f} ms" if value is not None else f"p{int(q * 100)}: n/a")
+
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as resp:
+        exposition = resp.read().decode()
+    for line in exposition.splitlines():
+        if line.startswith(("api_request_seconds_sum", "api_request_seconds_count", "api_response_bytes_sum",
+                            "api_response_bytes_count", "api_es_call_seconds_sum", "api_es_took_seconds_sum",
+                            "api_cache_requests_total")):
+            print(line)
+    api.terminate()
+    api.wait()
+    es.shutdown()
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
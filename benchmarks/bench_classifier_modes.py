@@ -0,0 +1,95 @@
+"""
+Compare the embedding classifier mode with the zero-shot MNLI classifier.
+
+    python benchmarks/bench_classifier_modes.py [--dataset data/disasters] [--n 500] [--calibrate]
+
+Classifies a corpus (the NewsAPI fixture, or titles/descriptions from the
+Parquet dataset) both ways with the production thresholds and prints
+records/s for each, top-1 agreement and exact top-2 agreement with the MNLI
+labels, plus a per-label confusion count for the disagreements. The
+embedding mode has its own cosine-similarity cutoffs (EMBED_CLASSIFY_THRESHOLD,
+EMBED_SECONDARY_THRESHOLD); --calibrate searches for the pair that agrees best
+with MNLI on this corpus.
+"""
+import os
+import sys
+import time
+import argparse
+from collections import Counter
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "scripts"))
+from model_registry import registry  # noqa: E402
+from enrichment import EmbeddingClassifier, classify_top2_batch, label_descriptions  # noqa: E402
+from keywords import DISASTER_TYPES, SYNONYMS  # noqa: E402
+from bench_inference_backends import load_corpus, FIXTURE  # noqa: E402
+
+# Same defaults as scripts/fetch_and_index.py (not imported to avoid loading its config).
+CLASSIFY_THRESHOLD = float(os.getenv("CLASSIFY_THRESHOLD", 0.25))
+SECONDARY_THRESHOLD = float(os.getenv("SECONDARY_THRESHOLD", 0.15))
+EMBED_CLASSIFY_THRESHOLD = float(os.getenv("EMBED_CLASSIFY_THRESHOLD", 0.35))
+EMBED_SECONDARY_THRESHOLD = float(os.getenv("EMBED_SECONDARY_THRESHOLD", 0.25))
+
+
+def agreement(mnli, emb):
+    top1 = sum(a[0] == b[0] for a, b in zip(mnli, emb)) / len(mnli)
+    top2 = sum(set(a) == set(b) for a, b in zip(mnli, emb)) / len(mnli)
+    return top1, top2
+
+
+def calibrate(clf, sims, mnli):
+    """Cutoff pair with the best exact top-2 agreement with MNLI (ties: best top-1)."""
+    best = None
+    for threshold in np.arange(0.10, 0.71, 0.01):
+        for secondary in np.arange(0.10, threshold + 0.001, 0.01):
+            top1, top2 = agreement(mnli, clf.labels_for(sims, threshold, secondary))
+            if best is None or (top2, top1) > best[:2]:
+                best = (top2, top1, round(threshold, 2), round(secondary, 2))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--fixture", default=FIXTURE)
+    parser.add_argument("--dataset", default=None, help="use a Parquet dataset instead of the fixture")
+    parser.add_argument("--n", type=int, default=None)
+    parser.add_argument("--calibrate", action="store_true", help="search embedding cutoffs against MNLI")
+    args = parser.parse_args()
+
+    texts = load_corpus(args.fixture, args.dataset, args.n)
+    registry.warm_up(["classifier", "embedder"])
+
+    start = time.perf_counter()
+    mnli = classify_top2_batch(registry.classifier, texts, DISASTER_TYPES, CLASSIFY_THRESHOLD, SECONDARY_THRESHOLD)
+    mnli_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    clf = EmbeddingClassifier(registry.embedder, label_descriptions(DISASTER_TYPES, SYNONYMS))
+    setup_s = time.perf_counter() - start
+    start = time.perf_counter()
+    emb = clf.classify_top2(texts, EMBED_CLASSIFY_THRESHOLD, EMBED_SECONDARY_THRESHOLD)
+    emb_s = time.perf_counter() - start
+
+    top1, top2 = agreement(mnli, emb)
+    confusions = Counter((a[0], b[0]) for a, b in zip(mnli, emb) if a[0] != b[0])
+
+    print(f"records:         {len(texts)}")
+    print(f"zero-shot:       {mnli_s:.2f}s ({len(texts) / mnli_s:,.1f} records/s)")
+    print(f"embedding:       {emb_s:.2f}s ({len(texts) / emb_s:,.1f} records/s, "
+          f"label setup {setup_s * 1000:.0f}ms)")
+    print(f"speedup:         {mnli_s / emb_s:.1f}x")
+    print(f"cutoffs:         {EMBED_CLASSIFY_THRESHOLD} / {EMBED_SECONDARY_THRESHOLD}")
+    print(f"top-1 agreement: {top1:.1%}")
+    print(f"top-2 agreement: {top2:.1%}")
+    for (a, b), n in confusions.most_common(10):
+        print(f"  mnli={a:<11} embedding={b:<11} {n}")
+
+    if args.calibrate:
+        best_top2, best_top1, threshold, secondary = calibrate(clf, clf.scores(texts), mnli)
+        print(f"calibrated:      EMBED_CLASSIFY_THRESHOLD={threshold} EMBED_SECONDARY_THRESHOLD={secondary} "
+              f"(top-1 {best_top1:.1%}, top-2 {best_top2:.1%})")
+
+
+if __name__ == "__main__":
+    main()
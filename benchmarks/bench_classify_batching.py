@@ -0,0 +1,107 @@
+"""
+Compare arrival-order and length-bucketed batching for zero-shot classification.
+
+    python benchmarks/bench_classify_batching.py [--n 256] [--token-budget 4096]
+
+Builds a mixed-length corpus (headlines, descriptions and full articles from
+the NewsAPI fixture, shuffled), classifies it with the original fixed
+BATCH_SIZE loop and with classify_top2_batch(), checks both return the same
+labels in the same order, and prints tokens/s plus the share of padded
+tokens for each.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "scripts"))
+from model_registry import registry  # noqa: E402
+from enrichment import (HYPOTHESIS_TEMPLATE, classify_top2_batch, token_budget_batches,  # noqa: E402
+                        token_lengths, top2_labels)
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "newsapi_everything.json")
+DISASTER_TYPES = [
+    "earthquake", "flood", "cyclone", "wildfire",
+    "landslide", "volcano", "drought", "tsunami"
+]
+CLASSIFY_THRESHOLD = 0.25
+SECONDARY_THRESHOLD = 0.15
+BATCH_SIZE = 16
+
+
+def make_corpus(n: int, seed: int = 7):
+    with open(FIXTURE, encoding="utf-8") as f:
+        articles = json.load(f)["articles"]
+    rng = random.Random(seed)
+    corpus = []
+    while len(corpus) < n:
+        a = rng.choice(articles)
+        kind = rng.choice(["title", "title", "description", "article"])
+        if kind == "article":
+            body = " ".join([a["description"], a["content"]] * rng.randint(3, 12))
+            corpus.append(f"{a['title']}. {body}")
+        else:
+            corpus.append(a[kind])
+    return corpus
+
+
+def legacy_classify(classifier, texts, labels):
+    """The original classify_batch_top2() loop: fixed-size chunks in arrival order."""
+    results = []
+    for i in range(0, len(texts), BATCH_SIZE):
+        outs = classifier(texts[i:i + BATCH_SIZE], labels, multi_label=True, batch_size=BATCH_SIZE)
+        if isinstance(outs, dict):
+            outs = [outs]
+        results += [top2_labels(o["labels"], o["scores"], CLASSIFY_THRESHOLD, SECONDARY_THRESHOLD) for o in outs]
+    return results
+
+
+def padded_tokens(lengths, batches, per_item):
+    return sum(len(b) * per_item * max(lengths[i] for i in b) for b in batches)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n", type=int, default=256)
+    parser.add_argument("--token-budget", type=int, default=4096)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.n)
+    classifier = registry.classifier
+    labels = DISASTER_TYPES
+    hyp = max(token_lengths(classifier.tokenizer, [HYPOTHESIS_TEMPLATE.format(l) for l in labels]))
+    lengths = [n + hyp + 3 for n in token_lengths(classifier.tokenizer, corpus)]
+    real = sum(lengths) * len(labels)
+
+    # The pipeline forwards `batch_size` NLI pairs at a time, in arrival order.
+    pairs = [lengths[i] for i in range(len(corpus)) for _ in labels]
+    legacy_padded = sum(BATCH_SIZE * max(pairs[i:i + BATCH_SIZE]) for i in range(0, len(pairs), BATCH_SIZE))
+    bucketed_padded = padded_tokens(lengths, token_budget_batches(lengths, args.token_budget, len(labels)),
+                                    len(labels))
+
+    classifier(corpus[:4], labels, multi_label=True)  # warm up
+    start = time.perf_counter()
+    old = legacy_classify(classifier, corpus, labels)
+    legacy_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    new = classify_top2_batch(classifier, corpus, labels, CLASSIFY_THRESHOLD, SECONDARY_THRESHOLD,
+                              token_budget=args.token_budget)
+    bucketed_s = time.perf_counter() - start
+
+    mismatches = sum(a != b for a, b in zip(old, new))
+    print(f"texts:     {len(corpus)} (tokens min/median/max {min(lengths)}/"
+          f"{sorted(lengths)[len(lengths) // 2]}/{max(lengths)}), {len(labels)} labels")
+    print(f"legacy:    {legacy_s:.2f}s  {real / legacy_s:,.0f} tokens/s  "
+          f"padding {1 - real / legacy_padded:.0%}")
+    print(f"bucketed:  {bucketed_s:.2f}s  {real / bucketed_s:,.0f} tokens/s  "
+          f"padding {1 - real / bucketed_padded:.0%}")
+    print(f"speedup:   {legacy_s / bucketed_s:.2f}x")
+    print(f"mismatches: {mismatches}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
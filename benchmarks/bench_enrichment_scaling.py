@@ -0,0 +1,60 @@
+"""
+Scaling report for process-pool enrichment.
+
+    python benchmarks/bench_enrichment_scaling.py [--workers 1,2,4,8] [--n 2000] [--shard-size 32]
+
+Runs the model steps (keywords, classification, NER, severity) over a corpus
+built from the NewsAPI fixture with each worker count, after every worker has
+loaded its models, and prints records/s, speedup over one worker, scaling
+efficiency (speedup / workers) and how evenly shards were spread.
+"""
+import os
+import sys
+import json
+import argparse
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "scripts"))
+import fetch_and_index as fi  # noqa: E402
+from enrichment_pool import EnrichmentPool  # noqa: E402
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "newsapi_everything.json")
+
+
+def make_records(n: int):
+    with open(FIXTURE, encoding="utf-8") as f:
+        articles = json.load(f)["articles"]
+    raw = [dict(articles[i % len(articles)], url=f"{articles[i % len(articles)]['url']}?{i}") for i in range(n)]
+    return fi.build_records(raw)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", default="1,2,4,8")
+    parser.add_argument("--n", type=int, default=2000)
+    parser.add_argument("--shard-size", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=0, help="torch threads per worker (0 = cores / workers)")
+    args = parser.parse_args()
+
+    records = make_records(args.n)
+    rows, base = [], None
+    for n in [int(w) for w in args.workers.split(",")]:
+        pool = EnrichmentPool(fi.enrich_shard, workers=n, threads=args.threads,
+                              shard_size=args.shard_size, warm=fi.warm_worker)
+        pool.warm_up()
+        pool.map(records[:args.shard_size * n])  # first batches pay for lazy kernel init
+        pool.map(records)
+        stats = pool.last_stats
+        pool.close()
+        rps = stats["records_per_sec"]
+        base = base or rps / n
+        shards = [w["shards"] for w in stats["per_worker"].values()]
+        rows.append((n, stats["threads_per_worker"], rps, rps / base, rps / base / n, min(shards), max(shards)))
+
+    print(f"records: {len(records)}, shard size {args.shard_size}, {os.cpu_count()} cores")
+    print(f"{'workers':>8}{'threads':>9}{'rec/s':>10}{'speedup':>9}{'efficiency':>12}{'shards min/max':>16}")
+    for n, threads, rps, speedup, eff, lo, hi in rows:
+        print(f"{n:>8}{threads:>9}{rps:>10.1f}{speedup:>8.2f}x{eff:>12.0%}{f'{lo}/{hi}':>16}")
+
+
+if __name__ == "__main__":
+    main()
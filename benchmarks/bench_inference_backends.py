@@ -0,0 +1,99 @@
+"""
+Check that a quantized/exported inference backend agrees with the fp32 models.
+
+    python benchmarks/bench_inference_backends.py --backend int8 [--min-agreement 0.95]
+    python benchmarks/bench_inference_backends.py --backend onnx --dataset data/disasters
+
+Runs the classifier (top-2 labels), NER (first location) and sentiment
+(severity bucket) over a fixture corpus with the fp32 "torch" backend and with
+the candidate backend, then prints per-model label agreement, records/s and
+load time/RSS for both. Exits non-zero if any model agrees on fewer than
+--min-agreement of the records.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "scripts"))
+from model_registry import ModelRegistry, BACKENDS  # noqa: E402
+from enrichment import location_from_entities, severity_from_sentiment  # noqa: E402
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "newsapi_everything.json")
+DISASTER_TYPES = [
+    "earthquake", "flood", "cyclone", "wildfire",
+    "landslide", "volcano", "drought", "tsunami"
+]
+BATCH_SIZE = 16
+
+
+def load_corpus(fixture: str, dataset: str = None, n: int = None):
+    if dataset:
+        from parquet_store import ParquetStore
+        df = ParquetStore(dataset).read(columns=["title", "description", "content"])
+        rows = df.fillna("").to_dict("records")
+    else:
+        with open(fixture, encoding="utf-8") as f:
+            rows = json.load(f)["articles"]
+    texts = [" ".join(filter(None, [r.get("title"), r.get("description"), r.get("content")])) for r in rows]
+    return texts[:n] if n else texts
+
+
+def run_models(registry: ModelRegistry, texts):
+    """Per-model predictions plus timings for one backend."""
+    out, timings = {}, {}
+
+    start = time.perf_counter()
+    res = registry.classifier(texts, DISASTER_TYPES, multi_label=True, batch_size=BATCH_SIZE)
+    timings["classifier"] = time.perf_counter() - start
+    out["classifier"] = [tuple(r["labels"][:2]) for r in res]
+
+    start = time.perf_counter()
+    res = registry.ner(texts, batch_size=BATCH_SIZE)
+    timings["ner"] = time.perf_counter() - start
+    out["ner"] = [location_from_entities(ents) for ents in res]
+
+    start = time.perf_counter()
+    res = registry.sentiment(texts, batch_size=BATCH_SIZE, truncation=True, max_length=512)
+    timings["sentiment"] = time.perf_counter() - start
+    out["sentiment"] = [severity_from_sentiment(r) for r in res]
+    return out, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backend", choices=[b for b in BACKENDS if b != "torch"], default="int8")
+    parser.add_argument("--fixture", default=FIXTURE)
+    parser.add_argument("--dataset", default=None, help="use a Parquet dataset instead of the fixture")
+    parser.add_argument("--n", type=int, default=None, help="limit the number of records")
+    parser.add_argument("--min-agreement", type=float, default=0.95)
+    args = parser.parse_args()
+
+    texts = load_corpus(args.fixture, args.dataset, args.n)
+    print(f"records: {len(texts)}")
+
+    results = {}
+    for backend in ("torch", args.backend):
+        registry = ModelRegistry(backend=backend)
+        registry.warm_up()
+        preds, timings = run_models(registry, texts)  # first pass also warms up kernels
+        preds, timings = run_models(registry, texts)
+        results[backend] = (preds, timings, registry.stats())
+        del registry
+
+    base, cand = results["torch"], results[args.backend]
+    failed = False
+    print(f"{'model':<12}{'agreement':>10}{'fp32 rec/s':>12}{args.backend + ' rec/s':>14}{'speedup':>9}")
+    for name in ("classifier", "ner", "sentiment"):
+        agree = sum(a == b for a, b in zip(base[0][name], cand[0][name])) / len(texts)
+        fp32_rps, cand_rps = len(texts) / base[1][name], len(texts) / cand[1][name]
+        print(f"{name:<12}{agree:>10.1%}{fp32_rps:>12.1f}{cand_rps:>14.1f}{cand_rps / fp32_rps:>8.2f}x")
+        failed |= agree < args.min_agreement
+    for backend, (_, _, stats) in results.items():
+        print(f"{backend}: " + json.dumps(stats["models"]))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
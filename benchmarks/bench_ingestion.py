@@ -0,0 +1,255 @@
+"""
+Offline ingestion benchmark: enrichment, Parquet persistence and ES indexing.
+
+    python benchmarks/bench_ingestion.py [--records 10000] [--reddit-records 2000] [--fake-models] [--out run.json]
+
+Replays the recorded NewsAPI articles and Reddit posts in benchmarks/fixtures/,
+scaled to the requested counts (unique URLs; each copy gets distinct content
+unless --repeat-content, so the enrichment cache starts cold; rerun with
+the same --workdir to measure a warm cache), through
+enrich_articles(), enrich_reddit_posts(), append_to_parquet() and
+index_into_es(). Nominatim is replaced by a stub geolocator and Elasticsearch
+by benchmarks/stub_elasticsearch.py; all caches and the dataset live in a
+temporary directory. --fake-models swaps the three pipelines for cheap
+deterministic fakes to measure everything but inference.
+
+Prints (and with --out writes) JSON with per-stage wall time, records/s, RSS
+and peak RSS, plus per-model call and item counts, so two runs can be diffed.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import resource
+import tempfile
+from collections import namedtuple
+from datetime import datetime, timezone
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "scripts"))
+import stub_elasticsearch  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+Location = namedtuple("Location", "latitude longitude")
+
+
+# -----------------------
+# Stubs
+# -----------------------
+class CountingModel:
+    """Wraps a pipeline and counts calls and items; other attributes pass through."""
+
+    def __init__(self, model):
+        self.model = model
+        self.calls = 0
+        self.items = 0
+
+    def __call__(self, inputs, *args, **kwargs):
+        self.calls += 1
+        self.items += len(inputs) if isinstance(inputs, list) else 1
+        return self.model(inputs, *args, **kwargs)
+
+    def __getattr__(self, attr):
+        return getattr(self.model, attr)
+
+
+class FakeTokenizer:
+    def __call__(self, texts, max_length=512, **kwargs):
+        return {"input_ids": [t.split()[:max_length] for t in texts]}
+
+
+class FakeClassifier:
+    tokenizer = FakeTokenizer()
+
+    def __call__(self, texts, labels, **kwargs):
+        out = []
+        for t in texts:
+            low = t.lower()
+            scores = [0.9 if lbl in low else 0.05 for lbl in labels]
+            ranked = sorted(zip(labels, scores), key=lambda x: -x[1])
+            out.append({"sequence": t, "labels": [l for l, _ in ranked], "scores": [s for _, s in ranked]})
+        return out
+
+
+class FakeNer:
+    def __call__(self, texts, **kwargs):
+        out = []
+        for t in texts:
+            words = [w.strip(".,") for w in t.split()]
+            loc = next((w for w in words[1:] if w[:1].isupper() and len(w) > 3), None)
+            out.append([{"entity_group": "LOC", "word": loc, "score": 0.9}] if loc else [])
+        return out
+
+
+class FakeSentiment:
+    def __call__(self, texts, **kwargs):
+        return [{"label": "NEGATIVE" if any(k in t.lower() for k in ("missing", "evacuate", "alert", "buries"))
+                 else "POSITIVE", "score": 0.9} for t in texts]
+
+
+class StubGeolocator:
+    """Deterministic stand-in for Nominatim: every query resolves to a point derived from its hash."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def geocode(self, query):
+        self.calls += 1
+        h = abs(hash(query))
+        return Location(8 + (h % 2800) / 100, 68 + (h // 2800 % 2900) / 100)
+
+
+# -----------------------
+# Fixtures at scale
+# -----------------------
+def scale_articles(n: int, repeat_content: bool):
+    with open(os.path.join(FIXTURES, "newsapi_everything.json"), encoding="utf-8") as f:
+        base = json.load(f)["articles"]
+    out = []
+    for i in range(n):
+        a = dict(base[i % len(base)], url=f"{base[i % len(base)]['url']}?copy={i}")
+        if not repeat_content:
+            a["content"] = f"{a['content']} (update {i})"
+        out.append(a)
+    return out
+
+
+def scale_posts(n: int, repeat_content: bool):
+    with open(os.path.join(FIXTURES, "reddit_posts.json"), encoding="utf-8") as f:
+        base = json.load(f)["posts"]
+    out = []
+    for i in range(n):
+        p = base[i % len(base)]
+        text = p["selftext"] if repeat_content else f"{p['selftext']} (edit {i})"
+        out.append({
+            "title": p["title"], "description": text[:200], "content": text,
+            "url": f"{p['url']}?copy={i}", "source": p["subreddit"],
+            "publishedAt": datetime.fromtimestamp(p["created_utc"], timezone.utc).replace(tzinfo=None),
+        })
+    return out
+
+
+# -----------------------
+# Measurement
+# -----------------------
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def model_counts(models):
+    return {name: {"calls": m.calls, "items": m.items} for name, m in models.items()}
+
+
+def timed(name, records, fn, results, models, current_rss_mb):
+    before = model_counts(models)
+    start = time.perf_counter()
+    out = fn()
+    elapsed = time.perf_counter() - start
+    after = model_counts(models)
+    results[name] = {
+        "records": records,
+        "seconds": round(elapsed, 3),
+        "records_per_sec": round(records / elapsed, 1) if elapsed else None,
+        "rss_mb": round(current_rss_mb(), 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "model_calls": {k: {f: after[k][f] - before[k][f] for f in ("calls", "items")} for k in after},
+    }
+    logging.info("%s: %d records in %.2fs", name, records, elapsed)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=1000, help="NewsAPI articles (1k-100k)")
+    parser.add_argument("--reddit-records", type=int, default=None, help="Reddit posts (default: records / 5)")
+    parser.add_argument("--fake-models", action="store_true", help="use deterministic fake pipelines")
+    parser.add_argument("--repeat-content", action="store_true", help="reuse fixture text (duplicate content is enriched once)")
+    parser.add_argument("--workdir", default=None, help="keep caches/dataset here instead of a temp dir")
+    parser.add_argument("--out", default=None, help="also write the JSON report to this file")
+    args = parser.parse_args()
+    reddit_n = args.reddit_records if args.reddit_records is not None else args.records // 5
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="bench_ingestion_")
+    for var, sub in (("DATASET_PATH", "disasters"), ("DEDUP_INDEX_PATH", "url_index"),
+                     ("ENRICHMENT_CACHE_PATH", "enrichment.sqlite"), ("GEOCACHE_PATH", "geocode.sqlite"),
+                     ("REDDIT_CHECKPOINT_PATH", "reddit_checkpoints.json"), ("PARQUET_PATH", "legacy.parquet"),
+                     ("QUERY_CACHE_PATH", "query_cache.sqlite"), ("METRICS_RUN_LOG", "pipeline_runs.jsonl")):
+        os.environ[var] = os.path.join(workdir, sub)
+    if args.fake_models:
+        os.environ["ENRICH_WORKERS"] = "1"  # spawned workers would load the real models
+
+    # Imported after the environment points every store at the work dir.
+    from elasticsearch import Elasticsearch
+    import fetch_and_index
+    import reddit
+    from model_registry import registry, current_rss_mb
+    from geocache import RateLimiter, get_geocoder
+
+    if args.fake_models:
+        for name, fake in (("classifier", FakeClassifier()), ("ner", FakeNer()), ("sentiment", FakeSentiment())):
+            registry.set(name, fake)
+    else:
+        registry.warm_up()
+    models = {name: CountingModel(registry.get(name)) for name in ("classifier", "ner", "sentiment")}
+    for name, model in models.items():
+        registry.set(name, model)
+
+    geolocator = StubGeolocator()
+    geocoder = get_geocoder()
+    geocoder.geolocator = geolocator
+    geocoder.rate_limiter = RateLimiter(0)
+
+    es_stub = stub_elasticsearch.serve(0)
+    es = Elasticsearch(f"http://127.0.0.1:{es_stub.server_port}")
+
+    articles = scale_articles(args.records, args.repeat_content)
+    posts = scale_posts(reddit_n, args.repeat_content)
+    stages = {}
+    rss_start = current_rss_mb()
+    total_start = time.perf_counter()
+
+    news_df = timed("enrich_articles", len(articles), lambda: fetch_and_index.enrich_articles(articles),
+                    stages, models, current_rss_mb)
+    reddit_df = timed("enrich_reddit_posts", len(posts), lambda: reddit.enrich_reddit_posts(posts),
+                      stages, models, current_rss_mb)
+    import pandas as pd
+    df = pd.concat([news_df, reddit_df], ignore_index=True)
+    store = fetch_and_index.get_store()
+    timed("append_to_parquet", len(df), lambda: fetch_and_index.append_to_parquet(df, store),
+          stages, models, current_rss_mb)
+    indexed = timed("index_into_es", len(df), lambda: fetch_and_index.index_into_es(df, es, "disasters"),
+                    stages, models, current_rss_mb)
+
+    es_state = es_stub.RequestHandlerClass.state
+    report = {
+        "config": {
+            "records": args.records, "reddit_records": reddit_n, "fake_models": args.fake_models,
+            "repeat_content": args.repeat_content, "inference_backend": registry.backend,
+            "classifier_mode": fetch_and_index.CLASSIFIER_MODE, "cpu_count": os.cpu_count(),
+        },
+        "total_seconds": round(time.perf_counter() - total_start, 3),
+        "rss_start_mb": round(rss_start, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "stages": stages,
+        "model_calls": model_counts(models),
+        "geocoder": dict(get_geocoder().stats(), stub_calls=geolocator.calls),
+        "enrichment_cache": fetch_and_index.get_enrichment_cache().stats(),
+        "es": {"indexed": indexed, "bulk_requests": es_state["bulk_requests"], "docs": es_state["docs"],
+               "bytes": es_state["bytes"]},
+    }
+    es_stub.shutdown()
+    if not args.workdir:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    sys.exit(0 if indexed == len(df) else 1)
+
+
+if __name__ == "__main__":
+    main()
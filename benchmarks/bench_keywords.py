@@ -0,0 +1,96 @@
+"""
+Compare the compiled KeywordMatcher against the original per-keyword regex loop.
+
+    python benchmarks/bench_keywords.py [--n 20000]
+
+Checks that both find the same disaster types on a synthetic headline corpus
+(identical sets whenever the legacy function found at most two types, a subset
+of its full match set otherwise) and prints texts/s for each.
+"""
+import os
+import re
+import sys
+import time
+import random
+import argparse
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "scripts"))
+from keywords import KeywordMatcher, DISASTER_TYPES, SYNONYMS  # noqa: E402
+
+FILLER = ("officials said residents in the district were moved to relief camps after the "
+          "government announced compensation for affected families on Monday").split()
+
+
+def normalize_text(t: str) -> str:
+    if not t:
+        return ""
+    s = t.lower()
+    s = re.sub(r"[^a-z0-9\s]", " ", s)
+    s = re.sub(r"\s+", " ", s).strip()
+    return s
+
+
+def legacy_matches(text: str) -> set:
+    """The original synonym_keyword_fallback() body, before the top-2 cap."""
+    text_l = normalize_text(text)
+    matches = set()
+    for syn in sorted(SYNONYMS.keys(), key=lambda x: -len(x)):
+        if re.search(rf"\b{re.escape(syn)}\b", text_l):
+            matches.add(SYNONYMS[syn])
+    for d in DISASTER_TYPES:
+        if re.search(rf"\b{re.escape(d)}\b", text_l):
+            matches.add(d)
+    return matches
+
+
+def legacy_fallback(text: str):
+    return list(legacy_matches(text))[:2]
+
+
+def make_corpus(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    keywords = list(SYNONYMS) + DISASTER_TYPES + ["aftershocks", "stormy", "Lava-flow", "FLOODING!"]
+    corpus = []
+    for _ in range(n):
+        words = rng.choices(FILLER, k=rng.randint(20, 80))
+        for _ in range(rng.choice([0, 0, 1, 1, 2, 3])):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(keywords))
+        corpus.append(" ".join(words))
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n", type=int, default=20000, help="number of synthetic texts")
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.n)
+    matcher = KeywordMatcher(SYNONYMS, DISASTER_TYPES, limit=2)
+
+    start = time.perf_counter()
+    legacy = [legacy_fallback(t) for t in corpus]
+    legacy_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    new = matcher.match_many(corpus)
+    new_s = time.perf_counter() - start
+
+    mismatches = 0
+    for text, old, cur in zip(corpus, legacy, new):
+        full = legacy_matches(text)
+        ok = set(cur) == full if len(full) <= 2 else (len(cur) == 2 and set(cur) <= full)
+        if not ok:
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"MISMATCH legacy={sorted(full)} new={cur}: {text[:120]}")
+
+    print(f"texts:      {len(corpus)}")
+    print(f"legacy:     {legacy_s:.3f}s ({len(corpus) / legacy_s:,.0f} texts/s)")
+    print(f"matcher:    {new_s:.3f}s ({len(corpus) / new_s:,.0f} texts/s)")
+    print(f"speedup:    {legacy_s / new_s:.1f}x")
+    print(f"mismatches: {mismatches}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
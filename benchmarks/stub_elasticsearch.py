@@ -0,0 +1,233 @@
+"""
+Minimal in-process stand-in for the Elasticsearch bulk API.
+
+    python benchmarks/stub_elasticsearch.py [--port 9201] [--fail-every 0] [--keep] [--search-latency 0]
+
+Answers the product check (GET /), HEAD / for ping(), and PUT/POST /_bulk and
+/<index>/_bulk: NDJSON bodies are parsed and every action gets a 201 item, so
+the real elasticsearch-py helpers run end to end without a cluster. Documents
+are counted (and kept by id with --keep). --fail-every N answers every Nth
+document with a 400 mapping error to exercise per-document failure handling.
+
+For API benchmarks it also answers GET /_cluster/health, HEAD /<index>,
+GET /<index>/_doc/<id> and GET/POST /<index>/_search. Searches ignore the
+query but honour `sort`, `search_after` and `_source` includes, returning
+`size` kept documents of the index after --search-latency seconds; `terms`
+and `date_histogram` aggregations (bucketed by date-string prefix, time zone
+ignored) are computed over all of them.
+"""
+import json
+import gzip
+import time
+import argparse
+import functools
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+INFO = {
+    "name": "stub",
+    "cluster_name": "stub",
+    "version": {"number": "8.15.0", "build_flavor": "default"},
+    "tagline": "You Know, for Search",
+}
+
+
+def _project(doc: dict, includes):
+    return {k: v for k, v in doc.items() if k in includes} if isinstance(includes, list) else doc
+
+
+def _sort_spec(sort):
+    """[(field, descending)] from an ES sort clause."""
+    spec = []
+    for entry in sort or []:
+        field, opts = next(iter(entry.items())) if isinstance(entry, dict) else (entry, "asc")
+        order = opts.get("order", "asc") if isinstance(opts, dict) else opts
+        spec.append((field, order == "desc"))
+    return spec
+
+
+def _compare(a, b, spec):
+    for (_, desc), x, y in zip(spec, a, b):
+        if x != y:
+            if x is None or y is None:  # missing values sort last either way
+                return 1 if x is None else -1
+            return (1 if x > y else -1) * (-1 if desc else 1)
+    return 0
+
+
+# date_histogram calendar_interval -> length of the ISO date prefix that identifies a bucket
+DATE_PREFIX = {"year": 4, "quarter": 7, "month": 7, "week": 10, "day": 10, "hour": 13, "minute": 16}
+
+
+def _aggregate(aggs, docs):
+    out = {}
+    for name, spec in (aggs or {}).items():
+        groups = {}
+        if "terms" in spec:
+            for doc in docs:
+                value = doc.get(spec["terms"]["field"])
+                if value is not None:
+                    groups.setdefault(value, []).append(doc)
+            keys = sorted(groups, key=lambda k: -len(groups[k]))[:spec["terms"].get("size", 10)]
+        elif "date_histogram" in spec:
+            field = spec["date_histogram"]["field"]
+            width = DATE_PREFIX.get(spec["date_histogram"].get("calendar_interval"), 10)
+            for doc in docs:
+                if isinstance(doc.get(field), str):
+                    groups.setdefault(doc[field][:width], []).append(doc)
+            keys = sorted(groups)
+        else:
+            continue
+        buckets = []
+        for key in keys:
+            bucket = {"key": key, "doc_count": len(groups[key])}
+            if "date_histogram" in spec:
+                bucket["key_as_string"] = key
+            bucket.update(_aggregate(spec.get("aggs"), groups[key]))
+            buckets.append(bucket)
+        out[name] = {"buckets": buckets}
+    return out
+
+
+def make_handler(fail_every: int = 0, keep: bool = False, search_latency: float = 0.0):
+    lock = threading.Lock()
+    state = {"bulk_requests": 0, "docs": 0, "failed": 0, "bytes": 0, "searches": 0, "store": {}}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like a real node
+        disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+        def _send(self, status: int, body=None):
+            data = json.dumps(body).encode("utf-8") if body is not None else b""
+            self.send_response(status)
+            self.send_header("X-Elastic-Product", "Elasticsearch")  # required by the 8.x client
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(data)
+
+        def _body(self) -> bytes:
+            raw = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if self.headers.get("Content-Encoding") == "gzip":
+                raw = gzip.decompress(raw)
+            return raw
+
+        def do_HEAD(self):
+            self._send(200)
+
+        def _search(self, path: str, body: bytes):
+            index = path[1:-len("/_search")]
+            params = parse_qs(urlparse(self.path).query)
+            req = json.loads(body) if body.strip() else {}
+            size = int(params.get("size", [req.get("size", 10)])[0])
+            if search_latency:
+                time.sleep(search_latency)
+            with lock:
+                state["searches"] += 1
+                docs = [(k[1], d) for k, d in state["store"].items() if k[0] == index or index in ("", "_all")]
+            spec = _sort_spec(req.get("sort"))
+            rows = [(_id, doc, [doc.get(f) for f, _ in spec]) for _id, doc in docs]
+            if spec:
+                rows.sort(key=functools.cmp_to_key(lambda a, b: _compare(a[2], b[2], spec)))
+            if req.get("search_after") is not None:
+                rows = [r for r in rows if _compare(r[2], req["search_after"], spec) > 0]
+            hits = [{"_index": index, "_id": _id, "_score": None if spec else 1.0,
+                     "_source": _project(doc, req.get("_source")), **({"sort": values} if spec else {})}
+                    for _id, doc, values in rows[:size]]
+            res = {"took": int(search_latency * 1000), "timed_out": False,
+                   "hits": {"total": {"value": len(docs), "relation": "eq"}, "hits": hits}}
+            if req.get("aggs"):
+                res["aggregations"] = _aggregate(req["aggs"], [doc for _, doc in docs])
+            self._send(200, res)
+
+        def do_GET(self):
+            path = self.path.split("?")[0]
+            if path in ("/", ""):
+                return self._send(200, INFO)
+            if path == "/_cluster/health":
+                return self._send(200, {"cluster_name": "stub", "status": "green", "timed_out": False})
+            if path.endswith("/_search"):
+                return self._search(path, self._body())
+            if "/_doc/" in path:
+                index, _, doc_id = path[1:].partition("/_doc/")
+                doc_id = unquote(doc_id)
+                with lock:
+                    doc = state["store"].get((index, doc_id))
+                if doc is None:
+                    return self._send(404, {"_index": index, "_id": doc_id, "found": False})
+                includes = parse_qs(urlparse(self.path).query).get("_source_includes")
+                return self._send(200, {"_index": index, "_id": doc_id, "found": True,
+                                        "_source": _project(doc, includes and includes[0].split(","))})
+            self._send(404, {"error": "not found", "status": 404})
+
+        def do_POST(self):
+            path = self.path.split("?")[0]
+            body = self._body()
+            if path.endswith("/_search"):
+                return self._search(path, body)
+            if not path.endswith("/_bulk"):
+                return self._send(404, {"error": "not found", "status": 404})
+            default_index = path[1:-len("/_bulk")] or None
+            lines = [l for l in body.split(b"\n") if l.strip()]
+            items, errors = [], False
+            with lock:
+                state["bulk_requests"] += 1
+                state["bytes"] += len(body)
+                i = 0
+                while i < len(lines):
+                    action = json.loads(lines[i])
+                    op, meta = next(iter(action.items()))
+                    has_source = op in ("index", "create", "update")
+                    doc = json.loads(lines[i + 1]) if has_source else None
+                    i += 2 if has_source else 1
+                    state["docs"] += 1
+                    item = {"_index": meta.get("_index", default_index), "_id": meta.get("_id")}
+                    if fail_every and state["docs"] % fail_every == 0:
+                        state["failed"] += 1
+                        errors = True
+                        item.update(status=400, error={"type": "mapper_parsing_exception",
+                                                       "reason": "stub failure"})
+                    else:
+                        item.update(status=201, result="created")
+                        if keep:
+                            state["store"][(item["_index"], item["_id"])] = doc
+                    items.append({op: item})
+            self._send(200, {"took": 1, "errors": errors, "items": items})
+
+        do_PUT = do_POST  # elasticsearch-py 8 sends bulk requests as PUT
+
+        def log_message(self, *args):
+            pass
+
+    Handler.state = state
+    return Handler
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # listen backlog; the default of 5 drops bursts of new connections
+
+
+def serve(port: int = 0, fail_every: int = 0, keep: bool = False, search_latency: float = 0.0) -> ThreadingHTTPServer:
+    """Start the stub on a background thread; port 0 picks a free port. Counters: server.RequestHandlerClass.state."""
+    server = StubServer(("127.0.0.1", port), make_handler(fail_every, keep, search_latency))
+    threading.Thread(target=server.serve_forever, name="stub-es", daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--port", type=int, default=9201)
+    parser.add_argument("--fail-every", type=int, default=0)
+    parser.add_argument("--keep", action="store_true", help="keep documents in memory")
+    parser.add_argument("--search-latency", type=float, default=0.0, help="seconds per _search")
+    args = parser.parse_args()
+
+    server = serve(args.port, args.fail_every, args.keep, args.search_latency)
+    print(f"Stub Elasticsearch on http://127.0.0.1:{server.server_port} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
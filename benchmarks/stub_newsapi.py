@@ -0,0 +1,113 @@
+"""
+Local stand-in for NewsAPI's /v2/everything, replaying a recorded response.
+
+    python benchmarks/stub_newsapi.py [--port 8765] [--rate 5] [--max-results 100] [--fail-every 0]
+    NEWSAPI_URL=http://127.0.0.1:8765/v2/everything NEWS_API_KEY=stub \
+        python scripts/fetch_and_index.py --limit 20
+
+Articles whose title or description mention the query's first term are served
+page by page (`page`/`pageSize`). `--rate` answers 429 with Retry-After once
+more than that many requests arrive within a second, and `--max-results` mimics
+the developer plan's 426 `maximumResultsReached` cap, so the fetcher's paging
+and rate limiting can be exercised without network access or an API key.
+`--fail-every N` answers every Nth request with an HTML 502, like a proxy in
+front of the API would.
+"""
+import os
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "newsapi_everything.json")
+
+
+def make_handler(articles, rate: int = 0, max_results: int = 0, fail_every: int = 0):
+    lock = threading.Lock()
+    window = {"second": 0, "count": 0}
+    counters = {"requests": 0, "throttled": 0, "failed": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status, body, headers=None):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path != "/v2/everything":
+                return self._send(404, {"status": "error", "code": "notFound"})
+            with lock:
+                counters["requests"] += 1
+                now = int(time.time())
+                if window["second"] != now:
+                    window["second"], window["count"] = now, 0
+                window["count"] += 1
+                throttled = rate and window["count"] > rate
+                if throttled:
+                    counters["throttled"] += 1
+                failed = fail_every and counters["requests"] % fail_every == 0
+                if failed:
+                    counters["failed"] += 1
+            if failed:
+                data = b"<html><body><h1>502 Bad Gateway</h1></body></html>"
+                self.send_response(502)
+                self.send_header("Content-Type", "text/html")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                return self.wfile.write(data)
+            if throttled:
+                return self._send(429, {"status": "error", "code": "rateLimited"}, {"Retry-After": "1"})
+
+            params = parse_qs(url.query)
+            term = params.get("q", [""])[0].split(" AND ")[0].strip().lower()
+            page = int(params.get("page", ["1"])[0])
+            page_size = int(params.get("pageSize", ["100"])[0])
+            if max_results and (page - 1) * page_size >= max_results:
+                return self._send(426, {"status": "error", "code": "maximumResultsReached"})
+
+            hits = [a for a in articles
+                    if not term or term in (a["title"] + " " + (a["description"] or "")).lower()]
+            start = (page - 1) * page_size
+            self._send(200, {"status": "ok", "totalResults": len(hits),
+                             "articles": hits[start:start + page_size]})
+
+        def log_message(self, *args):
+            pass
+
+    Handler.counters = counters
+    return Handler
+
+
+def serve(port: int = 0, fixture: str = FIXTURE, rate: int = 0, max_results: int = 0,
+          fail_every: int = 0) -> ThreadingHTTPServer:
+    """Start the stub on a background thread; port 0 picks a free port (see server.server_port)."""
+    with open(fixture, encoding="utf-8") as f:
+        articles = json.load(f)["articles"]
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(articles, rate, max_results, fail_every))
+    threading.Thread(target=server.serve_forever, name="stub-newsapi", daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixture", default=FIXTURE)
+    parser.add_argument("--rate", type=int, default=0, help="requests/s before answering 429 (0 = unlimited)")
+    parser.add_argument("--max-results", type=int, default=0, help="426 past this many results (0 = no cap)")
+    parser.add_argument("--fail-every", type=int, default=0, help="HTML 502 on every Nth request (0 = never)")
+    args = parser.parse_args()
+
+    server = serve(args.port, args.fixture, args.rate, args.max_results, args.fail_every)
+    print(f"Stub NewsAPI on http://127.0.0.1:{server.server_port}/v2/everything (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -33,13 +33,13 @@ disasters_data = fetch_disasters(API_URL, filter_params)
 # ----------------------
 # Disaster Table
 # ----------------------
-disasters_table.show_table(disasters_data, filter_params)
+disasters_table.show_table(API_URL, filter_params)
 st.markdown("---")
 
 # ----------------------
 # Timeline Chart
 # ----------------------
-timeline_chart.show_timeline(disasters_data)
+timeline_chart.show_timeline(API_URL, filter_params)
 st.markdown("---")
 
 # ----------------------
@@ -1,18 +1,40 @@
 import streamlit as st
 import pandas as pd
+from utils import fetch_disaster_page
+
+ROWS_PER_PAGE = 5
+
+def _page_cursors(filters):
+    # cursor of every page visited so far (None = first page); start over when the filters change
+    key = (filters["q"], filters["disaster_type"], filters["disaster_severity"], filters["location"],
+           str(filters["date_range"]))
+    if st.session_state.get("table_filters") != key:
+        st.session_state.table_filters = key
+        st.session_state.table_cursors = [None]
+        st.session_state.table_next = None
+    return st.session_state.table_cursors
+
+def _next_page():
+    if st.session_state.table_next:
+        st.session_state.table_cursors.append(st.session_state.table_next)
+
+def _prev_page():
+    if len(st.session_state.table_cursors) > 1:
+        st.session_state.table_cursors.pop()
+
+def show_table(api_url, filters):
+    # One page per request; severity is filtered by the API so every page is full
+    cursors = _page_cursors(filters)
+    disasters_data, next_cursor = fetch_disaster_page(api_url, filters, cursors[-1], ROWS_PER_PAGE)
+    st.session_state.table_next = next_cursor
 
-def show_table(disasters_data, filters):
     if disasters_data:
         df = pd.DataFrame(disasters_data)
 
-        # Apply filter
-        if filters["disaster_severity"] != "All":
-            df = df[df["severity"] == filters["disaster_severity"]]
-
         st.subheader("📋 Disaster List")
 
         # Reorder & rename columns
-        df = df[["title", "disaster_type", "severity", "location", "publishedAt", "source", "url"]]
+        df = df.reindex(columns=["title", "disaster_type", "severity", "location", "publishedAt", "source", "url"])
         df = df.rename(columns={
             "title": "Title",
             "disaster_type": "Type",
@@ -27,18 +49,6 @@ def show_table(disasters_data, filters):
         if "Published At" in df.columns:
             df["Published At"] = pd.to_datetime(df["Published At"], errors="coerce").dt.strftime("%Y-%m-%d %H:%M")
 
-        # --- Pagination setup ---
-        rows_per_page = 5
-        total_pages = (len(df) - 1) // rows_per_page + 1
-
-        if "page" not in st.session_state:
-            st.session_state.page = 1
-
-        page = st.session_state.page
-        start = (page - 1) * rows_per_page
-        end = start + rows_per_page
-        df_page = df.iloc[start:end]
-
         # --- Custom Dark Table Styling ---
         st.markdown("""
             <style>
@@ -73,19 +83,18 @@ def show_table(disasters_data, filters):
         """, unsafe_allow_html=True)
 
         # Show table
-        df_html = df_page.to_html(classes="dark-table", index=False, escape=False)
+        df_html = df.to_html(classes="dark-table", index=False, escape=False)
         st.markdown(df_html, unsafe_allow_html=True)
 
         # --- Pagination Controls BELOW table ---
+        page = len(cursors)
         col1, col2, col3 = st.columns([1,3,1])
         with col1:
-            if st.button("⬅️ Prev") and page > 1:
-                st.session_state.page -= 1
+            st.button("⬅️ Prev", on_click=_prev_page, disabled=page == 1)
         with col2:
-            st.markdown(f"<div style='text-align:center;'>Page {page} of {total_pages}</div>", unsafe_allow_html=True)
+            st.markdown(f"<div style='text-align:center;'>Page {page}</div>", unsafe_allow_html=True)
         with col3:
-            if st.button("Next ➡️") and page < total_pages:
-                st.session_state.page += 1
+            st.button("Next ➡️", on_click=_next_page, disabled=next_cursor is None)
 
     else:
         st.info("No disasters found.")
@@ -1,26 +1,27 @@
 import streamlit as st
 import pandas as pd
 import altair as alt
+from utils import fetch_disaster_stats
 
-def show_timeline(disasters_data):
-    if not disasters_data:
+def show_timeline(api_url, filters):
+    # Counted by the API over every matching disaster, not just the fetched page
+    interval = st.selectbox("Timeline interval", ["day", "week", "month"], key="timeline_interval")
+    stats = fetch_disaster_stats(api_url, filters, interval=interval)
+    if not stats or not stats["total"]:
         st.info("No timeline data available.")
         return
 
-    df = pd.DataFrame(disasters_data)
-    if "publishedAt" not in df.columns or "severity" not in df.columns:
+    # One row per interval + severity
+    timeline = pd.DataFrame([
+        {"publishedAt": bucket["date"], "severity": severity, "count": count}
+        for bucket in stats["timeline"]
+        for severity, count in bucket["severity"].items()
+    ], columns=["publishedAt", "severity", "count"])
+    if timeline.empty:
         st.warning("Timeline data missing required fields.")
         return
-
-    df["publishedAt"] = pd.to_datetime(df["publishedAt"], errors="coerce")
-    df = df.dropna(subset=["publishedAt", "severity"])
-
-    # Group by Date + Severity
-    timeline = (
-        df.groupby([df["publishedAt"].dt.date, "severity"])
-        .size()
-        .reset_index(name="count")
-    )
+    # bucket keys are local wall-clock times with an offset that can change across DST; chart them as-is
+    timeline["publishedAt"] = pd.to_datetime(timeline["publishedAt"].str[:19], errors="coerce")
 
     chart = (
         alt.Chart(timeline)
@@ -35,4 +36,8 @@ def show_timeline(disasters_data):
     )
 
     st.subheader("📈 Disaster Timeline")
+    cols = st.columns(1 + len(stats["severity"]))
+    cols[0].metric("Total", stats["total"])
+    for col, (severity, count) in zip(cols[1:], sorted(stats["severity"].items())):
+        col.metric(severity.capitalize(), count)
     st.altair_chart(chart, use_container_width=True)
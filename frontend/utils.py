@@ -1,6 +1,6 @@
 import requests
 
-def fetch_disasters(api_url, filters):
+def _disaster_params(filters):
     params = {"q": filters["q"], "limit": filters["limit"]}
     if filters["disaster_type"] != "All":
         params["disaster_type"] = filters["disaster_type"]
@@ -9,6 +9,10 @@ def fetch_disasters(api_url, filters):
         params["end_date"] = filters["date_range"][1].isoformat()
     if filters["location"].strip():
         params["location"] = filters["location"]
+    return params
+
+def fetch_disasters(api_url, filters):
+    params = _disaster_params(filters)
 
     try:
         res = requests.get(f"{api_url}/disasters/search", params=params)
@@ -17,6 +21,36 @@ def fetch_disasters(api_url, filters):
     except:
         return []
 
+def fetch_disaster_page(api_url, filters, cursor=None, page_size=5):
+    """One page of the disaster table: (rows, cursor of the next page or None)."""
+    if cursor:
+        params = {"cursor": cursor}  # the filters travel inside the cursor
+    else:
+        params = dict(_disaster_params(filters), limit=page_size)
+        if filters["disaster_severity"] != "All":
+            params["severity"] = filters["disaster_severity"]
+
+    try:
+        res = requests.get(f"{api_url}/disasters/search", params=params)
+        res.raise_for_status()
+        return res.json(), res.headers.get("X-Next-Cursor")
+    except:
+        return [], None
+
+def fetch_disaster_stats(api_url, filters, interval="day", time_zone="UTC"):
+    """Exact counts for the filters from /disasters/stats (None if the API is unreachable)."""
+    params = dict(_disaster_params(filters), interval=interval, time_zone=time_zone)
+    params.pop("limit")
+    if filters["disaster_severity"] != "All":
+        params["severity"] = filters["disaster_severity"]
+
+    try:
+        res = requests.get(f"{api_url}/disasters/stats", params=params)
+        res.raise_for_status()
+        return res.json()
+    except:
+        return None
+
 def fetch_alerts(api_url, filters):
     params = {"severity": filters["alert_severity"], "limit": filters["limit"]}
     try:
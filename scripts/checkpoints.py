@@ -0,0 +1,59 @@
+import os
+import json
+import logging
+import threading
+from typing import Dict, Optional
+
+# -----------------------
+# Config
+# -----------------------
+CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", "data/cache/checkpoints.json")
+
+
+class CheckpointStore:
+    """
+    Small JSON file of per-source high-water marks, e.g.
+    {"reddit:naturaldisasters:disaster": {"created_utc": 1718000000.0, "fullname": "t3_abc"}}.
+
+    Every update rewrites the file through a temp file + rename, so a crash
+    leaves either the old or the new marks, never a torn file. A missing or
+    unreadable file simply means "no checkpoints" (the next run starts cold and
+    the dedup index filters what was already ingested).
+    """
+
+    def __init__(self, path: str = CHECKPOINT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._marks = self._load()
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logging.warning("Ignoring unreadable checkpoint file %s: %s", self.path, e)
+            return {}
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            mark = self._marks.get(key)
+            return dict(mark) if mark else None
+
+    def set(self, key: str, mark: Dict):
+        with self._lock:
+            self._marks[key] = mark
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._marks, f, indent=1, sort_keys=True)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+
+    def all(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {k: dict(v) for k, v in self._marks.items()}
@@ -0,0 +1,175 @@
+import os
+import hashlib
+import logging
+import threading
+from typing import Iterable, List
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # non-POSIX: fall back to in-process locking only
+    fcntl = None
+
+# -----------------------
+# Config
+# -----------------------
+DEDUP_INDEX_PATH = os.getenv("DEDUP_INDEX_PATH", "data/url_index")
+DEDUP_MERGE_THRESHOLD = int(os.getenv("DEDUP_MERGE_THRESHOLD", 50000))  # log entries before folding into base
+
+
+def fingerprint(url: str) -> int:
+    """64-bit fingerprint of a URL (collision odds ~n^2/2^65, negligible at our volumes)."""
+    return int.from_bytes(hashlib.blake2b(url.strip().encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def fingerprints(urls: Iterable[str]) -> np.ndarray:
+    return np.fromiter((fingerprint(u) for u in urls), dtype=np.uint64)
+
+
+class UrlDedupIndex:
+    """
+    On-disk set of URL fingerprints used to skip already-ingested records.
+
+    `base.u64` is a sorted uint64 array that is memory-mapped and probed with
+    a vectorized binary search; `log.u64` is an append-only file of fingerprints
+    added since the last merge, kept sorted in memory. Each add_many() appends
+    and fsyncs the log, so the index persists incrementally; once the log grows
+    past `merge_threshold` it is folded into a new base file (atomic rename).
+    """
+
+    def __init__(self, path: str = DEDUP_INDEX_PATH, merge_threshold: int = DEDUP_MERGE_THRESHOLD):
+        self.path = path
+        self.merge_threshold = merge_threshold
+        os.makedirs(path, exist_ok=True)
+        self.base_path = os.path.join(path, "base.u64")
+        self.log_path = os.path.join(path, "log.u64")
+        self._lock = threading.Lock()
+        self._reload()
+
+    # -----------------------
+    # Storage
+    # -----------------------
+    def _file_state(self):
+        def stat(p):
+            try:
+                st = os.stat(p)
+                return st.st_ino, st.st_size, st.st_mtime_ns
+            except FileNotFoundError:
+                return None
+        return stat(self.base_path), stat(self.log_path)
+
+    def _refresh_if_changed(self):
+        """Pick up appends/merges made by other processes since we last loaded."""
+        if self._file_state() != self._state:
+            self._reload()
+
+    def _reload(self):
+        self._state = self._file_state()
+        if os.path.exists(self.base_path) and os.path.getsize(self.base_path) > 0:
+            self._base = np.memmap(self.base_path, dtype=np.uint64, mode="r")
+        else:
+            self._base = np.empty(0, dtype=np.uint64)
+        if os.path.exists(self.log_path):
+            raw = np.fromfile(self.log_path, dtype=np.uint64)
+            self._log = np.unique(raw)
+        else:
+            self._log = np.empty(0, dtype=np.uint64)
+
+    def _file_lock(self):
+        return _FileLock(os.path.join(self.path, ".lock"))
+
+    @staticmethod
+    def _member(sorted_arr: np.ndarray, fps: np.ndarray) -> np.ndarray:
+        if not len(sorted_arr) or not len(fps):
+            return np.zeros(len(fps), dtype=bool)
+        pos = np.searchsorted(sorted_arr, fps)
+        pos[pos == len(sorted_arr)] = 0
+        return sorted_arr[pos] == fps
+
+    # -----------------------
+    # Public API
+    # -----------------------
+    def contains_many(self, urls: List[str]) -> List[bool]:
+        """Membership for a batch of URLs (empty/None URLs are never 'seen')."""
+        fps = fingerprints(u or "" for u in urls)
+        with self._lock:
+            self._refresh_if_changed()
+            seen = self._member(self._base, fps) | self._member(self._log, fps)
+        return [bool(s) and bool(u) for s, u in zip(seen, urls)]
+
+    def contains(self, url: str) -> bool:
+        return self.contains_many([url])[0]
+
+    def add_many(self, urls: Iterable[str]) -> int:
+        """Record URLs as ingested. Returns how many were new."""
+        fps = np.unique(fingerprints(u for u in urls if u))
+        with self._lock, self._file_lock():
+            self._refresh_if_changed()
+            fps = fps[~(self._member(self._base, fps) | self._member(self._log, fps))]
+            if not len(fps):
+                return 0
+            with open(self.log_path, "ab") as f:
+                fps.tofile(f)
+                f.flush()
+                os.fsync(f.fileno())
+            self._log = np.union1d(self._log, fps)
+            self._state = self._file_state()
+            if len(self._log) >= self.merge_threshold:
+                self._merge()
+        return len(fps)
+
+    def _merge(self):
+        merged = np.union1d(np.asarray(self._base), self._log)
+        tmp = self.base_path + ".tmp"
+        with open(tmp, "wb") as f:
+            merged.tofile(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.base_path)
+        # Entries that are now in base may be dropped from the log; a crash before
+        # this point just leaves harmless duplicates.
+        open(self.log_path, "wb").close()
+        self._reload()
+        logging.info("Dedup index merged: %d fingerprints", len(self._base))
+
+    def bootstrap(self, urls: Iterable[str]) -> int:
+        """Seed an empty index from existing storage (e.g. the Parquet dataset)."""
+        if len(self):
+            return 0
+        return self.add_many(urls)
+
+    def __len__(self):
+        return len(self._base) + len(self._log)
+
+
+class _FileLock:
+    """Cross-process exclusive lock (no-op where fcntl is unavailable)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fh = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            self._fh = open(self.path, "a")
+            fcntl.flock(self._fh, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self._fh is not None:
+            fcntl.flock(self._fh, fcntl.LOCK_UN)
+            self._fh.close()
+            self._fh = None
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_dedup_index(path: str = DEDUP_INDEX_PATH) -> UrlDedupIndex:
+    """Process-wide index per path, shared by the NewsAPI and Reddit ingestion paths."""
+    with _indexes_lock:
+        if path not in _indexes:
+            _indexes[path] = UrlDedupIndex(path)
+        return _indexes[path]
@@ -0,0 +1,223 @@
+import time
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_LOCATION = "India"
+
+
+# -----------------------
+# Location extraction (NER)
+# -----------------------
+def location_from_entities(ents: List[dict]) -> str:
+    locs = [e.get("word") for e in ents if e.get("entity_group") in ("LOC", "GPE")]
+    return locs[0] if locs else DEFAULT_LOCATION
+
+
+def extract_locations_batch(ner, pairs: Iterable[Tuple[Optional[str], Optional[str]]],
+                            batch_size: int = 16) -> List[str]:
+    """
+    Batched equivalent of calling extract_location(a, b) for every (a, b) pair:
+    the non-empty texts go through the NER pipeline `batch_size` at a time and
+    the first LOC/GPE entity of each is mapped back to its input position.
+    """
+    texts = [" ".join(filter(None, pair)) for pair in pairs]
+    results = [DEFAULT_LOCATION] * len(texts)
+    todo = [i for i, t in enumerate(texts) if t]
+    if not todo:
+        return results
+
+    start = time.perf_counter()
+    for i in range(0, len(todo), batch_size):
+        chunk = todo[i:i + batch_size]
+        outs = ner([texts[j] for j in chunk], batch_size=batch_size)
+        for j, ents in zip(chunk, outs):
+            results[j] = location_from_entities(ents)
+    elapsed = time.perf_counter() - start
+    logging.info("NER: %d records in %.2fs (%.1f records/s, batch_size=%d)",
+                 len(todo), elapsed, len(todo) / elapsed if elapsed else 0.0, batch_size)
+    return results
+
+
+# -----------------------
+# Severity (sentiment)
+# -----------------------
+def severity_from_sentiment(out: dict) -> str:
+    label, score = out["label"], float(out["score"])
+    if label == "NEGATIVE" and score > 0.7:
+        return "high"
+    if label == "NEGATIVE":
+        return "medium"
+    return "low"
+
+
+def compute_severities_batch(sentiment, texts: List[str], batch_size: int = 16,
+                             max_tokens: int = 512) -> List[str]:
+    """
+    Severity for every text, in input order. Texts are truncated by the model's
+    tokenizer to `max_tokens` tokens (rather than by characters) and scored
+    `batch_size` at a time; empty texts are "low" without a model call.
+    """
+    results = ["low"] * len(texts)
+    todo = [i for i, t in enumerate(texts) if t]
+    if not todo:
+        return results
+
+    start = time.perf_counter()
+    for i in range(0, len(todo), batch_size):
+        chunk = todo[i:i + batch_size]
+        outs = sentiment([texts[j] for j in chunk], batch_size=batch_size,
+                         truncation=True, max_length=max_tokens)
+        for j, out in zip(chunk, outs):
+            results[j] = severity_from_sentiment(out)
+    elapsed = time.perf_counter() - start
+    logging.info("Severity: %d records in %.2fs (%.1f records/s, batch_size=%d)",
+                 len(todo), elapsed, len(todo) / elapsed if elapsed else 0.0, batch_size)
+    return results
+
+
+# -----------------------
+# Disaster type (zero-shot classification)
+# -----------------------
+HYPOTHESIS_TEMPLATE = "This example is {}."  # the zero-shot pipeline's default
+
+
+def top2_labels(labels: List[str], scores: List[float], threshold: float, secondary: float) -> List[str]:
+    """Up to two labels scoring >= threshold, topped up from those >= secondary; ["unknown"] if none."""
+    combined = []
+    for lbl, sc in zip(labels, scores):
+        if sc >= threshold:
+            combined.append(lbl)
+        if len(combined) == 2:
+            break
+    if len(combined) < 2:
+        for lbl, sc in zip(labels, scores):
+            if sc >= secondary and lbl not in combined:
+                combined.append(lbl)
+            if len(combined) == 2:
+                break
+    return combined if combined else ["unknown"]
+
+
+def token_lengths(tokenizer, texts: List[str], max_length: int = 512) -> List[int]:
+    """Token count of each text as the model will see it (truncated to max_length)."""
+    enc = tokenizer(texts, add_special_tokens=False, truncation=True, max_length=max_length)
+    return [len(ids) for ids in enc["input_ids"]]
+
+
+def token_budget_batches(lengths: List[int], budget: int, per_item: int = 1) -> List[List[int]]:
+    """
+    Group item indices into batches sorted by length, so each batch pads to a
+    similar length. A batch grows while (items * per_item) * longest item stays
+    within `budget` padded tokens; an item longer than the budget gets a batch
+    of its own.
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    batches, current = [], []
+    for i in order:
+        # ascending order: the item being added is the batch's longest
+        if current and (len(current) + 1) * per_item * lengths[i] > budget:
+            batches.append(current)
+            current = []
+        current.append(i)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def classify_top2_batch(classifier, texts: List[str], candidate_labels: List[str], threshold: float,
+                        secondary: float, token_budget: int = 4096, max_tokens: int = 512) -> List[List[str]]:
+    """
+    top2_labels() for every text, in input order. Texts are bucketed by token
+    length (token_budget_batches) so a long article no longer pads a batch of
+    headlines; each text is scored against every label (one NLI pair per
+    label), so a bucket's budget covers len(candidate_labels) pairs per text.
+    """
+    if not texts:
+        return []
+    hypotheses = [HYPOTHESIS_TEMPLATE.format(lbl) for lbl in candidate_labels]
+    hypothesis = max(token_lengths(classifier.tokenizer, hypotheses))
+    lengths = [n + hypothesis + 3 for n in token_lengths(classifier.tokenizer, texts, max_tokens)]  # + [CLS]/[SEP]s
+    results = [None] * len(texts)
+    start = time.perf_counter()
+    for batch in token_budget_batches(lengths, token_budget, per_item=len(candidate_labels)):
+        outs = classifier([texts[i] for i in batch], candidate_labels, multi_label=True,
+                          hypothesis_template=HYPOTHESIS_TEMPLATE, batch_size=len(batch) * len(candidate_labels))
+        if isinstance(outs, dict):
+            outs = [outs]
+        for i, out in zip(batch, outs):
+            results[i] = top2_labels(out["labels"], out["scores"], threshold, secondary)
+    elapsed = time.perf_counter() - start
+    tokens = sum(lengths) * len(candidate_labels)
+    logging.info("Classify: %d records in %.2fs (%.1f records/s, %.0f tokens/s)",
+                 len(texts), elapsed, len(texts) / elapsed if elapsed else 0.0, tokens / elapsed if elapsed else 0.0)
+    return results
+
+
+# -----------------------
+# Disaster type (embedding similarity)
+# -----------------------
+def label_descriptions(labels: List[str], synonyms: Dict[str, str]) -> Dict[str, str]:
+    """'flood' -> 'flood, flash flood, deluge, ...': the label plus its synonyms, embedded as its prototype."""
+    return {lbl: ", ".join([lbl] + [s for s, target in synonyms.items() if target == lbl]) for lbl in labels}
+
+
+def embed_texts(embedder, texts: List[str], token_budget: int = 8192, max_tokens: int = 256) -> np.ndarray:
+    """
+    L2-normalized mean-pooled sentence embeddings (one row per text, input
+    order) from a feature-extraction pipeline's model, batched by token length.
+    """
+    import torch
+
+    tokenizer, model = embedder.tokenizer, embedder.model
+    out = np.zeros((len(texts), model.config.hidden_size), dtype=np.float32)
+    if not texts:
+        return out
+    lengths = token_lengths(tokenizer, texts, max_tokens)
+    with torch.inference_mode():
+        for batch in token_budget_batches([n + 2 for n in lengths], token_budget):
+            enc = tokenizer([texts[i] or "" for i in batch], padding=True, truncation=True,
+                            max_length=max_tokens, return_tensors="pt")
+            hidden = model(**enc).last_hidden_state
+            mask = enc["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+            pooled = (hidden * mask).sum(1) / mask.sum(1).clamp(min=1e-9)
+            out[batch] = torch.nn.functional.normalize(pooled, dim=-1).cpu().numpy()
+    return out
+
+
+class EmbeddingClassifier:
+    """
+    Scores texts against label prototypes embedded once, up front: one
+    forward pass per text instead of one NLI pass per (text, label). A score
+    is the cosine similarity itself, compared against its own cutoffs: unlike
+    MNLI probabilities it does not depend on the other labels, so a text close
+    to none of them stays "unknown".
+    """
+
+    def __init__(self, embedder, descriptions: Dict[str, str]):
+        self.embedder = embedder
+        self.labels = list(descriptions)
+        self.label_matrix = embed_texts(embedder, [descriptions[lbl] for lbl in self.labels])
+
+    def scores(self, texts: List[str]) -> np.ndarray:
+        """Cosine similarity of each text (rows) to each label prototype (columns)."""
+        return embed_texts(self.embedder, texts) @ self.label_matrix.T
+
+    def labels_for(self, sims: np.ndarray, threshold: float, secondary: float) -> List[List[str]]:
+        """top2_labels() of each row of scores(), so cutoffs can be re-tried without re-embedding."""
+        results = []
+        for row in sims:
+            order = np.argsort(-row)
+            results.append(top2_labels([self.labels[i] for i in order], row[order].tolist(), threshold, secondary))
+        return results
+
+    def classify_top2(self, texts: List[str], threshold: float, secondary: float) -> List[List[str]]:
+        if not texts:
+            return []
+        start = time.perf_counter()
+        results = self.labels_for(self.scores(texts), threshold, secondary)
+        elapsed = time.perf_counter() - start
+        logging.info("Classify (embedding): %d records in %.2fs (%.1f records/s)",
+                     len(texts), elapsed, len(texts) / elapsed if elapsed else 0.0)
+        return results
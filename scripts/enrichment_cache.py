@@ -0,0 +1,186 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# -----------------------
+# Config
+# -----------------------
+ENRICHMENT_CACHE_PATH = os.getenv("ENRICHMENT_CACHE_PATH", "data/cache/enrichment.sqlite")
+ENRICHMENT_CACHE_MAX_ENTRIES = int(os.getenv("ENRICHMENT_CACHE_MAX_ENTRIES", 200000))
+ENRICHED_FIELDS = ("disaster_type", "location", "severity")  # model outputs; geo is resolved afterwards
+
+
+def normalize_text(t: str) -> str:
+    if not t:
+        return ""
+    s = t.lower()
+    s = re.sub(r"[^\w\s]", " ", s)
+    s = re.sub(r"\s+", " ", s).strip()
+    return s
+
+
+def config_fingerprint(*parts) -> str:
+    """Short hash of the settings an enrichment depends on (labels, synonyms, thresholds), for the version string."""
+    raw = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12]
+
+
+def content_key(title: str, description: str, content: str, version: str, pipeline: str) -> str:
+    """sha256 of the normalized text fields plus the pipeline that enriched them and its model/config version."""
+    parts = [normalize_text(title), normalize_text(description), normalize_text(content), version, pipeline]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class EnrichmentCache:
+    """
+    SQLite cache of enrichment results keyed by content_key(), so a story that
+    reappears under another URL skips model inference. Keys include the
+    pipeline (NewsAPI and Reddit type and locate differently) and a version
+    covering models and settings. Rows hold disaster_type, location and
+    severity; geocoding is left to the geocode cache, whose negative TTL decides
+    when an unresolved place is retried. When the table grows past
+    `max_entries` the least recently used rows are evicted.
+    """
+
+    def __init__(self, path: str = ENRICHMENT_CACHE_PATH, max_entries: int = ENRICHMENT_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS enrichment (
+                key TEXT PRIMARY KEY,
+                disaster_type TEXT,
+                location TEXT,
+                severity TEXT,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS enrichment_last_used ON enrichment(last_used)")
+        self._conn.commit()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Dict]:
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        if not keys:
+            return found
+        now = time.time()
+        with self._lock:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                rows = self._conn.execute(
+                    "SELECT key, disaster_type, location, severity FROM enrichment "
+                    f"WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for key, dtypes, location, severity in rows:
+                    found[key] = {
+                        "disaster_type": json.loads(dtypes) if dtypes else None,
+                        "location": location,
+                        "severity": severity,
+                    }
+            if found:
+                self._conn.executemany("UPDATE enrichment SET last_used = ? WHERE key = ?",
+                                       [(now, k) for k in found])
+                self._conn.commit()
+        return found
+
+    def put_many(self, items: Dict[str, Dict]):
+        if not items:
+            return
+        now = time.time()
+        rows = []
+        for key, r in items.items():
+            rows.append((key, json.dumps(r.get("disaster_type")), r.get("location"), r.get("severity"), now))
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO enrichment (key, disaster_type, location, severity, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM enrichment").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM enrichment WHERE key IN (SELECT key FROM enrichment ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM enrichment").fetchone()[0]
+
+    def lookup(self, items: List[Dict], version: str, pipeline: str) -> Tuple[List[str], Dict[str, Dict]]:
+        """content_key() of each item, and the cached results among those keys (counted as hits/misses)."""
+        keys = [content_key(it.get("title"), it.get("description"), it.get("content"), version, pipeline)
+                for it in items]
+        results = self.get_many(keys)
+        hits = sum(1 for k in keys if k in results)
+        self.hits += hits
+        self.misses += len(keys) - hits
+        return keys, results
+
+    def enrich(self, items: List[Dict], compute: Callable[[List[Dict]], List[Dict]], version: str,
+               pipeline: str) -> List[Dict]:
+        """
+        Enrichment results for `items` (dicts with title/description/content),
+        one per item in order. Only items whose content is neither cached for
+        this `pipeline` and `version` nor a repeat of an earlier item in the
+        batch are passed to `compute`, which must return one {field: value}
+        dict per item it is given.
+        """
+        keys, results = self.lookup(items, version, pipeline)
+        hits = sum(1 for k in keys if k in results)
+
+        todo = {}
+        for key, it in zip(keys, items):
+            if key not in results and key not in todo:
+                todo[key] = it
+        if todo:
+            computed = compute(list(todo.values()))
+            fresh = {key: {f: r.get(f) for f in ENRICHED_FIELDS} for key, r in zip(todo, computed)}
+            self.put_many(fresh)
+            results.update(fresh)
+
+        total = len(items)
+        logging.info("Enrichment cache: %d/%d hits (%.0f%%), %d computed, %d entries",
+                     hits, total, 100.0 * hits / total if total else 0.0, len(todo), len(self))
+        return [dict(results[k]) for k in keys]
+
+    def stats(self) -> Dict[str, float]:
+        """Totals since this cache was opened (i.e. for the current run)."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "cache_entries": len(self),
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_enrichment_cache() -> EnrichmentCache:
+    """Process-wide enrichment cache, shared by the NewsAPI and Reddit ingestion paths."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = EnrichmentCache()
+        return _cache
@@ -0,0 +1,118 @@
+import os
+import time
+import atexit
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+# -----------------------
+# Config
+# -----------------------
+ENRICH_WORKERS = int(os.getenv("ENRICH_WORKERS", 1))            # 1 = enrich in-process
+ENRICH_TORCH_THREADS = int(os.getenv("ENRICH_TORCH_THREADS", 0))  # per worker; 0 = cores / workers
+ENRICH_SHARD_SIZE = int(os.getenv("ENRICH_SHARD_SIZE", 32))      # records per task
+
+
+def _init_worker(threads: int, warm: Optional[Callable[[], None]]):
+    # Pin intra-op threads before torch spins up its pool, so N workers don't
+    # each grab every core.
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+        torch.set_num_interop_threads(1)
+    except ImportError:
+        pass
+    if warm is not None:
+        warm()
+
+
+def _run_shard(fn: Callable[[List], List], shard: List) -> tuple:
+    start = time.perf_counter()
+    out = fn(shard)
+    return out, os.getpid(), time.perf_counter() - start
+
+
+class EnrichmentPool:
+    """
+    Runs `fn` (a picklable, module-level list -> list function) over records in
+    `workers` spawned processes. Each worker calls `warm` once at start-up (e.g.
+    to load the models) and limits torch to `threads` intra-op threads.
+
+    Records are cut into small shards that idle workers pull from a shared
+    queue, so a worker that falls behind simply takes fewer shards; results
+    are merged back in input order.
+    """
+
+    def __init__(self, fn: Callable[[List], List], workers: int = ENRICH_WORKERS,
+                 threads: int = ENRICH_TORCH_THREADS, shard_size: int = ENRICH_SHARD_SIZE,
+                 warm: Optional[Callable[[], None]] = None):
+        self.fn = fn
+        self.workers = workers
+        self.threads = threads or max(1, (os.cpu_count() or 1) // workers)
+        self.shard_size = shard_size
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),  # fork + torch threads can deadlock
+            initializer=_init_worker,
+            initargs=(self.threads, warm),
+        )
+        self.last_stats = {}
+
+    def map(self, records: List) -> List:
+        if not records:
+            return []
+        start = time.perf_counter()
+        shards = [records[i:i + self.shard_size] for i in range(0, len(records), self.shard_size)]
+        futures = [self._executor.submit(_run_shard, self.fn, shard) for shard in shards]
+        out, per_worker = [], {}
+        for fut in futures:  # submission order = input order
+            res, pid, seconds = fut.result()
+            out.extend(res)
+            w = per_worker.setdefault(pid, {"shards": 0, "records": 0, "busy_seconds": 0.0})
+            w["shards"] += 1
+            w["records"] += len(res)
+            w["busy_seconds"] += seconds
+        elapsed = time.perf_counter() - start
+        self.last_stats = {
+            "records": len(records),
+            "shards": len(shards),
+            "workers": self.workers,
+            "threads_per_worker": self.threads,
+            "seconds": round(elapsed, 3),
+            "records_per_sec": round(len(records) / elapsed, 1) if elapsed else 0.0,
+            "per_worker": {pid: dict(w, busy_seconds=round(w["busy_seconds"], 3)) for pid, w in per_worker.items()},
+        }
+        logging.info("Enrichment pool: %d records in %d shards over %d workers in %.2fs (%.1f records/s)",
+                     len(records), len(shards), len(per_worker), elapsed, self.last_stats["records_per_sec"])
+        return out
+
+    def warm_up(self):
+        """Start every worker (and run its warm-up) now instead of on the first map()."""
+        futures = [self._executor.submit(time.sleep, 0.01) for _ in range(self.workers)]
+        for f in futures:
+            f.result()
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+_pools: Dict[Callable, EnrichmentPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_enrichment_pool(fn: Callable[[List], List], warm: Optional[Callable[[], None]] = None) -> EnrichmentPool:
+    """One pool per function for the life of the process, so workers load their models once."""
+    with _pools_lock:
+        if fn not in _pools:
+            _pools[fn] = EnrichmentPool(fn, warm=warm)
+        return _pools[fn]
+
+
+@atexit.register
+def _shutdown_pools():
+    for pool in _pools.values():
+        pool.close()
@@ -0,0 +1,133 @@
+import os
+import time
+import logging
+from typing import Dict, Iterator, List
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype, is_object_dtype
+from elasticsearch import Elasticsearch, helpers
+
+from metrics import STAGE_SECONDS, STAGE_RECORDS
+from query_cache import invalidate
+
+# -----------------------
+# Config
+# -----------------------
+ES_CHUNK_SIZE = int(os.getenv("ES_CHUNK_SIZE", 500))                          # docs per bulk request
+ES_MAX_CHUNK_BYTES = int(os.getenv("ES_MAX_CHUNK_BYTES", 10 * 1024 * 1024))   # bytes per bulk request
+ES_THREAD_COUNT = int(os.getenv("ES_THREAD_COUNT", 4))                        # 1 = streaming_bulk
+ES_MAX_RETRIES = int(os.getenv("ES_MAX_RETRIES", 3))                          # 429 retries (streaming only)
+CONVERT_BATCH_ROWS = 5000
+MAX_REPORTED_ERRORS = 50
+
+
+# -----------------------
+# Serialization
+# -----------------------
+def _iso_column(s: pd.Series) -> pd.Series:
+    if getattr(s.dt, "tz", None) is not None:
+        s = s.dt.tz_convert("UTC").dt.tz_localize(None)
+        return s.dt.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+    return s.dt.strftime("%Y-%m-%dT%H:%M:%S.%f")
+
+
+def _geo_value(g):
+    if isinstance(g, dict) and g.get("lat") is not None and g.get("lon") is not None:
+        return {"lat": float(g["lat"]), "lon": float(g["lon"])}
+    return None
+
+
+def _object_value(v):
+    """Per-value fallback, only for object columns holding non-JSON types."""
+    if isinstance(v, np.ndarray):
+        return v.tolist()
+    if isinstance(v, (pd.Timestamp, np.datetime64)):
+        return pd.Timestamp(v).isoformat()
+    if hasattr(v, "isoformat"):
+        return v.isoformat()
+    return v
+
+
+def dataframe_to_docs(df: pd.DataFrame) -> List[Dict]:
+    """
+    Convert a frame to JSON-ready ES documents column by column: datetime
+    columns to ISO strings, geo to {"lat", "lon"} floats, arrays to lists and
+    every missing value (NaN/NaT/None) to null.
+    """
+    out = {}
+    for col in df.columns:
+        s = df[col]
+        if is_datetime64_any_dtype(s):
+            s = _iso_column(s)
+        elif col == "geo":
+            s = s.map(_geo_value)
+        elif is_object_dtype(s):
+            s = s.map(_object_value, na_action="ignore")
+        out[col] = s
+    conv = pd.DataFrame(out, index=df.index).astype(object)
+    conv = conv.where(conv.notna(), None)
+    return conv.to_dict("records")
+
+
+def iter_actions(df: pd.DataFrame, index_name: str, id_field: str = "url") -> Iterator[Dict]:
+    """Bulk actions for `df`, converted CONVERT_BATCH_ROWS rows at a time."""
+    for start in range(0, len(df), CONVERT_BATCH_ROWS):
+        for doc in dataframe_to_docs(df.iloc[start:start + CONVERT_BATCH_ROWS]):
+            yield {"_op_type": "index", "_index": index_name, "_id": doc.get(id_field), "_source": doc}
+
+
+# -----------------------
+# Bulk indexing
+# -----------------------
+def index_dataframe(es_client: Elasticsearch, df: pd.DataFrame, index_name: str, id_field: str = "url",
+                    chunk_size: int = ES_CHUNK_SIZE, max_chunk_bytes: int = ES_MAX_CHUNK_BYTES,
+                    thread_count: int = ES_THREAD_COUNT) -> Dict:
+    """
+    Stream `df` into `index_name` and report per-document failures.
+
+    With thread_count > 1 chunks are sent concurrently through parallel_bulk;
+    otherwise streaming_bulk is used (which also retries 429s with backoff).
+    Returns {"success", "failed", "failed_ids", "errors", "seconds", "docs_per_sec"};
+    `errors` holds the first MAX_REPORTED_ERRORS failure details.
+    """
+    start = time.perf_counter()
+    actions = iter_actions(df, index_name, id_field)
+    common = dict(chunk_size=chunk_size, max_chunk_bytes=max_chunk_bytes,
+                  raise_on_error=False, raise_on_exception=False, request_timeout=120)
+    if thread_count > 1:
+        results = helpers.parallel_bulk(es_client, actions, thread_count=thread_count, **common)
+    else:
+        results = helpers.streaming_bulk(es_client, actions, max_retries=ES_MAX_RETRIES, **common)
+
+    success, failed_ids, errors = 0, [], []
+    for ok, item in results:
+        if ok:
+            success += 1
+            continue
+        info = next(iter(item.values())) if isinstance(item, dict) and item else item
+        if not isinstance(info, dict):
+            info = {"error": str(info)}
+        failed_ids.append(info.get("_id"))
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({"_id": info.get("_id"), "status": info.get("status"), "error": info.get("error")})
+    failed = len(failed_ids)
+
+    elapsed = time.perf_counter() - start
+    if success:
+        invalidate(index_name)  # API results cached for this index are now stale
+    STAGE_SECONDS.observe(elapsed, stage="bulk")
+    STAGE_RECORDS.observe(len(df), stage="bulk")
+    result = {
+        "success": success,
+        "failed": failed,
+        "failed_ids": failed_ids,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "docs_per_sec": round(success / elapsed, 1) if elapsed else 0.0,
+    }
+    logging.info("Indexed %d docs into '%s' (%d failed) in %.2fs, %.1f docs/s",
+                 success, index_name, failed, elapsed, result["docs_per_sec"])
+    for err in errors[:5]:
+        logging.warning("Index failure for %s: %s %s", err["_id"], err["status"], err["error"])
+    return result
@@ -1,18 +1,27 @@
 import os
-os.environ["CUDA_VISIBLE_DEVICES"] = ""
-
 import logging
 import re
-import time
+import threading
 from datetime import datetime
 from typing import List, Dict, Optional
 
-import requests
 import pandas as pd
 from dotenv import load_dotenv
-from transformers import pipeline
-from elasticsearch import Elasticsearch, helpers
-from geopy.geocoders import Nominatim
+from elasticsearch import Elasticsearch
+
+from model_registry import registry
+from geocache import get_geocoder
+from enrichment import (extract_locations_batch, compute_severities_batch, classify_top2_batch,
+                        EmbeddingClassifier, label_descriptions)
+from keywords import KeywordMatcher, DISASTER_TYPES, SYNONYMS
+from parquet_store import ParquetStore, DATASET_PATH, COMPACT_MIN_FRAGMENTS
+from dedup_index import get_dedup_index
+from es_indexing import index_dataframe
+from streaming_pipeline import Stage, StreamingPipeline, latency_tracker
+from enrichment_cache import get_enrichment_cache, config_fingerprint, ENRICHED_FIELDS
+from enrichment_pool import get_enrichment_pool, ENRICH_WORKERS
+from newsapi_fetcher import NewsApiFetcher, build_queries
+from metrics import stage, timed_stage, record_run
 
 # -----------------------
 # Config & Logging
@@ -21,68 +30,39 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
 NEWS_API_KEY = os.getenv("NEWS_API_KEY")
-if not NEWS_API_KEY:
-    raise ValueError("NEWS_API_KEY not found in environment/.env")
 
 ES_HOST = os.getenv("ES_HOST", "http://localhost:9200")
 ES_INDEX = os.getenv("ES_INDEX", "disasters")
-PARQUET_PATH = os.getenv("PARQUET_PATH", "data/disasters.parquet")
+PARQUET_PATH = os.getenv("PARQUET_PATH", "data/disasters.parquet")  # legacy single file, migrated on first run
 
+CLASSIFIER_MODE = os.getenv("CLASSIFIER_MODE", "zero-shot")  # "zero-shot" (MNLI) or "embedding"
 CLASSIFY_THRESHOLD = float(os.getenv("CLASSIFY_THRESHOLD", 0.25))
 SECONDARY_THRESHOLD = float(os.getenv("SECONDARY_THRESHOLD", 0.15))
+# embedding mode scores are cosine similarities, not MNLI probabilities: calibrate these
+# with benchmarks/bench_classifier_modes.py --calibrate
+EMBED_CLASSIFY_THRESHOLD = float(os.getenv("EMBED_CLASSIFY_THRESHOLD", 0.35))
+EMBED_SECONDARY_THRESHOLD = float(os.getenv("EMBED_SECONDARY_THRESHOLD", 0.25))
 BATCH_SIZE = int(os.getenv("BATCH_SIZE", 16))
+CLASSIFY_TOKEN_BUDGET = int(os.getenv("CLASSIFY_TOKEN_BUDGET", 4096))  # padded tokens per classifier forward pass
+NER_BATCH_SIZE = int(os.getenv("NER_BATCH_SIZE", BATCH_SIZE))
 PER_DISASTER_FETCH = int(os.getenv("PER_DISASTER_FETCH", 100))
 
-DISASTER_TYPES = [
-    "earthquake", "flood", "cyclone", "wildfire",
-    "landslide", "volcano", "drought", "tsunami"
-]
-
-SYNONYMS = {
-    "quake": "earthquake", "tremor": "earthquake", "aftershock": "earthquake",
-    "seismic": "earthquake", "richter": "earthquake", "shock": "earthquake",
-    "flash flood": "flood", "deluge": "flood", "inundation": "flood",
-    "overflow": "flood", "swamped": "flood", "flooding": "flood", "torrent": "flood",
-    "hurricane": "cyclone", "typhoon": "cyclone", "storm": "cyclone",
-    "superstorm": "cyclone", "gale": "cyclone", "monsoon": "cyclone",
-    "cyclonic": "cyclone", "tropical storm": "cyclone",
-    "bushfire": "wildfire", "forest fire": "wildfire", "wild fire": "wildfire",
-    "firestorm": "wildfire", "blaze": "wildfire", "grassfire": "wildfire",
-    "mudslide": "landslide", "rockslide": "landslide", "debris flow": "landslide",
-    "avalanche": "landslide", "landslip": "landslide", "earth slip": "landslide",
-    "eruption": "volcano", "lava": "volcano", "pyroclastic": "volcano",
-    "magma": "volcano", "ash cloud": "volcano", "volcanic": "volcano",
-    "dry spell": "drought", "water scarcity": "drought", "famine": "drought",
-    "arid": "drought", "desertification": "drought", "heatwave": "drought",
-    "droughts": "drought", "parched": "drought",
-    "tidal wave": "tsunami", "seismic sea wave": "tsunami", "giant wave": "tsunami",
-    "ocean surge": "tsunami", "tsunami waves": "tsunami",
-}
+keyword_matcher = KeywordMatcher(SYNONYMS, DISASTER_TYPES, limit=2)
 
 # -----------------------
-# Initialize clients & pipelines
+# Clients (created lazily so importing this module stays cheap;
+# models come from the shared model_registry)
 # -----------------------
-es = Elasticsearch([ES_HOST])
-if not es.ping():
-    raise ConnectionError(f"Cannot connect to Elasticsearch at {ES_HOST}")
-
-classifier = pipeline("zero-shot-classification",
-                      model="typeform/distilbert-base-uncased-mnli", device=-1)
-
-ner = pipeline("ner",
-               model="dslim/bert-base-NER",
-               aggregation_strategy="simple",
-               device=-1)
-
-sentiment = pipeline("sentiment-analysis",
-                     model="distilbert-base-uncased-finetuned-sst-2-english",
-                     device=-1)
+_es = None
 
-geolocator = Nominatim(
-    user_agent="disaster_monitor",
-    timeout=10,
-    scheme="https",
-)
+def get_es() -> Elasticsearch:
+    global _es
+    if _es is None:
+        client = Elasticsearch([ES_HOST])
+        if not client.ping():
+            raise ConnectionError(f"Cannot connect to Elasticsearch at {ES_HOST}")
+        _es = client
+    return _es
 
 # -----------------------
 # Helper functions
@@ -96,72 +76,45 @@ def normalize_text(t: str) -> str:
     return s
 
 def synonym_keyword_fallback(text: str) -> List[str]:
-    text_l = normalize_text(text)
-    matches = set()
-    for syn in sorted(SYNONYMS.keys(), key=lambda x: -len(x)):
-        if re.search(rf"\b{re.escape(syn)}\b", text_l):
-            matches.add(SYNONYMS[syn])
-    for d in DISASTER_TYPES:
-        if re.search(rf"\b{re.escape(d)}\b", text_l):
-            matches.add(d)
-    return list(matches)[:2]  # top 2
+    return keyword_matcher.match(text)  # top 2
+
+_embedding_classifiers = {}
+_embedding_lock = threading.Lock()
+
+def get_embedding_classifier(labels: List[str]) -> EmbeddingClassifier:
+    """Label prototypes are embedded once per process and reused for every batch."""
+    with _embedding_lock:
+        key = tuple(labels)
+        if key not in _embedding_classifiers:
+            _embedding_classifiers[key] = EmbeddingClassifier(registry.embedder,
+                                                              label_descriptions(labels, SYNONYMS))
+        return _embedding_classifiers[key]
 
 def classify_batch_top2(texts: List[str], candidate_labels: List[str]) -> List[List[str]]:
-    results = []
-    for i in range(0, len(texts), BATCH_SIZE):
-        batch_texts = texts[i:i+BATCH_SIZE]
-        outs = classifier(batch_texts, candidate_labels, multi_label=True, batch_size=BATCH_SIZE)
-        if isinstance(outs, dict):
-            outs = [outs]
-        for out in outs:
-            labels, scores = out["labels"], out["scores"]
-            combined = []
-            for lbl, sc in zip(labels, scores):
-                if sc >= CLASSIFY_THRESHOLD:
-                    combined.append(lbl)
-                if len(combined) == 2:
-                    break
-            if len(combined) < 2:
-                for lbl, sc in zip(labels, scores):
-                    if sc >= SECONDARY_THRESHOLD and lbl not in combined:
-                        combined.append(lbl)
-                    if len(combined) == 2:
-                        break
-            results.append(combined if combined else ["unknown"])
-    return results
+    if CLASSIFIER_MODE == "embedding":
+        return get_embedding_classifier(candidate_labels).classify_top2(texts, EMBED_CLASSIFY_THRESHOLD,
+                                                                        EMBED_SECONDARY_THRESHOLD)
+    if CLASSIFIER_MODE != "zero-shot":
+        raise ValueError(f"Unknown CLASSIFIER_MODE '{CLASSIFIER_MODE}' (expected 'zero-shot' or 'embedding')")
+    # length-bucketed: batches are sized by padded tokens, not item count
+    return classify_top2_batch(registry.classifier, texts, candidate_labels, CLASSIFY_THRESHOLD,
+                               SECONDARY_THRESHOLD, token_budget=CLASSIFY_TOKEN_BUDGET)
 
 def extract_location(title: str, description: str) -> str:
-    text = " ".join(filter(None, [title, description]))
-    if not text:
-        return "India"
-    ents = ner(text)
-    locs = [e.get("word") for e in ents if e.get("entity_group") in ("LOC", "GPE")]
-    return locs[0] if locs else "India"
+    return extract_locations_batch(registry.ner, [(title, description)], batch_size=1)[0]
 
 def get_geo(location: str) -> dict:
     default_geo = {"lat": 20.5937, "lon": 78.9629}  # India default
     if not location:
         return default_geo
-    for _ in range(3):
-        try:
-            loc = geolocator.geocode(location)
-            if loc:
-                return {"lat": loc.latitude, "lon": loc.longitude}
-        except Exception as e:
-            logging.warning("Geo lookup failed for %s: %s", location, e)
-            time.sleep(1)
-    return default_geo
+    return get_geocoder().geocode(location) or default_geo
+
+def get_geo_batch(locations: List[str]) -> List[dict]:
+    default_geo = {"lat": 20.5937, "lon": 78.9629}  # India default
+    return [g or default_geo for g in get_geocoder().geocode_many(locations)]
 
 def compute_severity(text: str) -> str:
-    if not text:
-        return "low"
-    out = sentiment(text[:512])[0]
-    label, score = out["label"], float(out["score"])
-    if label == "NEGATIVE" and score > 0.7:
-        return "high"
-    if label == "NEGATIVE":
-        return "medium"
-    return "low"
+    return compute_severities_batch(registry.sentiment, [text], batch_size=1)[0]
 
 def parse_published_at(s: Optional[str]) -> datetime:
     if not s:
@@ -177,158 +130,326 @@ def parse_published_at(s: Optional[str]) -> datetime:
 # -----------------------
 # Fetch + enrich
 # -----------------------
+def get_fetcher() -> NewsApiFetcher:
+    if not NEWS_API_KEY:
+        raise ValueError("NEWS_API_KEY not found in environment/.env")
+    return NewsApiFetcher(NEWS_API_KEY)
+
 def fetch_for_query(query: str = "disaster", page_size: int = 100) -> List[Dict]:
-    url = "https://newsapi.org/v2/everything"
-    params = {
-        "q": f"{query} AND India",
-        "language": "en",
-        "pageSize": page_size,
-        "sortBy": "publishedAt",
-        "apiKey": NEWS_API_KEY
-    }
-    try:
-        r = requests.get(url, params=params, timeout=30)
-        r.raise_for_status()
-        return r.json().get("articles", [])
-    except Exception as e:
-        logging.error("Failed fetch for %s: %s", query, e)
-        return []
+    return get_fetcher().fetch(build_queries([query]), per_query=page_size)
 
-def enrich_articles(raw_articles: List[Dict]) -> pd.DataFrame:
-    records, texts_to_classify, idxs = [], [], []
-    for i, a in enumerate(raw_articles):
+def fetch_plan(limit: int = None, query: str = None):
+    """(queries, per_query): one query per disaster type and region (NEWS_REGIONS) unless `query` is given."""
+    per_query = limit or PER_DISASTER_FETCH
+    queries = build_queries([query] if query else DISASTER_TYPES)
+    logging.info("Fetching up to %d articles for each of %d queries...", per_query, len(queries))
+    return queries, per_query
+
+def fetch_articles(limit: int = None, query: str = None) -> List[Dict]:
+    """
+    Fetch up to `limit` articles per query. With no explicit query, fan out one
+    query per disaster type and configured region (NEWS_REGIONS), paged and
+    rate-limited concurrently over a single session.
+    """
+    queries, per_query = fetch_plan(limit, query)
+    with timed_stage("fetch") as span:
+        articles = get_fetcher().fetch(queries, per_query=per_query)
+        span["records"] = len(articles)
+    return articles
+
+RECORD_COLUMNS = ["title", "description", "content", "url", "source", "publishedAt",
+                  "disaster_type", "location", "severity", "geo"]
+
+def build_records(raw_articles: List[Dict]) -> List[Dict]:
+    records = []
+    for a in raw_articles:
         title, desc, content = a.get("title", ""), a.get("description", ""), a.get("content", "")
-        combined = " ".join([title, desc, content]).strip()
-        rec = {
+        records.append({
             "title": title, "description": desc, "content": content,
             "url": a.get("url"), "source": (a.get("source") or {}).get("name"),
-            "publishedAt": parse_published_at(a.get("publishedAt"))
-        }
-        # synonym fallback first
-        syns = synonym_keyword_fallback(combined)
-        if syns:
-            rec["disaster_type"] = syns
-        else:
-            rec["disaster_type"] = None
-            texts_to_classify.append(combined or title or desc)
-            idxs.append(i)
-        records.append(rec)
-
-    if texts_to_classify:
-        preds = classify_batch_top2(texts_to_classify, DISASTER_TYPES)
-        for k, idx in enumerate(idxs):
-            records[idx]["disaster_type"] = preds[k]
-
-    # fallback + location + severity + geo
+            "publishedAt": parse_published_at(a.get("publishedAt")),
+            "_combined": " ".join([title, desc, content]).strip(),
+        })
+    return records
+
+# Enrichment steps: each takes and returns a list of records, so they can run
+# over a whole run (enrich_articles) or as stages of the streaming pipeline.
+@stage("keywords")
+def type_by_keywords(records: List[Dict]) -> List[Dict]:
+    # synonym fallback first
+    for rec, syns in zip(records, keyword_matcher.match_many([r["_combined"] for r in records])):
+        rec["_keyword_types"] = syns
+        rec["disaster_type"] = syns or None
+    return records
+
+@stage("classify")
+def classify_records(records: List[Dict]) -> List[Dict]:
+    todo = [rec for rec in records if not rec.get("disaster_type")]
+    if todo:
+        preds = classify_batch_top2([rec["_combined"] or rec["title"] or rec["description"] for rec in todo],
+                                    DISASTER_TYPES)
+        for rec, pred in zip(todo, preds):
+            rec["disaster_type"] = pred
     for rec in records:
         if not rec.get("disaster_type") or rec.get("disaster_type") == ["unknown"]:
-            rec["disaster_type"] = synonym_keyword_fallback(
-                " ".join([rec["title"], rec["description"], rec["content"]])
-            ) or ["unknown"]
-        rec["location"] = extract_location(rec["title"], rec["description"])
-        rec["severity"] = compute_severity(" ".join([rec["title"], rec["description"], rec["content"]]))
-        rec["geo"] = get_geo(rec["location"])
+            # keyword matches were already computed on the same text
+            rec["disaster_type"] = rec["_keyword_types"] or ["unknown"]
+    return records
+
+@stage("ner")
+def locate_records(records: List[Dict]) -> List[Dict]:
+    locations = extract_locations_batch(
+        registry.ner, [(rec["title"], rec["description"]) for rec in records], batch_size=NER_BATCH_SIZE
+    )
+    for rec, location in zip(records, locations):
+        rec["location"] = location
+    return records
+
+@stage("sentiment")
+def score_records(records: List[Dict]) -> List[Dict]:
+    severities = compute_severities_batch(
+        registry.sentiment, [" ".join([rec["title"], rec["description"], rec["content"]]) for rec in records],
+        batch_size=BATCH_SIZE
+    )
+    for rec, severity in zip(records, severities):
+        rec["severity"] = severity
+    return records
+
+@stage("geocode")
+def geocode_records(records: List[Dict]) -> List[Dict]:
+    geos = get_geo_batch([rec["location"] for rec in records])
+    for rec, geo in zip(records, geos):
+        rec["geo"] = geo
+    return records
+
+MODEL_STEPS = [type_by_keywords, classify_records, locate_records, score_records]
+
+def enrich_shard(records: List[Dict]) -> List[Dict]:
+    """Model steps for one shard; runs inside enrichment pool workers."""
+    for step in MODEL_STEPS:
+        records = step(records)
+    return records
+
+def warm_worker():
+    registry.warm_up(["embedder", "ner", "sentiment"] if CLASSIFIER_MODE == "embedding" else None)
+
+def records_to_frame(records: List[Dict]) -> pd.DataFrame:
+    return pd.DataFrame(records, columns=RECORD_COLUMNS)
+
+def run_model_steps(records: List[Dict]) -> List[Dict]:
+    if ENRICH_WORKERS > 1:
+        with timed_stage("enrich_pool", len(records)):
+            return get_enrichment_pool(enrich_shard, warm=warm_worker).map(records)
+    return enrich_shard(records)
+
+def enrichment_version() -> str:
+    """Everything the cached model outputs depend on besides the text."""
+    embed = (EMBED_CLASSIFY_THRESHOLD, EMBED_SECONDARY_THRESHOLD) if CLASSIFIER_MODE == "embedding" else None
+    config = config_fingerprint(DISASTER_TYPES, SYNONYMS, CLASSIFY_THRESHOLD, SECONDARY_THRESHOLD, embed)
+    return f"{registry.version()};classifier_mode={CLASSIFIER_MODE};config={config}"
 
-    df = pd.DataFrame(records)
-    return df[["title","description","content","url","source","publishedAt","disaster_type","location","severity","geo"]]
+def enrich_articles(raw_articles: List[Dict]) -> pd.DataFrame:
+    records = build_records(raw_articles)
+    # only content not seen before (under any URL) reaches the models
+    results = get_enrichment_cache().enrich(records, run_model_steps, enrichment_version(), "newsapi")
+    for rec, res in zip(records, results):
+        rec.update(res)
+    # geocoding runs here, in one process, so the Nominatim rate limit and the geocode
+    # cache (with its negative TTL) are shared; the India fallback is never cached
+    records = geocode_records(records)
+    logging.info("Geocode cache: %s", get_geocoder().stats())
+    return records_to_frame(records)
 
 # -----------------------
-# Parquet merge & dedup
+# Parquet persistence (append-only, partitioned by publish date)
 # -----------------------
-def append_to_parquet(new_df: pd.DataFrame, path: str):
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    if os.path.exists(path):
-        try:
-            existing = pd.read_parquet(path)
-            combined = pd.concat([existing, new_df], ignore_index=True)
-            combined.sort_values("publishedAt", ascending=False, inplace=True)
-            combined = combined.drop_duplicates(subset=["url"], keep="first")
-            combined.to_parquet(path, index=False)
-            return combined, existing.shape[0], new_df.shape[0]
-        except Exception as e:
-            logging.error("Failed merging parquet: %s", e)
-            new_df.to_parquet(path, index=False)
-            return new_df, 0, new_df.shape[0]
-    else:
-        new_df.to_parquet(path, index=False)
-        return new_df, 0, new_df.shape[0]
+_store = None
+
+def get_store() -> ParquetStore:
+    global _store
+    if _store is None:
+        _store = ParquetStore(DATASET_PATH)
+        _store.import_legacy_file(PARQUET_PATH)
+    return _store
+
+def append_to_parquet(new_df: pd.DataFrame, store: ParquetStore = None):
+    """Write new records as fresh fragments; dedup by URL happens at compaction time."""
+    store = store or get_store()
+    with timed_stage("parquet", len(new_df)):
+        files = store.append(new_df)
+    if store.partitions_to_compact(COMPACT_MIN_FRAGMENTS):  # the threshold is per partition
+        store.compact_in_background(COMPACT_MIN_FRAGMENTS)
+    return files, new_df.shape[0]
 
 # -----------------------
 # Elasticsearch indexing
 # -----------------------
 def index_into_es(df: pd.DataFrame, es_client: Elasticsearch, index_name: str):
-    actions = []
-    for _, r in df.iterrows():
-        _id = r.get("url")
-        source = r.to_dict()
-        for k, v in source.items():
-            if isinstance(v, list):
-                source[k] = v
-            elif pd.isna(v):
-                source[k] = None
-            elif isinstance(v, (pd.Timestamp, datetime)):
-                source[k] = v.isoformat()
-            elif isinstance(v, bool):
-                source[k] = bool(v)
-            elif isinstance(v, (int, float, str, dict)):
-                source[k] = v
-            else:
-                source[k] = str(v)
-        actions.append({
-            "_op_type": "index",
-            "_index": index_name,
-            "_id": _id,
-            "_source": source
-        })
-    success, _ = helpers.bulk(es_client, actions, stats_only=True, request_timeout=120)
-    return success
+    result = index_dataframe(es_client, df, index_name)
+    return result["success"]
 
 # -----------------------
 # Main run
 # -----------------------
-def main(limit: int = None, query: str = None):
+def open_dedup_index():
+    dedup = get_dedup_index()
+    if not len(dedup):
+        try:
+            dedup.bootstrap(get_store().urls())
+        except Exception as e:
+            logging.warning("Could not read existing parquet dataset: %s", e)
+    logging.info("Dedup index holds %d URLs.", len(dedup))
+    return dedup
+
+def filter_new(raw: List[Dict], dedup) -> List[Dict]:
+    seen = dedup.contains_many([a.get("url") for a in raw])
+    new_raw, batch_urls = [], set()
+    for a, was_seen in zip(raw, seen):
+        if not was_seen and a.get("url") not in batch_urls:
+            new_raw.append(a)
+            batch_urls.add(a.get("url"))
+    return new_raw
+
+def main(limit: int = None, query: str = None, streaming: bool = False, profile: bool = None):
     """
     Fetch & index news articles.
-    :param limit: max number of articles to fetch
-    :param query: search query
+    :param limit: max number of articles to fetch per query
+    :param query: search query (default: one query per disaster type)
+    :param streaming: run through the staged streaming pipeline (see run_streaming)
+    :param profile: stack-sample the run (default: PROFILE_RUNS)
+    :return: run summary {"fetched", "new", "indexed", "failed"} (pipeline stats when streaming)
+
+    Every run appends a JSON summary with per-stage timings to METRICS_RUN_LOG.
     """
-    query = query or "disaster"
-    page_size = limit or PER_DISASTER_FETCH  # fallback to default if not provided
+    with record_run("newsapi-streaming" if streaming else "newsapi", profile) as run:
+        run["result"] = run_streaming(limit=limit, query=query) if streaming else run_batch(limit=limit, query=query)
+    return run["result"]
 
+def run_batch(limit: int = None, query: str = None) -> Dict:
     all_new_records = []
-    seen_urls = set()
-    if os.path.exists(PARQUET_PATH):
-        try:
-            existing = pd.read_parquet(PARQUET_PATH)
-            seen_urls = set(existing["url"].dropna().tolist())
-            logging.info("Found existing parquet with %d records.", len(seen_urls))
-        except Exception as e:
-            logging.warning("Could not read existing parquet: %s", e)
+    dedup = open_dedup_index()
 
-    logging.info("Fetching up to %d articles for query '%s'...", page_size, query)
-    raw = fetch_for_query(query, page_size=page_size)
-    new_raw = [a for a in raw if a.get("url") not in seen_urls]
+    raw = fetch_articles(limit=limit, query=query)
+    new_raw = filter_new(raw, dedup)
 
+    summary = {"fetched": len(raw), "new": len(new_raw), "indexed": 0, "failed": 0}
     if not new_raw:
         logging.info("No new articles found. Exiting.")
-        return
+        return summary
 
     logging.info("Enriching %d articles...", len(new_raw))
     df_new = enrich_articles(new_raw)
     df_new = df_new.drop_duplicates(subset=["url"])
     all_new_records.append(df_new)
-    seen_urls.update(df_new["url"].dropna().tolist())
 
     new_df = pd.concat(all_new_records, ignore_index=True)
     logging.info("Total new enriched records: %d", new_df.shape[0])
 
-    combined_df, existing_count, new_count = append_to_parquet(new_df, PARQUET_PATH)
-    logging.info("Parquet updated: existing=%d, new_added=%d, total_after=%d",
-                 existing_count, new_count, combined_df.shape[0])
+    files, new_count = append_to_parquet(new_df)
+    logging.info("Parquet updated: new_added=%d in %d fragment(s)", new_count, len(files))
 
     logging.info("Indexing %d new docs into Elasticsearch '%s'...", new_df.shape[0], ES_INDEX)
-    n_indexed = index_into_es(new_df, es, ES_INDEX)
-    logging.info("Indexed %d documents.", n_indexed)
+    result = index_dataframe(get_es(), new_df, ES_INDEX)
+    logging.info("Indexed %d documents.", result["success"])
+    failed = set(result["failed_ids"])
+    dedup.add_many([u for u in new_df["url"].dropna().tolist() if u not in failed])
+    summary.update(indexed=result["success"], failed=result["failed"])
+    return summary
+
+# -----------------------
+# Streaming run
+# -----------------------
+def parse_stage_workers(spec: str) -> Dict[str, int]:
+    """'index=2,geocode=1' -> {"index": 2, "geocode": 1}"""
+    workers = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, n = part.partition("=")
+        workers[name.strip()] = int(n)
+    return workers
+
+PIPELINE_WORKERS = {"cache": 1, "keywords": 1, "classify": 1, "ner": 1, "severity": 1,
+                    "cache_store": 1, "geocode": 1, "persist": 1, "index": 2}
+PIPELINE_WORKERS.update(parse_stage_workers(os.getenv("PIPELINE_WORKERS", "")))
+
+def uncached(step):
+    """Run an enrichment step only on the records the enrichment cache had no result for."""
+    def run(records: List[Dict]) -> List[Dict]:
+        todo = [rec for rec in records if not rec.get("_cached")]
+        if todo:
+            step(todo)  # steps update records in place
+        return records
+    return run
+
+def run_streaming(limit: int = None, query: str = None) -> Dict:
+    """
+    Same work as main(), but every record flows through bounded per-stage queues
+    (cache -> keywords -> classify -> ner -> severity -> cache_store -> geocode ->
+    persist -> index), so documents become searchable a few seconds after their
+    NewsAPI page arrives and memory is capped by the queue sizes rather than the
+    size of the run. Pages enter the pipeline as they are fetched.
+    """
+    dedup = open_dedup_index()
+    es_client = get_es()
+    cache, version = get_enrichment_cache(), enrichment_version()
+    _, observe, latency = latency_tracker()  # measured from each article's _fetched_at (page arrival)
+    fetched = 0
+
+    def fetch():
+        nonlocal fetched
+        queries, per_query = fetch_plan(limit, query)
+        with timed_stage("fetch") as span:
+            for page in get_fetcher().iter_pages(queries, per_query):
+                fetched += len(page)
+                new_raw = filter_new(page, dedup)
+                records = build_records(new_raw)
+                for a, rec in zip(new_raw, records):
+                    rec["_fetched_at"] = a["_fetched_at"]
+                yield from records
+            span["records"] = fetched
+
+    def lookup(batch):
+        keys, found = cache.lookup(batch, version, "newsapi")
+        for rec, key in zip(batch, keys):
+            rec["_cache_key"] = key
+            if key in found:
+                rec.update(found[key], _cached=True)
+        return batch
+
+    def store(batch):
+        cache.put_many({rec["_cache_key"]: {f: rec.get(f) for f in ENRICHED_FIELDS}
+                        for rec in batch if not rec.get("_cached")})
+        return batch
+
+    def persist(batch):
+        append_to_parquet(records_to_frame(batch))
+        return batch
+
+    def index(batch):
+        result = index_dataframe(es_client, records_to_frame(batch), ES_INDEX, thread_count=1)
+        failed = set(result["failed_ids"])
+        dedup.add_many([rec["url"] for rec in batch if rec["url"] and rec["url"] not in failed])
+        observe(batch)
+        return batch
+
+    stage_fns = [("cache", lookup, 64), ("keywords", uncached(type_by_keywords), 64),
+                 ("classify", uncached(classify_records), 64), ("ner", uncached(locate_records), NER_BATCH_SIZE),
+                 ("severity", uncached(score_records), BATCH_SIZE), ("cache_store", store, 64),
+                 ("geocode", geocode_records, 64), ("persist", persist, 256), ("index", index, 256)]
+    stages = [Stage(name, fn, workers=PIPELINE_WORKERS.get(name, 1), batch_size=size)
+              for name, fn, size in stage_fns]
+    stats = StreamingPipeline(fetch(), stages).run()
+    stats["fetched"] = fetched
+    stats["enrichment_cache"] = cache.stats()
+    stats["fetch_to_index_latency"] = latency()
+    logging.info("Fetch-to-index latency: %s", stats["fetch_to_index_latency"])
+    return stats
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    parser = argparse.ArgumentParser(description="Fetch, enrich and index NewsAPI articles.")
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--query", default=None)
+    parser.add_argument("--streaming", action="store_true", help="use the staged streaming pipeline")
+    parser.add_argument("--profile", action="store_true", default=None, help="stack-sample the run (PROFILE_DIR)")
+    args = parser.parse_args()
+    main(limit=args.limit, query=args.query, streaming=args.streaming, profile=args.profile)
@@ -0,0 +1,236 @@
+import os
+import re
+import math
+import bisect
+import difflib
+import logging
+import threading
+from array import array
+from collections import Counter
+from typing import Dict, List, Optional
+
+# -----------------------
+# Config
+# -----------------------
+GAZETTEER_PATH = os.getenv(
+    "GAZETTEER_PATH",
+    os.path.join(os.path.dirname(__file__), "..", "data", "gazetteer", "places.tsv"),
+)
+FUZZY_CUTOFF = float(os.getenv("GAZETTEER_FUZZY_CUTOFF", 0.85))
+FUZZY_MIN_LENGTH = 5
+FUZZY_MAX_CANDIDATES = 50  # keys sharing the most trigrams with the query that difflib gets to score
+
+# Preference when several places share a name or alias: countries, then states, then capitals, ...
+FEATURE_RANK = {"PCLI": 0, "ADM1": 1, "PPLC": 2, "PPLA": 3, "ADM2": 4, "PPL": 5}
+LOCATION_SUFFIXES = ("district", "state", "city", "region", "province", "division")
+EARTH_RADIUS_KM = 6371.0088
+
+
+def normalize_name(name: str) -> str:
+    if not name:
+        return ""
+    s = name.lower().replace("&", " and ")
+    s = re.sub(r"[^\w\s]", " ", s)
+    s = re.sub(r"\s+", " ", s).strip()
+    return s
+
+
+def _to_xyz(lat: float, lon: float):
+    la, lo = math.radians(lat), math.radians(lon)
+    return math.cos(la) * math.cos(lo), math.cos(la) * math.sin(lo), math.sin(la)
+
+
+def _trigrams(key: str) -> set:
+    padded = f" {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class Gazetteer:
+    """
+    Offline place-name resolver loaded from a GeoNames-style TSV
+    (name, asciiname, alternatenames, latitude, longitude, feature_code, country_code).
+
+    Names and aliases live in one sorted key list with a parallel array of place ids,
+    so forward lookups are a bisect, and fuzzy lookups only score the keys a trigram
+    index turns up. Reverse lookups go through a 3-D KD-tree over unit-sphere
+    coordinates, which makes chord distance order match great-circle order.
+    """
+
+    def __init__(self, path: str = GAZETTEER_PATH):
+        self.path = path
+        self.names: List[str] = []
+        self.country_codes: List[str] = []
+        self.lat = array("d")
+        self.lon = array("d")
+        self._keys: List[str] = []
+        self._key_place = array("I")
+        self._trigram_keys: Dict[str, array] = {}
+        self._kd_point = array("i")
+        self._kd_left = array("i")
+        self._kd_right = array("i")
+        self._xyz = array("d")
+        self._kd_root = -1
+        self._load()
+        self._build_kdtree()
+
+    # -----------------------
+    # Loading
+    # -----------------------
+    def _load(self):
+        entries: Dict[str, tuple] = {}
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip() or line.startswith("#"):
+                    continue
+                cols = line.rstrip("\n").split("\t")
+                name, asciiname, alternates, lat, lon, fcode, cc = cols[:7]
+                pid = len(self.names)
+                self.names.append(name)
+                self.country_codes.append(cc)
+                self.lat.append(float(lat))
+                self.lon.append(float(lon))
+                rank = FEATURE_RANK.get(fcode, len(FEATURE_RANK))
+                for alias in [name, asciiname] + alternates.split(","):
+                    key = normalize_name(alias)
+                    if key and (key not in entries or rank < entries[key][0]):
+                        entries[key] = (rank, pid)
+        self._keys = sorted(entries)
+        self._key_place = array("I", (entries[k][1] for k in self._keys))
+        for i, key in enumerate(self._keys):
+            for gram in _trigrams(key):
+                self._trigram_keys.setdefault(gram, array("I")).append(i)
+        logging.info("Loaded gazetteer with %d places / %d names from %s",
+                     len(self.names), len(self._keys), self.path)
+
+    def _build_kdtree(self):
+        n = len(self.names)
+        for i in range(n):
+            self._xyz.extend(_to_xyz(self.lat[i], self.lon[i]))
+        self._kd_point = array("i", [-1] * n)
+        self._kd_left = array("i", [-1] * n)
+        self._kd_right = array("i", [-1] * n)
+        counter = [0]
+
+        def build(ids, depth):
+            if not ids:
+                return -1
+            axis = depth % 3
+            ids.sort(key=lambda p: self._xyz[3 * p + axis])
+            mid = len(ids) // 2
+            node = counter[0]
+            counter[0] += 1
+            self._kd_point[node] = ids[mid]
+            self._kd_left[node] = build(ids[:mid], depth + 1)
+            self._kd_right[node] = build(ids[mid + 1:], depth + 1)
+            return node
+
+        self._kd_root = build(list(range(n)), 0)
+
+    # -----------------------
+    # Forward lookup
+    # -----------------------
+    def _exact(self, key: str) -> Optional[int]:
+        i = bisect.bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            return self._key_place[i]
+        return None
+
+    def _fuzzy(self, key: str) -> Optional[int]:
+        """
+        Closest key by difflib ratio, scoring only the keys that share the most
+        trigrams with `key` and whose length can reach FUZZY_CUTOFF at all
+        (the ratio is at most 2 * min(len) / (len + len)).
+        """
+        lo = len(key) * FUZZY_CUTOFF / (2 - FUZZY_CUTOFF)
+        hi = len(key) * (2 - FUZZY_CUTOFF) / FUZZY_CUTOFF
+        shared = Counter()
+        for gram in _trigrams(key):
+            shared.update(self._trigram_keys.get(gram, ()))
+        ranked = sorted((i for i in shared if lo <= len(self._keys[i]) <= hi), key=lambda i: (-shared[i], i))
+        close = difflib.get_close_matches(key, [self._keys[i] for i in ranked[:FUZZY_MAX_CANDIDATES]],
+                                          n=1, cutoff=FUZZY_CUTOFF)
+        return self._exact(close[0]) if close else None
+
+    def _place(self, pid: int) -> dict:
+        return {"lat": self.lat[pid], "lon": self.lon[pid]}
+
+    def lookup_id(self, location: str, fuzzy: bool = True) -> Optional[int]:
+        key = normalize_name(location)
+        if not key:
+            return None
+        candidates = [key]
+        words = key.split()
+        if len(words) > 1 and words[-1] in LOCATION_SUFFIXES:
+            candidates.append(" ".join(words[:-1]))
+        if words[:2] == ["city", "of"]:
+            candidates.append(" ".join(words[2:]))
+        for cand in candidates:
+            pid = self._exact(cand)
+            if pid is not None:
+                return pid
+        if fuzzy and len(key) >= FUZZY_MIN_LENGTH:
+            return self._fuzzy(key)
+        return None
+
+    def lookup(self, location: str, fuzzy: bool = True) -> Optional[dict]:
+        """Resolve a place name or alias to {"lat", "lon"}, or None if unknown."""
+        pid = self.lookup_id(location, fuzzy=fuzzy)
+        return None if pid is None else self._place(pid)
+
+    # -----------------------
+    # Reverse lookup
+    # -----------------------
+    def reverse(self, lat: float, lon: float) -> Optional[dict]:
+        """Nearest gazetteer place to a coordinate, with its great-circle distance."""
+        if self._kd_root < 0:
+            return None
+        q = _to_xyz(lat, lon)
+        best = [-1, float("inf")]
+
+        def search(node, depth):
+            if node < 0:
+                return
+            p = self._kd_point[node]
+            px = self._xyz[3 * p:3 * p + 3]
+            d2 = (px[0] - q[0]) ** 2 + (px[1] - q[1]) ** 2 + (px[2] - q[2]) ** 2
+            if d2 < best[1]:
+                best[0], best[1] = p, d2
+            axis = depth % 3
+            diff = q[axis] - px[axis]
+            near, far = (self._kd_left[node], self._kd_right[node]) if diff < 0 else \
+                        (self._kd_right[node], self._kd_left[node])
+            search(near, depth + 1)
+            if diff * diff < best[1]:
+                search(far, depth + 1)
+
+        search(self._kd_root, 0)
+        pid = best[0]
+        chord = math.sqrt(best[1])
+        return {
+            "name": self.names[pid],
+            "country_code": self.country_codes[pid],
+            "lat": self.lat[pid],
+            "lon": self.lon[pid],
+            "distance_km": 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2)),
+        }
+
+    def __len__(self):
+        return len(self.names)
+
+
+_gazetteer = None
+_gazetteer_loaded = False
+_gazetteer_lock = threading.Lock()
+
+
+def get_gazetteer() -> Optional[Gazetteer]:
+    """Process-wide gazetteer, or None if the bundled place file is missing."""
+    global _gazetteer, _gazetteer_loaded
+    with _gazetteer_lock:
+        if not _gazetteer_loaded:
+            _gazetteer_loaded = True
+            if os.path.exists(GAZETTEER_PATH):
+                _gazetteer = Gazetteer()
+            else:
+                logging.warning("Gazetteer file not found at %s; using remote geocoding only.", GAZETTEER_PATH)
+        return _gazetteer
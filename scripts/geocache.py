@@ -0,0 +1,259 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from geopy.geocoders import Nominatim
+
+from gazetteer import Gazetteer, get_gazetteer
+
+# -----------------------
+# Config
+# -----------------------
+GEOCACHE_PATH = os.getenv("GEOCACHE_PATH", "data/cache/geocode.sqlite")
+GEOCACHE_MAX_ENTRIES = int(os.getenv("GEOCACHE_MAX_ENTRIES", 50000))
+GEOCACHE_NEGATIVE_TTL = int(os.getenv("GEOCACHE_NEGATIVE_TTL", 7 * 24 * 3600))  # seconds
+NOMINATIM_MIN_INTERVAL = float(os.getenv("NOMINATIM_MIN_INTERVAL", 1.0))  # Nominatim policy: 1 req/s
+NOMINATIM_RETRIES = 3
+
+
+def normalize_location(location: str) -> str:
+    """Cache key for a location string: lowercase, punctuation and extra spaces removed."""
+    if not location:
+        return ""
+    s = location.lower()
+    s = re.sub(r"[^\w\s]", " ", s)
+    s = re.sub(r"\s+", " ", s).strip()
+    return s
+
+
+# -----------------------
+# Rate limiting
+# -----------------------
+class RateLimiter:
+    """Blocks callers so that at most one request is issued per `min_interval` seconds."""
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            if now < self._next_at:
+                time.sleep(self._next_at - now)
+                now = self._next_at
+            self._next_at = now + self.min_interval
+
+
+# -----------------------
+# On-disk cache
+# -----------------------
+class GeoCache:
+    """
+    SQLite-backed geocode cache keyed by normalized location string.
+
+    Positive results never expire; negative results (the resolver found nothing)
+    expire after `negative_ttl` seconds. When the table grows past `max_entries`
+    the least recently used rows are evicted.
+    """
+
+    def __init__(self, path: str = GEOCACHE_PATH, max_entries: int = GEOCACHE_MAX_ENTRIES,
+                 negative_ttl: int = GEOCACHE_NEGATIVE_TTL):
+        self.path = path
+        self.max_entries = max_entries
+        self.negative_ttl = negative_ttl
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS geocode (
+                key TEXT PRIMARY KEY,
+                lat REAL,
+                lon REAL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS geocode_last_used ON geocode(last_used)")
+        self._conn.commit()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Optional[dict]]:
+        """
+        Return cached entries for `keys`. Keys that are absent (or whose negative
+        entry has expired) are left out; cached negatives map to None.
+        """
+        keys = list(keys)
+        found = {}
+        if not keys:
+            return found
+        now = time.time()
+        with self._lock:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, lat, lon, created_at FROM geocode WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for key, lat, lon, created_at in rows:
+                    if lat is None:
+                        if now - created_at > self.negative_ttl:
+                            continue
+                        found[key] = None
+                    else:
+                        found[key] = {"lat": lat, "lon": lon}
+            if found:
+                self._conn.executemany("UPDATE geocode SET last_used = ? WHERE key = ?",
+                                       [(now, k) for k in found])
+                self._conn.commit()
+        return found
+
+    def put_many(self, items: Dict[str, Optional[dict]]):
+        if not items:
+            return
+        now = time.time()
+        rows = [(k, g["lat"] if g else None, g["lon"] if g else None, now, now) for k, g in items.items()]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO geocode (key, lat, lon, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM geocode").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM geocode WHERE key IN (SELECT key FROM geocode ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM geocode").fetchone()[0]
+
+
+# -----------------------
+# Cached geocoder
+# -----------------------
+class CachedGeocoder:
+    """
+    Resolves location strings through the offline gazetteer first, then the
+    on-disk cache, and Nominatim last. Lookups are deduplicated per batch and
+    Nominatim requests are rate limited. `geolocator` replaces Nominatim with
+    anything that has a geopy-style geocode(query) method (tests, benchmarks).
+    """
+
+    def __init__(self, cache: GeoCache = None, rate_limiter: RateLimiter = None,
+                 gazetteer: Optional[Gazetteer] = None, geolocator=None):
+        self.cache = cache if cache is not None else GeoCache()  # an empty GeoCache is falsy
+        self.rate_limiter = rate_limiter or RateLimiter(NOMINATIM_MIN_INTERVAL)
+        self.gazetteer = gazetteer if gazetteer is not None else get_gazetteer()
+        self._geolocator = geolocator
+        self.gazetteer_hits = 0
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.remote_calls = 0
+        self.remote_errors = 0
+
+    @property
+    def geolocator(self) -> Nominatim:
+        if self._geolocator is None:
+            self._geolocator = Nominatim(user_agent="disaster_monitor", timeout=10, scheme="https")
+        return self._geolocator
+
+    @geolocator.setter
+    def geolocator(self, geolocator):
+        self._geolocator = geolocator
+
+    def _resolve_remote(self, location: str) -> Tuple[bool, Optional[dict]]:
+        """Returns (ok, geo). ok is False when every attempt raised, so the miss is not cached."""
+        for attempt in range(NOMINATIM_RETRIES):
+            if attempt:
+                time.sleep(1)  # back off between attempts, not after the last one
+            self.rate_limiter.wait()
+            self.remote_calls += 1
+            try:
+                loc = self.geolocator.geocode(location)
+                if loc:
+                    return True, {"lat": loc.latitude, "lon": loc.longitude}
+                return True, None
+            except Exception as e:
+                self.remote_errors += 1
+                logging.warning("Geo lookup failed for %s: %s", location, e)
+        return False, None
+
+    def geocode_many(self, locations: List[str]) -> List[Optional[dict]]:
+        """Geocode a batch of location strings; returns one geo dict (or None) per input."""
+        keys = [normalize_location(loc) for loc in locations]
+        originals = {}
+        for loc, key in zip(locations, keys):
+            if key and key not in originals:
+                originals[key] = loc
+
+        resolved = {}
+        if self.gazetteer is not None:
+            for key, loc in originals.items():
+                geo = self.gazetteer.lookup(loc)
+                if geo is not None:
+                    resolved[key] = geo
+                    self.gazetteer_hits += 1
+
+        cached = self.cache.get_many(k for k in originals if k not in resolved)
+        resolved.update(cached)
+        for key in cached:
+            if cached[key] is None:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+
+        fresh = {}
+        for key, loc in originals.items():
+            if key in resolved:
+                continue
+            self.misses += 1
+            ok, geo = self._resolve_remote(loc)
+            resolved[key] = geo
+            if ok:
+                fresh[key] = geo
+        self.cache.put_many(fresh)
+
+        return [resolved.get(key) if key else None for key in keys]
+
+    def geocode(self, location: str) -> Optional[dict]:
+        return self.geocode_many([location])[0]
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.gazetteer_hits + self.hits + self.negative_hits + self.misses
+        return {
+            "gazetteer_hits": self.gazetteer_hits,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "hit_ratio": (lookups - self.misses) / lookups if lookups else 0.0,
+            "remote_calls": self.remote_calls,
+            "remote_errors": self.remote_errors,
+            "cache_entries": len(self.cache),
+        }
+
+
+_geocoder = None
+_geocoder_lock = threading.Lock()
+
+
+def get_geocoder() -> CachedGeocoder:
+    """Process-wide cached geocoder."""
+    global _geocoder
+    with _geocoder_lock:
+        if _geocoder is None:
+            _geocoder = CachedGeocoder()
+        return _geocoder
@@ -0,0 +1,305 @@
+import os
+import json
+import time
+import random
+import signal
+import logging
+import argparse
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+
+import fetch_and_index
+import reddit
+from model_registry import registry
+from geocache import get_geocoder
+from enrichment_cache import get_enrichment_cache
+from enrichment_pool import get_enrichment_pool, ENRICH_WORKERS
+from metrics import metrics
+
+# -----------------------
+# Config
+# -----------------------
+NEWS_INTERVAL = float(os.getenv("NEWS_INTERVAL", 900))        # seconds between NewsAPI runs
+REDDIT_INTERVAL = float(os.getenv("REDDIT_INTERVAL", 600))    # seconds between Reddit runs
+SCHEDULE_JITTER = float(os.getenv("SCHEDULE_JITTER", 0.1))    # +/- fraction of the interval
+NEWS_LIMIT = int(os.getenv("NEWS_LIMIT", fetch_and_index.PER_DISASTER_FETCH))
+REDDIT_LIMIT = int(os.getenv("REDDIT_LIMIT", 100))
+DAEMON_STATUS_HOST = os.getenv("DAEMON_STATUS_HOST", "127.0.0.1")
+DAEMON_STATUS_PORT = int(os.getenv("DAEMON_STATUS_PORT", 8790))
+SHUTDOWN_TIMEOUT = float(os.getenv("DAEMON_SHUTDOWN_TIMEOUT", 300))  # wait for in-flight runs
+
+
+def _iso(ts: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat() if ts else None
+
+
+class Job:
+    """
+    One ingestion source on its own schedule. Runs happen every `interval`
+    seconds (+/- `jitter` of it, so sources don't stay in lock-step); a tick
+    that comes due while the previous run is still going is skipped, not
+    queued, and a manual trigger during a run is refused the same way.
+
+    Jobs given the same `run_lock` never run at the same time: a job that
+    comes due while another holds it waits for that run to finish, and does
+    not start at all if `stop` was set in the meantime.
+    """
+
+    def __init__(self, name: str, fn: Callable[[], Optional[Dict]], interval: float, jitter: float = SCHEDULE_JITTER,
+                 run_lock: Optional[threading.Lock] = None, stop: Optional[threading.Event] = None):
+        self.name = name
+        self.fn = fn
+        self.interval = interval
+        self.jitter = jitter
+        self.run_lock = run_lock
+        self.stop = stop
+        self.waiting = False
+        self._running = threading.Lock()
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.last_started = None
+        self.last_finished = None
+        self.last_duration = None
+        self.last_status = None
+        self.last_error = None
+        self.last_result = None
+        self.next_run = time.time()
+
+    def _delay(self) -> float:
+        return max(1.0, self.interval * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    def run_once(self) -> bool:
+        """Run now unless a run is already in progress. Returns False if skipped."""
+        if not self._running.acquire(blocking=False):
+            self.skipped += 1
+            logging.warning("Job %s still running; skipping this run.", self.name)
+            return False
+        try:
+            with self._exclusive():
+                if self.stop is not None and self.stop.is_set():
+                    logging.info("Job %s not started: shutting down.", self.name)
+                    return False
+                self._run()
+        finally:
+            self._running.release()
+        return True
+
+    @contextmanager
+    def _exclusive(self):
+        if self.run_lock is None:
+            yield
+            return
+        if not self.run_lock.acquire(blocking=False):
+            logging.info("Job %s waiting for another job to finish.", self.name)
+            self.waiting = True
+            self.run_lock.acquire()
+            self.waiting = False
+        try:
+            yield
+        finally:
+            self.run_lock.release()
+
+    def _run(self):
+        self.last_started = time.time()
+        logging.info("Job %s started.", self.name)
+        try:
+            self.last_result = self.fn()
+            self.last_status, self.last_error = "ok", None
+        except Exception as e:
+            logging.exception("Job %s failed: %s", self.name, e)
+            self.failures += 1
+            self.last_status, self.last_error = "error", f"{type(e).__name__}: {e}"
+        self.last_finished = time.time()
+        self.last_duration = self.last_finished - self.last_started
+        self.runs += 1
+        logging.info("Job %s finished in %.1fs (%s).", self.name, self.last_duration, self.last_status)
+
+    def loop(self, stop: threading.Event):
+        while not stop.wait(max(0.0, self.next_run - time.time())):
+            self.run_once()
+            now = time.time()
+            # ticks that fell due during the run are dropped, not caught up
+            missed = 0
+            self.next_run += self._delay()
+            while self.next_run <= now:
+                missed += 1
+                self.next_run += self._delay()
+            if missed:
+                self.skipped += missed
+                logging.warning("Job %s overran its interval; skipped %d run(s).", self.name, missed)
+
+    @property
+    def running(self) -> bool:
+        return self._running.locked()
+
+    def status(self) -> Dict:
+        result = self.last_result or {}
+        return {
+            "running": self.running and not self.waiting,
+            "waiting": self.waiting,
+            "interval_seconds": self.interval,
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "last_status": self.last_status,
+            "last_error": self.last_error,
+            "last_started": _iso(self.last_started),
+            "last_finished": _iso(self.last_finished),
+            "last_duration_seconds": round(self.last_duration, 3) if self.last_duration is not None else None,
+            "last_result": result,
+            # fetched-but-not-indexed records from the last run, plus how late the next run is
+            "backlog": {
+                "unindexed": (result.get("new", 0) - result.get("indexed", 0)) if "new" in result else None,
+                "overdue_seconds": round(max(0.0, time.time() - self.next_run), 1),
+            },
+            "next_run": _iso(self.next_run),
+        }
+
+
+class IngestDaemon:
+    """
+    Keeps models and clients warm and schedules every Job on its own thread.
+    The runs themselves take turns: the jobs share the HF pipelines, the
+    geocoder's cache and counters and the stage metrics each run summarizes,
+    none of which is safe to use from two runs at once.
+    """
+
+    def __init__(self, jobs: List[Job], host: str = DAEMON_STATUS_HOST, port: int = DAEMON_STATUS_PORT):
+        self.run_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        for job in jobs:
+            job.run_lock, job.stop = self.run_lock, self.stop_event
+        self.jobs = {job.name: job for job in jobs}
+        self.host = host
+        self.port = port
+        self.started_at = time.time()
+        self._threads = []
+        self._manual_threads = []
+        self._server = None
+
+    def warm_up(self):
+        start = time.perf_counter()
+        if ENRICH_WORKERS > 1:
+            get_enrichment_pool(fetch_and_index.enrich_shard, warm=fetch_and_index.warm_worker).warm_up()
+        fetch_and_index.warm_worker()  # Reddit enrichment always runs in-process
+        get_geocoder()
+        get_enrichment_cache()
+        fetch_and_index.open_dedup_index()
+        for name, connect in (("newsapi", fetch_and_index.get_es), ("reddit", reddit.get_es)):
+            if name in self.jobs:
+                try:
+                    connect()
+                except Exception as e:  # ES may come up later; each run reconnects lazily
+                    logging.warning("Elasticsearch not reachable yet for %s: %s", name, e)
+        logging.info("Daemon warm in %.1fs: %s", time.perf_counter() - start, registry.stats())
+
+    def status(self) -> Dict:
+        return {
+            "started_at": _iso(self.started_at),
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "stopping": self.stop_event.is_set(),
+            "jobs": {name: job.status() for name, job in self.jobs.items()},
+            "models": registry.stats(),
+            "geocoder": get_geocoder().stats(),
+            "enrichment_cache": get_enrichment_cache().stats(),
+        }
+
+    def trigger(self, name: str) -> bool:
+        """Run a job now on a background thread; False if it is already running or the daemon is stopping."""
+        job = self.jobs[name]
+        if job.running or self.stop_event.is_set():
+            job.skipped += 1
+            return False
+        # Non-daemon and tracked, so shutdown() waits for the run like a scheduled one.
+        t = threading.Thread(target=job.run_once, name=f"job-{name}-manual")
+        self._manual_threads = [m for m in self._manual_threads if m.is_alive()] + [t]
+        t.start()
+        return True
+
+    def _serve_status(self):
+        daemon = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send(self, status: int, body, content_type: str = "application/json"):
+                data = (body if isinstance(body, str) else json.dumps(body, indent=1, default=str)).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path == "/healthz":
+                    return self._send(200, {"ok": not daemon.stop_event.is_set()})
+                if self.path in ("/", "/status"):
+                    return self._send(200, daemon.status())
+                if self.path == "/metrics":  # per-stage histograms, Prometheus text format
+                    return self._send(200, metrics.render(), "text/plain; version=0.0.4")
+                self._send(404, {"error": "not found"})
+
+            def do_POST(self):
+                name = self.path.rstrip("/").rsplit("/", 1)[-1]
+                if not self.path.startswith("/run/") or name not in daemon.jobs:
+                    return self._send(404, {"error": "unknown job"})
+                started = daemon.trigger(name)
+                self._send(202 if started else 409, {"job": name, "started": started})
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="status-http", daemon=True).start()
+        logging.info("Status endpoint on http://%s:%d/status", self.host, self._server.server_port)
+
+    def _handle_signal(self, signum, frame):
+        logging.info("Received %s; finishing in-flight runs and shutting down.", signal.Signals(signum).name)
+        self.stop_event.set()
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self._handle_signal)
+        signal.signal(signal.SIGINT, self._handle_signal)
+        self.warm_up()
+        self._serve_status()
+        for job in self.jobs.values():
+            t = threading.Thread(target=job.loop, args=(self.stop_event,), name=f"job-{job.name}")
+            t.start()
+            self._threads.append(t)
+        self.stop_event.wait()
+        self.shutdown()
+
+    def shutdown(self):
+        deadline = time.time() + SHUTDOWN_TIMEOUT
+        for t in self._threads + self._manual_threads:
+            t.join(max(0.0, deadline - time.time()))
+        still = [job.name for job in self.jobs.values() if job.running]
+        if still:
+            logging.warning("Shutdown timeout reached with runs in progress: %s", still)
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        logging.info("Daemon stopped.")
+
+
+def build_jobs(sources: List[str], streaming: bool = False) -> List[Job]:
+    jobs = []
+    if "newsapi" in sources:
+        jobs.append(Job("newsapi", lambda: fetch_and_index.main(limit=NEWS_LIMIT, streaming=streaming),
+                        NEWS_INTERVAL))
+    if "reddit" in sources:
+        jobs.append(Job("reddit", lambda: reddit.main(limit=REDDIT_LIMIT), REDDIT_INTERVAL))
+    return jobs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run NewsAPI and Reddit ingestion on schedules with warm models.")
+    parser.add_argument("--sources", default="newsapi,reddit", help="comma-separated: newsapi,reddit")
+    parser.add_argument("--streaming", action="store_true", help="use the staged pipeline for NewsAPI runs")
+    parser.add_argument("--port", type=int, default=DAEMON_STATUS_PORT)
+    args = parser.parse_args()
+
+    IngestDaemon(build_jobs([s.strip() for s in args.sources.split(",")], args.streaming), port=args.port).run()
@@ -0,0 +1,88 @@
+import re
+from typing import Dict, Iterable, List
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# -----------------------
+# Disaster types and the synonyms that map onto them (NewsAPI pipeline and benchmarks)
+# -----------------------
+DISASTER_TYPES = [
+    "earthquake", "flood", "cyclone", "wildfire",
+    "landslide", "volcano", "drought", "tsunami"
+]
+
+SYNONYMS = {
+    "quake": "earthquake", "tremor": "earthquake", "aftershock": "earthquake",
+    "seismic": "earthquake", "richter": "earthquake", "shock": "earthquake",
+    "flash flood": "flood", "deluge": "flood", "inundation": "flood",
+    "overflow": "flood", "swamped": "flood", "flooding": "flood", "torrent": "flood",
+    "hurricane": "cyclone", "typhoon": "cyclone", "storm": "cyclone",
+    "superstorm": "cyclone", "gale": "cyclone", "monsoon": "cyclone",
+    "cyclonic": "cyclone", "tropical storm": "cyclone",
+    "bushfire": "wildfire", "forest fire": "wildfire", "wild fire": "wildfire",
+    "firestorm": "wildfire", "blaze": "wildfire", "grassfire": "wildfire",
+    "mudslide": "landslide", "rockslide": "landslide", "debris flow": "landslide",
+    "avalanche": "landslide", "landslip": "landslide", "earth slip": "landslide",
+    "eruption": "volcano", "lava": "volcano", "pyroclastic": "volcano",
+    "magma": "volcano", "ash cloud": "volcano", "volcanic": "volcano",
+    "dry spell": "drought", "water scarcity": "drought", "famine": "drought",
+    "arid": "drought", "desertification": "drought", "heatwave": "drought",
+    "droughts": "drought", "parched": "drought",
+    "tidal wave": "tsunami", "seismic sea wave": "tsunami", "giant wave": "tsunami",
+    "ocean surge": "tsunami", "tsunami waves": "tsunami",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Tokens of normalize_text(text): lowercase runs of [a-z0-9]."""
+    if not text:
+        return []
+    return _TOKEN_RE.findall(text.lower())
+
+
+class KeywordMatcher:
+    """
+    Disaster-type keyword matcher built once from a synonym map and the base types.
+
+    Every keyword is a sequence of [a-z0-9] words, so a whole-word regex match on
+    normalized text is the same as matching a run of tokens. The matcher keeps a
+    phrase -> labels table and walks the token list once, probing n-grams up to
+    the longest keyword at each position. Overlapping keywords ("seismic" and
+    "seismic sea wave") are all found, exactly as the per-keyword re.search loop
+    did. Labels are returned in order of first occurrence, capped at `limit`.
+    """
+
+    def __init__(self, synonyms: Dict[str, str], base_types: Iterable[str], limit: int = 2):
+        self.limit = limit
+        self._phrases: Dict[str, tuple] = {}
+        for phrase, label in list(synonyms.items()) + [(d, d) for d in base_types]:
+            key = " ".join(tokenize(phrase))
+            if key and label not in self._phrases.get(key, ()):
+                self._phrases[key] = self._phrases.get(key, ()) + (label,)
+        self._first_words = {p.split(" ", 1)[0] for p in self._phrases}
+        self._max_words = max((len(p.split(" ")) for p in self._phrases), default=0)
+
+    def match(self, text: str) -> List[str]:
+        tokens = tokenize(text)
+        n_tokens = len(tokens)
+        labels = []
+        for i, tok in enumerate(tokens):
+            if tok not in self._first_words:
+                continue
+            phrase = tok
+            for n in range(self._max_words):
+                if n:
+                    if i + n >= n_tokens:
+                        break
+                    phrase = phrase + " " + tokens[i + n]
+                for label in self._phrases.get(phrase, ()):
+                    if label not in labels:
+                        labels.append(label)
+                        if len(labels) == self.limit:
+                            return labels
+        return labels
+
+    def match_many(self, texts: Iterable[str]) -> List[List[str]]:
+        """Bulk form of match() for a list (or Series) of texts."""
+        match = self.match
+        return [match(t) for t in texts]
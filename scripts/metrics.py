@@ -0,0 +1,330 @@
+import os
+import sys
+import json
+import bisect
+import time
+import logging
+import threading
+import traceback
+import collections
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# -----------------------
+# Config
+# -----------------------
+METRICS_RUN_LOG = os.getenv("METRICS_RUN_LOG", "data/logs/pipeline_runs.jsonl")  # one JSON summary per run
+PROFILE_RUNS = os.getenv("PROFILE_RUNS", "0") == "1"         # sample every pipeline run
+PROFILE_DIR = os.getenv("PROFILE_DIR", "data/logs/profiles")
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", 0.005))  # seconds between stack samples
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+SIZE_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+# -----------------------
+# Histograms
+# -----------------------
+def _format_value(v: float) -> str:
+    return "+Inf" if v == float("inf") else repr(float(v))
+
+
+def _escape(v: str) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def quantile(buckets: Sequence[float], counts: List[int], q: float) -> Optional[float]:
+    """Estimate the q-quantile from per-bucket (non-cumulative) counts, interpolating inside a bucket."""
+    total = sum(counts)
+    if not total:
+        return None
+    rank, seen, lower = q * total, 0, 0.0
+    for upper, n in zip(list(buckets) + [float("inf")], counts):
+        if n and seen + n >= rank:
+            if upper == float("inf"):
+                return lower
+            return lower + (upper - lower) * (rank - seen) / n
+        seen += n
+        lower = upper
+    return lower
+
+
+class Histogram:
+    """
+    Prometheus-style histogram with optional labels. Observations are cheap
+    (a bisect and three additions under a lock) so it can sit on hot paths.
+    """
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float] = LATENCY_BUCKETS,
+                 labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple, Dict] = {}
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            s = self._series.get(key)
+            if s is None:
+                s = self._series[key] = {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0}
+            s["counts"][idx] += 1
+            s["sum"] += value
+            s["count"] += 1
+
+    def snapshot(self) -> Dict[Tuple, Dict]:
+        with self._lock:
+            return {k: {"counts": list(s["counts"]), "sum": s["sum"], "count": s["count"]}
+                    for k, s in self._series.items()}
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, s in sorted(self.snapshot().items()):
+            base = [f'{n}="{_escape(v)}"' for n, v in zip(self.labelnames, key)]
+            cumulative = 0
+            for upper, n in zip(list(self.buckets) + [float("inf")], s["counts"]):
+                cumulative += n
+                labels = ",".join(base + [f'le="{_format_value(upper)}"'])
+                lines.append(f"{self.name}_bucket{{{labels}}} {cumulative}")
+            suffix = "{" + ",".join(base) + "}" if base else ""
+            lines.append(f"{self.name}_sum{suffix} {s['sum']!r}")
+            lines.append(f"{self.name}_count{suffix} {s['count']}")
+        return lines
+
+
+class Counter:
+    """Monotonic Prometheus counter with optional labels."""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            labels = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(self.labelnames, key))
+            lines.append(f"{self.name}{{{labels}}} {value}" if labels else f"{self.name} {value}")
+        return lines
+
+
+class Metrics:
+    """Process-wide set of histograms and counters, rendered together for /metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, object] = {}
+
+    def histogram(self, name: str, help: str, buckets: Sequence[float] = LATENCY_BUCKETS,
+                  labelnames: Sequence[str] = ()) -> Histogram:
+        """Get or create a histogram; modules can declare the same one independently."""
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = Histogram(name, help, buckets, labelnames)
+            return self._metrics[name]
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = Counter(name, help, labelnames)
+            return self._metrics[name]
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            all_metrics = list(self._metrics.values())
+        return "\n".join(line for m in all_metrics for line in m.render()) + "\n"
+
+
+metrics = Metrics()
+
+STAGE_SECONDS = metrics.histogram("pipeline_stage_seconds", "Wall time of one pipeline stage call.",
+                                  LATENCY_BUCKETS, ("stage",))
+STAGE_RECORDS = metrics.histogram("pipeline_stage_records", "Records handled by one pipeline stage call.",
+                                  SIZE_BUCKETS, ("stage",))
+
+
+# -----------------------
+# Pipeline stages
+# -----------------------
+@contextmanager
+def timed_stage(name: str, records: int = 0):
+    """
+    Time a block as pipeline stage `name`. Yields a dict whose "records" the
+    block may set once it knows how many records it handled.
+    """
+    span = {"records": records}
+    start = time.perf_counter()
+    try:
+        yield span
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage=name)
+        STAGE_RECORDS.observe(span["records"], stage=name)
+
+
+def stage(name: str) -> Callable:
+    """Decorator for list -> list enrichment steps: times each call as stage `name`."""
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(records, *args, **kwargs):
+            with timed_stage(name, len(records)):
+                return fn(records, *args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def _stage_delta(before: Dict[Tuple, Dict], after: Dict[Tuple, Dict],
+                 records_before: Dict[Tuple, Dict], records_after: Dict[Tuple, Dict]) -> Dict[str, Dict]:
+    out = {}
+    for key, s in after.items():
+        prev = before.get(key, {"counts": [0] * len(s["counts"]), "sum": 0.0, "count": 0})
+        calls = s["count"] - prev["count"]
+        if not calls:
+            continue
+        counts = [a - b for a, b in zip(s["counts"], prev["counts"])]
+        seconds = s["sum"] - prev["sum"]
+        rec_now = records_after.get(key, {}).get("sum", 0.0)
+        rec_prev = records_before.get(key, {}).get("sum", 0.0)
+        records = int(rec_now - rec_prev)
+        p50, p95 = (quantile(STAGE_SECONDS.buckets, counts, q) for q in (0.5, 0.95))
+        out[key[0]] = {
+            "calls": calls,
+            "records": records,
+            "seconds": round(seconds, 3),
+            "records_per_sec": round(records / seconds, 1) if seconds else None,
+            "p50_call_seconds": round(p50, 4) if p50 is not None else None,
+            "p95_call_seconds": round(p95, 4) if p95 is not None else None,
+        }
+    return out
+
+
+def write_run_summary(summary: Dict, path: str = METRICS_RUN_LOG):
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(summary, default=str) + "\n")
+
+
+@contextmanager
+def record_run(source: str, profile: Optional[bool] = None, path: str = METRICS_RUN_LOG):
+    """
+    Wrap one pipeline run: yields a dict for the caller to put its result in,
+    then appends a JSON line to `path` with the run's wall time, the result and
+    per-stage calls/records/seconds/p50/p95 accumulated during the run. With
+    `profile` (default PROFILE_RUNS) the run is also stack-sampled and the
+    profile path is included.
+
+    Stages running in other processes (ENRICH_WORKERS > 1) show up as the
+    parent's "enrich_pool" stage only, and runs overlapping in one process
+    (the daemon's sources) see each other's stage calls.
+    """
+    profile = PROFILE_RUNS if profile is None else profile
+    run = {"source": source, "started_at": datetime.now(timezone.utc).isoformat(), "result": None}
+    seconds_before, records_before = STAGE_SECONDS.snapshot(), STAGE_RECORDS.snapshot()
+    profiler = SamplingProfiler().start() if profile else None
+    start = time.perf_counter()
+    try:
+        yield run
+        run["status"] = "ok"
+    except Exception as e:
+        run["status"] = "error"
+        run["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        run["seconds"] = round(time.perf_counter() - start, 3)
+        run["stages"] = _stage_delta(seconds_before, STAGE_SECONDS.snapshot(),
+                                     records_before, STAGE_RECORDS.snapshot())
+        if profiler is not None:
+            run["profile"] = profiler.stop().save(f"run-{source}")
+        try:
+            write_run_summary(run, path)
+        except OSError as e:
+            logging.warning("Could not write run summary to %s: %s", path, e)
+        logging.info("Run summary (%s): %s", source, json.dumps(run["stages"]))
+
+
+# -----------------------
+# Sampling profiler
+# -----------------------
+class SamplingProfiler:
+    """
+    Low-overhead wall-clock profiler: a background thread snapshots the stacks
+    of the other threads every `interval` seconds (sys._current_frames), so the
+    profiled code is not instrumented. Output is collapsed-stack text ("thread;
+    outer;...;inner count" per line) for flamegraph.pl or speedscope.
+    """
+
+    def __init__(self, interval: float = PROFILE_INTERVAL, max_depth: int = 64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples = collections.Counter()
+        self.sample_count = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self.started = None
+        self.seconds = 0.0
+
+    def _frame_stack(self, frame) -> List[str]:
+        stack = []
+        for fs in traceback.extract_stack(frame, limit=self.max_depth):
+            stack.append(f"{fs.name} ({os.path.basename(fs.filename)}:{fs.lineno})")
+        return stack
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = [names.get(ident, str(ident))] + self._frame_stack(frame)
+                self.samples[";".join(stack)] += 1
+            self.sample_count += 1
+
+    def start(self) -> "SamplingProfiler":
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> "SamplingProfiler":
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.seconds = time.perf_counter() - self.started
+        return self
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {n}\n" for stack, n in self.samples.most_common())
+
+    def top(self, n: int = 10) -> List[Tuple[str, int]]:
+        """Leaf frames by sample count (where threads were actually spending time)."""
+        leaves = collections.Counter()
+        for stack, count in self.samples.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return leaves.most_common(n)
+
+    def save(self, name: str, directory: str = PROFILE_DIR) -> str:
+        os.makedirs(directory, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        path = os.path.join(directory, f"{name}-{stamp}.folded")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.collapsed())
+        logging.info("Profile: %d samples over %.2fs -> %s; top: %s",
+                     self.sample_count, self.seconds, path, self.top(5))
+        return path
@@ -0,0 +1,163 @@
+import os
+os.environ["CUDA_VISIBLE_DEVICES"] = ""  # ingestion runs on CPU
+
+import time
+import logging
+import resource
+import threading
+from typing import Dict, Iterable, Optional
+
+# -----------------------
+# Model specs
+# -----------------------
+# name -> (pipeline task, model id, extra pipeline kwargs)
+MODEL_SPECS = {
+    "classifier": ("zero-shot-classification", "typeform/distilbert-base-uncased-mnli", {}),
+    "ner": ("ner", "dslim/bert-base-NER", {"aggregation_strategy": "simple"}),
+    "sentiment": ("sentiment-analysis", "distilbert-base-uncased-finetuned-sst-2-english", {}),
+    # only loaded with CLASSIFIER_MODE=embedding
+    "embedder": ("feature-extraction", "sentence-transformers/all-MiniLM-L6-v2", {}),
+}
+DEFAULT_MODELS = ["classifier", "ner", "sentiment"]  # what warm_up() loads unless told otherwise
+
+# -----------------------
+# Inference backends
+# -----------------------
+# torch: fp32 PyTorch (default)
+# int8:  PyTorch with nn.Linear layers dynamically quantized to int8
+# onnx:  ONNX export run by onnxruntime (needs `pip install optimum[onnxruntime]`)
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "torch")
+BACKENDS = ("torch", "int8", "onnx")
+
+# pipeline task -> optimum ORTModel class name, for the onnx backend
+ORT_MODEL_CLASSES = {
+    "zero-shot-classification": "ORTModelForSequenceClassification",
+    "sentiment-analysis": "ORTModelForSequenceClassification",
+    "ner": "ORTModelForTokenClassification",
+    "feature-extraction": "ORTModelForFeatureExtraction",
+}
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MB (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class ModelRegistry:
+    """
+    Process-wide holder for the enrichment pipelines. Each pipeline is built on
+    first use (or by warm_up()) and then shared by every caller in the process,
+    so the NewsAPI and Reddit ingestion paths never load a model twice.
+    `backend` selects how the pipelines run (see BACKENDS); all of them expose
+    the same transformers pipeline interface.
+    """
+
+    def __init__(self, specs: Dict[str, tuple] = None, backend: str = INFERENCE_BACKEND):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown inference backend '{backend}'. Known: {list(BACKENDS)}")
+        self.specs = dict(specs or MODEL_SPECS)
+        self.backend = backend
+        self._models = {}
+        self._stats = {}
+        self._locks = {name: threading.Lock() for name in self.specs}
+
+    def get(self, name: str):
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        if name not in self.specs:
+            raise KeyError(f"Unknown model '{name}'. Known: {sorted(self.specs)}")
+        with self._locks[name]:
+            if name not in self._models:
+                self._models[name] = self._load(name)
+            return self._models[name]
+
+    def set(self, name: str, model):
+        """Use `model` for `name` instead of loading it, e.g. a fake or wrapped pipeline."""
+        if name not in self.specs:
+            raise KeyError(f"Unknown model '{name}'. Known: {sorted(self.specs)}")
+        with self._locks[name]:
+            self._models[name] = model
+
+    def _load(self, name: str):
+        from transformers import pipeline  # heavy import, deferred until a model is needed
+
+        task, model_id, kwargs = self.specs[name]
+        rss_before = current_rss_mb()
+        start = time.perf_counter()
+        if self.backend == "onnx":
+            model = self._load_onnx(task, model_id, kwargs)
+        else:
+            model = pipeline(task, model=model_id, device=-1, **kwargs)
+            if self.backend == "int8":
+                import torch
+                model.model = torch.quantization.quantize_dynamic(model.model, {torch.nn.Linear}, dtype=torch.qint8)
+        elapsed = time.perf_counter() - start
+        self._stats[name] = {
+            "model": model_id,
+            "backend": self.backend,
+            "load_seconds": round(elapsed, 3),
+            "rss_delta_mb": round(current_rss_mb() - rss_before, 1),
+        }
+        logging.info("Loaded %s (%s, %s) in %.2fs", name, model_id, self.backend, elapsed)
+        return model
+
+    @staticmethod
+    def _load_onnx(task: str, model_id: str, kwargs: dict):
+        from transformers import AutoTokenizer, pipeline
+        try:
+            import optimum.onnxruntime as ort
+        except ImportError as e:
+            raise ImportError("INFERENCE_BACKEND=onnx needs optimum[onnxruntime] installed") from e
+        model = getattr(ort, ORT_MODEL_CLASSES[task]).from_pretrained(model_id, export=True)
+        return pipeline(task, model=model, tokenizer=AutoTokenizer.from_pretrained(model_id), device=-1, **kwargs)
+
+    @property
+    def classifier(self):
+        return self.get("classifier")
+
+    @property
+    def ner(self):
+        return self.get("ner")
+
+    @property
+    def sentiment(self):
+        return self.get("sentiment")
+
+    @property
+    def embedder(self):
+        return self.get("embedder")
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._models
+
+    def warm_up(self, names: Optional[Iterable[str]] = None):
+        """Load the given models (default: DEFAULT_MODELS) up front, e.g. before serving a run."""
+        for name in names or [n for n in DEFAULT_MODELS if n in self.specs]:
+            self.get(name)
+        return self.stats()
+
+    def version(self) -> str:
+        """Identifies the models in use (part of the enrichment cache key)."""
+        models = ";".join(f"{name}={spec[1]}" for name, spec in sorted(self.specs.items()))
+        return f"{models};backend={self.backend}"
+
+    def stats(self) -> Dict[str, dict]:
+        return {
+            "models": {name: dict(self._stats.get(name, {}), loaded=self.is_loaded(name)) for name in self.specs},
+            "rss_mb": round(current_rss_mb(), 1),
+        }
+
+
+registry = ModelRegistry()
+
+if __name__ == "__main__":
+    # Pre-download / warm the model cache, e.g. when provisioning an ingestion host.
+    import json
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    print(json.dumps(registry.warm_up(), indent=2))
@@ -0,0 +1,217 @@
+import os
+import time
+import queue
+import asyncio
+import logging
+import threading
+from typing import Awaitable, Callable, Dict, Iterable, Iterator, List, Optional
+
+import aiohttp
+
+# -----------------------
+# Config
+# -----------------------
+NEWSAPI_URL = os.getenv("NEWSAPI_URL", "https://newsapi.org/v2/everything")
+NEWS_REGIONS = [r.strip() for r in os.getenv("NEWS_REGIONS", "India").split(",") if r.strip()]
+NEWSAPI_CONCURRENCY = int(os.getenv("NEWSAPI_CONCURRENCY", 4))       # pooled connections / in-flight requests
+NEWSAPI_RATE_PER_SEC = float(os.getenv("NEWSAPI_RATE_PER_SEC", 2))   # token bucket refill rate
+NEWSAPI_BURST = int(os.getenv("NEWSAPI_BURST", 4))                   # token bucket capacity
+NEWSAPI_MAX_PAGE_SIZE = 100                                          # NewsAPI hard limit
+NEWSAPI_RETRIES = 3
+NEWSAPI_PAGE_BUFFER = int(os.getenv("NEWSAPI_PAGE_BUFFER", 2))      # fetched pages waiting for iter_pages()
+
+_DONE = object()
+
+
+def build_queries(terms: Iterable[str], regions: Iterable[str] = None) -> List[str]:
+    """One query per (term, region), e.g. 'flood AND India'."""
+    regions = list(regions if regions is not None else NEWS_REGIONS)
+    if not regions:
+        return list(terms)
+    return [f"{term} AND {region}" for term in terms for region in regions]
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens/s, holding at most `capacity`."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class NewsApiFetcher:
+    """
+    Fetches several NewsAPI /everything queries concurrently over one pooled
+    aiohttp session. Each query is paged until its article budget, the last page
+    or the API's result cap is reached; all requests share a token bucket so the
+    whole fan-out stays within the plan's rate limit. `base_url` can point at a
+    local stub server (see benchmarks/stub_newsapi.py).
+
+    fetch() returns the whole fan-out at once; iter_pages() hands over each page
+    as it arrives, so a consumer can start work before the last query finishes.
+    Every article is stamped with `_fetched_at` (time.monotonic()) when its
+    page arrives.
+    """
+
+    def __init__(self, api_key: str, base_url: str = NEWSAPI_URL, concurrency: int = NEWSAPI_CONCURRENCY,
+                 rate_per_sec: float = NEWSAPI_RATE_PER_SEC, burst: int = NEWSAPI_BURST,
+                 page_size: int = NEWSAPI_MAX_PAGE_SIZE):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self.rate_per_sec = rate_per_sec
+        self.burst = burst
+        self.page_size = min(page_size, NEWSAPI_MAX_PAGE_SIZE)
+        self.requests_made = 0
+        self.rate_limited = 0
+
+    async def _get_page(self, session: aiohttp.ClientSession, bucket: TokenBucket,
+                        query: str, page: int, page_size: int) -> Optional[dict]:
+        params = {
+            "q": query,
+            "language": "en",
+            "pageSize": page_size,
+            "page": page,
+            "sortBy": "publishedAt",
+            "apiKey": self.api_key,
+        }
+        for attempt in range(NEWSAPI_RETRIES):
+            await bucket.acquire()
+            self.requests_made += 1
+            try:
+                async with session.get(self.base_url, params=params) as r:
+                    if r.status == 429:
+                        self.rate_limited += 1
+                        delay = float(r.headers.get("Retry-After", 2 ** attempt))
+                        logging.warning("NewsAPI rate limited on '%s'; retrying in %.1fs", query, delay)
+                        await asyncio.sleep(delay)
+                        continue
+                    if r.status == 426:
+                        return None  # plan's result cap: no further pages
+                    r.raise_for_status()  # before decoding: a 5xx from a proxy is often HTML
+                    body = await r.json(content_type=None)
+                    if (body or {}).get("code") == "maximumResultsReached":
+                        return None
+                    return body
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:  # ValueError: undecodable body
+                logging.warning("NewsAPI request failed for '%s' page %d: %s", query, page, e)
+                await asyncio.sleep(2 ** attempt)
+        logging.error("Giving up on '%s' page %d", query, page)
+        return None
+
+    async def _fetch_query(self, session, bucket, query: str, budget: int,
+                           on_page: Callable[[List[Dict]], Awaitable] = None) -> List[Dict]:
+        # NewsAPI pages are offsets of (page - 1) * pageSize, so the size must not change between pages
+        articles, page = [], 1
+        page_size = min(self.page_size, budget)
+        while len(articles) < budget:
+            body = await self._get_page(session, bucket, query, page, page_size)
+            if not body:
+                break
+            batch = body.get("articles", [])
+            fetched_at = time.monotonic()
+            for a in batch:
+                a["_query"] = query
+                a["_fetched_at"] = fetched_at
+            if on_page is not None:
+                await on_page(batch[:budget - len(articles)])
+            articles.extend(batch)
+            total = body.get("totalResults", 0)
+            if len(batch) < page_size or page * page_size >= total:
+                break
+            page += 1
+        return articles[:budget]
+
+    async def fetch_async(self, queries: List[str], per_query: int,
+                          on_page: Callable[[List[Dict]], Awaitable] = None) -> List[Dict]:
+        """Fetch every query; `on_page`, if given, is awaited with each page's articles as it arrives."""
+        bucket = TokenBucket(self.rate_per_sec, self.burst)
+        connector = aiohttp.TCPConnector(limit=self.concurrency, ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(total=30)
+        sem = asyncio.Semaphore(self.concurrency)
+
+        async def run(q):
+            async with sem:
+                return await self._fetch_query(session, bucket, q, per_query, on_page)
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            results = await asyncio.gather(*(run(q) for q in queries), return_exceptions=True)
+
+        articles, seen = [], set()
+        for q, res in zip(queries, results):
+            if isinstance(res, Exception):
+                logging.error("Failed fetch for %s: %s", q, res)
+                continue
+            for a in res:
+                url = a.get("url")
+                if url in seen:
+                    continue
+                seen.add(url)
+                articles.append(a)
+        return articles
+
+    def fetch(self, queries: List[str], per_query: int) -> List[Dict]:
+        """Blocking wrapper: fetch every query (up to `per_query` articles each), deduplicated by URL."""
+        start = time.perf_counter()
+        articles = asyncio.run(self.fetch_async(queries, per_query))
+        logging.info("Fetched %d unique articles for %d queries in %.2fs (%d requests, %d rate-limited)",
+                     len(articles), len(queries), time.perf_counter() - start,
+                     self.requests_made, self.rate_limited)
+        return articles
+
+    def iter_pages(self, queries: List[str], per_query: int) -> Iterator[List[Dict]]:
+        """
+        Blocking iterator over pages of articles, each yielded as soon as it is
+        fetched, deduplicated by URL across the whole fan-out. At most
+        NEWSAPI_PAGE_BUFFER pages wait for the consumer; past that the fetch
+        pauses, so a slow consumer holds back requests instead of buffering them.
+        """
+        pages = queue.Queue(maxsize=NEWSAPI_PAGE_BUFFER)
+        closed = threading.Event()
+
+        def put(item):
+            while not closed.is_set():
+                try:
+                    pages.put(item, timeout=0.5)
+                    return
+                except queue.Full:
+                    continue
+
+        async def on_page(batch):
+            await asyncio.get_running_loop().run_in_executor(None, put, batch)
+
+        def run():
+            try:
+                asyncio.run(self.fetch_async(queries, per_query, on_page))
+            except Exception as e:
+                logging.error("NewsAPI fetch failed: %s", e)
+            finally:
+                put(_DONE)
+
+        threading.Thread(target=run, name="newsapi-fetch", daemon=True).start()
+        seen = set()
+        try:
+            while True:
+                batch = pages.get()
+                if batch is _DONE:
+                    break
+                fresh = [a for a in batch if a.get("url") not in seen]
+                seen.update(a.get("url") for a in fresh)
+                if fresh:
+                    yield fresh
+        finally:
+            closed.set()  # consumer gone: stop handing over pages
@@ -0,0 +1,229 @@
+import os
+import time
+import uuid
+import logging
+import argparse
+import threading
+from datetime import datetime
+from typing import List, Optional, Set
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# -----------------------
+# Config
+# -----------------------
+DATASET_PATH = os.getenv("DATASET_PATH", "data/disasters")
+ROW_GROUP_SIZE = int(os.getenv("PARQUET_ROW_GROUP_SIZE", 10000))
+COMPACT_MIN_FRAGMENTS = int(os.getenv("COMPACT_MIN_FRAGMENTS", 8))  # per partition
+COMPACT_LOCK_STALE_SECONDS = 3600
+
+SCHEMA = pa.schema([
+    ("title", pa.string()),
+    ("description", pa.string()),
+    ("content", pa.string()),
+    ("url", pa.string()),
+    ("source", pa.string()),
+    ("publishedAt", pa.timestamp("us")),
+    ("disaster_type", pa.list_(pa.string())),
+    ("location", pa.string()),
+    ("severity", pa.string()),
+    ("geo", pa.struct([("lat", pa.float64()), ("lon", pa.float64())])),
+])
+PARTITIONING = ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive")
+
+WRITE_OPTIONS = dict(
+    compression="zstd",
+    use_dictionary=True,      # low-cardinality columns (source, severity, location, types)
+    write_statistics=True,    # per-row-group min/max so date-range reads skip row groups
+    row_group_size=ROW_GROUP_SIZE,
+)
+
+
+class ParquetStore:
+    """
+    Append-only Parquet dataset partitioned by publish date (`date=YYYY-MM-DD/`).
+
+    Each append writes one new small fragment per touched partition; fragments
+    are written to a hidden temp file and renamed into place, so a crash never
+    leaves a half-written file visible to readers. compact() merges the fragments
+    of a partition into one file, deduplicated by URL.
+    """
+
+    def __init__(self, root: str = DATASET_PATH):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    # -----------------------
+    # Writing
+    # -----------------------
+    def _partition_dir(self, date: str) -> str:
+        return os.path.join(self.root, f"date={date}")
+
+    def _write_atomic(self, table: pa.Table, directory: str, prefix: str = "part") -> str:
+        os.makedirs(directory, exist_ok=True)
+        name = f"{prefix}-{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}.parquet"
+        final = os.path.join(directory, name)
+        tmp = os.path.join(directory, f".{name}.tmp")  # dot-prefixed: ignored by dataset discovery
+        pq.write_table(table, tmp, **WRITE_OPTIONS)
+        with open(tmp, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp, final)
+        return final
+
+    def _to_table(self, df: pd.DataFrame) -> pa.Table:
+        df = df.sort_values("publishedAt", ascending=False)
+        return pa.Table.from_pandas(df[SCHEMA.names], schema=SCHEMA, preserve_index=False, safe=False)
+
+    def append(self, df: pd.DataFrame) -> List[str]:
+        """Write `df` as new fragments, one per publish-date partition. Returns the file paths."""
+        if df.empty:
+            return []
+        df = df.copy()
+        df["publishedAt"] = pd.to_datetime(df["publishedAt"])
+        written = []
+        for date, part in df.groupby(df["publishedAt"].dt.strftime("%Y-%m-%d")):
+            written.append(self._write_atomic(self._to_table(part), self._partition_dir(date)))
+        return written
+
+    # -----------------------
+    # Reading
+    # -----------------------
+    def dataset(self) -> ds.Dataset:
+        return ds.dataset(self.root, format="parquet", partitioning=PARTITIONING,
+                          schema=SCHEMA.append(pa.field("date", pa.string())))
+
+    def read(self, columns: Optional[List[str]] = None, start: Optional[datetime] = None,
+             end: Optional[datetime] = None, dedupe: bool = True) -> pd.DataFrame:
+        """
+        Read the dataset, optionally restricted to publishedAt in [start, end).
+        Partition pruning and row-group statistics mean only matching files and
+        row groups are decoded.
+        """
+        if not self.fragments():
+            return pd.DataFrame(columns=columns or SCHEMA.names)
+        flt = None
+        if start is not None:
+            flt = (ds.field("date") >= start.strftime("%Y-%m-%d")) & \
+                  (ds.field("publishedAt") >= pa.scalar(start, pa.timestamp("us")))
+        if end is not None:
+            cond = (ds.field("date") <= end.strftime("%Y-%m-%d")) & \
+                   (ds.field("publishedAt") < pa.scalar(end, pa.timestamp("us")))
+            flt = cond if flt is None else flt & cond
+        read_cols = columns or SCHEMA.names
+        if dedupe:
+            read_cols = list(dict.fromkeys(read_cols + ["url", "publishedAt"]))
+        df = self.dataset().to_table(columns=read_cols, filter=flt).to_pandas()
+        if dedupe and not df.empty:
+            df = df.sort_values("publishedAt", ascending=False).drop_duplicates(subset=["url"], keep="first")
+            if columns is not None:
+                df = df[columns]
+        return df.reset_index(drop=True)
+
+    def urls(self) -> Set[str]:
+        """All stored URLs; only the url column is read."""
+        if not self.fragments():
+            return set()
+        col = self.dataset().to_table(columns=["url"]).column("url")
+        return {u for u in col.to_pylist() if u}
+
+    def fragments(self, date: Optional[str] = None) -> List[str]:
+        dirs = [self._partition_dir(date)] if date else [
+            os.path.join(self.root, d) for d in sorted(os.listdir(self.root)) if d.startswith("date=")
+        ]
+        files = []
+        for d in dirs:
+            if os.path.isdir(d):
+                files.extend(os.path.join(d, f) for f in sorted(os.listdir(d))
+                             if f.endswith(".parquet") and not f.startswith("."))
+        return files
+
+    # -----------------------
+    # Compaction
+    # -----------------------
+    def _acquire_lock(self) -> bool:
+        lock = os.path.join(self.root, ".compact.lock")
+        try:
+            if time.time() - os.path.getmtime(lock) > COMPACT_LOCK_STALE_SECONDS:
+                os.remove(lock)
+        except OSError:
+            pass
+        try:
+            os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            return False
+
+    def _release_lock(self):
+        try:
+            os.remove(os.path.join(self.root, ".compact.lock"))
+        except OSError:
+            pass
+
+    def compact_partition(self, date: str) -> int:
+        """Merge all fragments of one partition into a single deduplicated file."""
+        files = self.fragments(date)
+        if len(files) < 2:
+            return 0
+        df = pa.concat_tables([pq.read_table(f, schema=SCHEMA) for f in files]).to_pandas()
+        df = df.sort_values("publishedAt", ascending=False).drop_duplicates(subset=["url"], keep="first")
+        # New file becomes visible before the old ones go away; readers dedupe meanwhile.
+        self._write_atomic(self._to_table(df), self._partition_dir(date), prefix="compacted")
+        for f in files:
+            os.remove(f)
+        return len(files)
+
+    def partitions_to_compact(self, min_fragments: int = 2) -> List[str]:
+        """Dates of the partitions holding at least `min_fragments` fragments."""
+        return [d[5:] for d in sorted(os.listdir(self.root))
+                if d.startswith("date=") and len(self.fragments(d[5:])) >= min_fragments]
+
+    def compact(self, min_fragments: int = 2) -> int:
+        """Compact every partition with at least `min_fragments` fragments. Returns files merged."""
+        if not self._acquire_lock():
+            logging.info("Compaction already running for %s; skipping.", self.root)
+            return 0
+        merged = 0
+        try:
+            for date in self.partitions_to_compact(min_fragments):
+                merged += self.compact_partition(date)
+        finally:
+            self._release_lock()
+        if merged:
+            logging.info("Compacted %d fragments in %s", merged, self.root)
+        return merged
+
+    def compact_in_background(self, min_fragments: int = COMPACT_MIN_FRAGMENTS) -> threading.Thread:
+        # Non-daemon so a one-shot run waits for the merge instead of abandoning it.
+        t = threading.Thread(target=self.compact, args=(min_fragments,), name="parquet-compaction")
+        t.start()
+        return t
+
+    def import_legacy_file(self, path: str) -> int:
+        """One-off migration of the old single-file data/disasters.parquet into the dataset."""
+        if not os.path.isfile(path):
+            return 0
+        df = pd.read_parquet(path)
+        self.append(df)
+        os.replace(path, path + ".migrated")
+        logging.info("Migrated %d rows from %s into %s", len(df), path, self.root)
+        return len(df)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Maintain the partitioned disasters Parquet dataset.")
+    parser.add_argument("command", choices=["compact", "stats"])
+    parser.add_argument("--path", default=DATASET_PATH)
+    parser.add_argument("--min-fragments", type=int, default=2)
+    args = parser.parse_args()
+
+    store = ParquetStore(args.path)
+    if args.command == "compact":
+        store.compact(args.min_fragments)
+    else:
+        files = store.fragments()
+        print(f"partitions={len({os.path.dirname(f) for f in files})} fragments={len(files)} "
+              f"bytes={sum(os.path.getsize(f) for f in files)}")
@@ -0,0 +1,184 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Dict, Optional
+
+# -----------------------
+# Config
+# -----------------------
+QUERY_CACHE_PATH = os.getenv("QUERY_CACHE_PATH", "data/cache/query_cache.sqlite")
+QUERY_CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", 10))                # seconds; the dashboard polls every 10s
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", 2000))
+QUERY_CACHE_ENABLED = os.getenv("QUERY_CACHE_ENABLED", "1") == "1"
+QUERY_CACHE_BUSY_TIMEOUT = 0.5   # seconds to wait on a locked database before treating it as a miss
+TOUCH_INTERVAL = 1.0             # refresh last_used at most this often per entry (keeps hits read-only)
+
+
+def cache_key(endpoint: str, params: Dict) -> str:
+    """Stable key for an endpoint and its query parameters: empty values dropped, strings stripped, keys sorted."""
+    norm = {}
+    for k, v in params.items():
+        if isinstance(v, str):
+            v = v.strip()
+        if v is None or v == "":
+            continue
+        norm[k] = v
+    raw = json.dumps([endpoint, norm], sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class QueryCache:
+    """
+    SQLite-backed cache of serialized query results, shared by every process
+    on the host that opens the same file (API workers, ingestion, alerting).
+
+    Each entry belongs to a scope (an index name) and records the scope's
+    generation when it was stored. Writers call bump(scope) after changing the
+    index, which makes every older entry of that scope a miss at once. Entries
+    also expire after `ttl` seconds, and past `max_entries` the least recently
+    used ones are evicted.
+    """
+
+    def __init__(self, path: str = QUERY_CACHE_PATH, ttl: float = QUERY_CACHE_TTL,
+                 max_entries: int = QUERY_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=QUERY_CACHE_BUSY_TIMEOUT, check_same_thread=False,
+                                     isolation_level=None)  # autocommit; each statement is its own transaction
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS query_cache (
+                key TEXT PRIMARY KEY,
+                scope TEXT NOT NULL,
+                generation INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL,
+                value BLOB NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS query_cache_last_used ON query_cache(last_used)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS generations (scope TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+
+    def generation(self, scope: str) -> Optional[int]:
+        """Current generation of `scope`, or None if the database is locked (the caller should not cache)."""
+        try:
+            with self._lock:
+                row = self._conn.execute("SELECT value FROM generations WHERE scope = ?", (scope,)).fetchone()
+        except sqlite3.Error as e:
+            self.errors += 1
+            logging.debug("Query cache generation read failed: %s", e)
+            return None
+        return row[0] if row else 0
+
+    def bump(self, scope: str) -> int:
+        """Invalidate every cached result of `scope`; returns the new generation."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO generations (scope, value) VALUES (?, 1) "
+                "ON CONFLICT(scope) DO UPDATE SET value = value + 1", (scope,))
+            (value,) = self._conn.execute("SELECT value FROM generations WHERE scope = ?", (scope,)).fetchone()
+        return value
+
+    def get(self, key: str) -> Optional[bytes]:
+        """The cached value if it is fresh and from the scope's current generation, else None."""
+        now = time.time()
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT q.value, q.last_used FROM query_cache q "
+                    "LEFT JOIN generations g ON g.scope = q.scope "
+                    "WHERE q.key = ? AND q.generation = COALESCE(g.value, 0) AND q.created_at > ?",
+                    (key, now - self.ttl),
+                ).fetchone()
+                if row and now - row[1] > TOUCH_INTERVAL:
+                    self._conn.execute("UPDATE query_cache SET last_used = ? WHERE key = ?", (now, key))
+        except sqlite3.Error as e:  # e.g. locked by another process: behave like a miss
+            self.errors += 1
+            logging.debug("Query cache read failed: %s", e)
+            row = None
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0]
+
+    def put(self, key: str, scope: str, value: bytes, generation: int):
+        """
+        Store `value` as computed under `generation` (read before the query ran),
+        so a result that raced with a bump() is never served as current.
+        """
+        now = time.time()
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO query_cache (key, scope, generation, created_at, last_used, value) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", (key, scope, generation, now, now, value))
+                self._evict(now)
+        except sqlite3.Error as e:
+            self.errors += 1
+            logging.debug("Query cache write failed: %s", e)
+
+    def _evict(self, now: float):
+        self._conn.execute("DELETE FROM query_cache WHERE created_at <= ?", (now - self.ttl,))
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM query_cache").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM query_cache WHERE key IN (SELECT key FROM query_cache ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM query_cache").fetchone()[0]
+
+    def close(self):
+        """Close the connection; later lookups and writes behave like a cache that cannot be read."""
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> Dict[str, float]:
+        """Totals for this process since the cache was opened."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "errors": self.errors,
+            "cache_entries": len(self),
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_query_cache() -> QueryCache:
+    """Process-wide query cache (one SQLite connection per process)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = QueryCache()
+        return _cache
+
+
+def invalidate(scope: str):
+    """Bump `scope`'s generation after writing to it. Never raises: a failed bump only leaves results cached until TTL."""
+    if not QUERY_CACHE_ENABLED:
+        return
+    try:
+        get_query_cache().bump(scope)
+    except Exception as e:
+        logging.warning("Could not invalidate query cache for '%s': %s", scope, e)
@@ -1,17 +1,26 @@
 import os
 import re
-import time
 import logging
-from datetime import datetime
-from typing import List, Dict
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import List, Dict, Optional, Set, Tuple
 from dotenv import load_dotenv
 load_dotenv()
 
 import pandas as pd
 import praw
-from elasticsearch import Elasticsearch, helpers
-from transformers import pipeline
-from geopy.geocoders import Nominatim
+from elasticsearch import Elasticsearch
+
+from model_registry import registry
+from geocache import get_geocoder
+from enrichment import extract_locations_batch, compute_severities_batch
+from keywords import KeywordMatcher
+from dedup_index import get_dedup_index
+from es_indexing import index_dataframe
+from checkpoints import CheckpointStore
+from enrichment_cache import get_enrichment_cache, config_fingerprint
+from metrics import timed_stage, record_run
 
 # -----------------------
 # Config & Logging
@@ -22,8 +31,12 @@ ES_HOST = os.getenv("ES_HOST")
 ES_INDEX = os.getenv("ES_INDEX")
 CLIENT_ID = os.getenv("CLIENT_ID")
 CLIENT_SECRET = os.getenv("CLIENT_SECRET")
+REDDIT_SUBREDDITS = [s.strip() for s in os.getenv("REDDIT_SUBREDDITS", "naturaldisasters").split(",") if s.strip()]
+REDDIT_FETCH_WORKERS = int(os.getenv("REDDIT_FETCH_WORKERS", 4))
+REDDIT_CHECKPOINT_PATH = os.getenv("REDDIT_CHECKPOINT_PATH", "data/cache/reddit_checkpoints.json")
 
 BATCH_SIZE = 16
+NER_BATCH_SIZE = int(os.getenv("NER_BATCH_SIZE", BATCH_SIZE))
 CLASSIFY_THRESHOLD = 0.25
 SECONDARY_THRESHOLD = 0.15
 
@@ -38,24 +51,38 @@ SYNONYMS = {
     "dry spell":"drought","water scarcity":"drought","famine":"drought","arid":"drought","desertification":"drought","heatwave":"drought",
     "tidal wave":"tsunami","seismic sea wave":"tsunami","giant wave":"tsunami","ocean surge":"tsunami","tsunami waves":"tsunami"
 }
+keyword_matcher = KeywordMatcher(SYNONYMS, DISASTER_TYPES, limit=2)
 
 # -----------------------
-# Initialize clients
+# Clients (created lazily; models come from the shared model_registry)
 # -----------------------
-reddit = praw.Reddit(
-    client_id=CLIENT_ID,
-    client_secret=CLIENT_SECRET,
-    user_agent="reddit_to_es/0.1"
-)
+_local = threading.local()  # PRAW is not thread-safe: one client per fetch thread
+_es = None
+_checkpoints = None
+
+def get_reddit() -> praw.Reddit:
+    if getattr(_local, "reddit", None) is None:
+        _local.reddit = praw.Reddit(
+            client_id=CLIENT_ID,
+            client_secret=CLIENT_SECRET,
+            user_agent="reddit_to_es/0.1"
+        )
+    return _local.reddit
 
-es = Elasticsearch([ES_HOST])
-if not es.ping():
-    raise ConnectionError(f"Cannot connect to Elasticsearch at {ES_HOST}")
+def get_es() -> Elasticsearch:
+    global _es
+    if _es is None:
+        client = Elasticsearch([ES_HOST])
+        if not client.ping():
+            raise ConnectionError(f"Cannot connect to Elasticsearch at {ES_HOST}")
+        _es = client
+    return _es
 
-classifier = pipeline("zero-shot-classification", model="typeform/distilbert-base-uncased-mnli", device=-1)
-ner = pipeline("ner", model="dslim/bert-base-NER", aggregation_strategy="simple", device=-1)
-sentiment = pipeline("sentiment-analysis", model="distilbert-base-uncased-finetuned-sst-2-english", device=-1)
-geolocator = Nominatim(user_agent="disaster_monitor", timeout=10, scheme="https")
+def get_checkpoints() -> CheckpointStore:
+    global _checkpoints
+    if _checkpoints is None:
+        _checkpoints = CheckpointStore(REDDIT_CHECKPOINT_PATH)
+    return _checkpoints
 
 # -----------------------
 # Helper Functions
@@ -68,64 +95,140 @@ def normalize_text(t: str) -> str:
     return s
 
 def synonym_keyword_fallback(text: str) -> List[str]:
-    text_l = normalize_text(text)
-    matches = set()
-    for syn in sorted(SYNONYMS.keys(), key=lambda x: -len(x)):
-        if re.search(rf"\b{re.escape(syn)}\b", text_l):
-            matches.add(SYNONYMS[syn])
-    for d in DISASTER_TYPES:
-        if re.search(rf"\b{re.escape(d)}\b", text_l):
-            matches.add(d)
-    return list(matches)[:2]
+    return keyword_matcher.match(text)
 
 def extract_location(title: str, description: str) -> str:
-    text = " ".join(filter(None,[title,description]))
-    if not text: return "India"
-    ents = ner(text)
-    locs = [e.get("word") for e in ents if e.get("entity_group") in ("LOC","GPE")]
-    return locs[0] if locs else "India"
+    return extract_locations_batch(registry.ner, [(title, description)], batch_size=1)[0]
 
 def get_geo(location: str) -> dict:
     default_geo = {"lat": 20.5937, "lon": 78.9629}
     if not location: return default_geo
-    for _ in range(3):
-        try:
-            loc = geolocator.geocode(location)
-            if loc: return {"lat": loc.latitude, "lon": loc.longitude}
-        except: time.sleep(1)
-    return default_geo
+    return get_geocoder().geocode(location) or default_geo
+
+def get_geo_batch(locations: List[str]) -> List[dict]:
+    default_geo = {"lat": 20.5937, "lon": 78.9629}
+    return [g or default_geo for g in get_geocoder().geocode_many(locations)]
 
 def compute_severity(text: str) -> str:
-    if not text: return "low"
-    out = sentiment(text[:512])[0]
-    label, score = out["label"], float(out["score"])
-    if label=="NEGATIVE" and score>0.7: return "high"
-    if label=="NEGATIVE": return "medium"
-    return "low"
+    return compute_severities_batch(registry.sentiment, [text], batch_size=1)[0]
 
 # -----------------------
 # Fetch + Enrich Reddit
 # -----------------------
-def fetch_reddit_posts(subreddit_name: str, limit: int=100, query: str="disaster"):
+def checkpoint_key(subreddit_name: str, query: str) -> str:
+    return f"reddit:{subreddit_name.lower()}:{query}"
+
+def utc_datetime(ts: float) -> datetime:
+    # naive UTC, matching the NewsAPI records' publishedAt
+    return datetime.fromtimestamp(ts, timezone.utc).replace(tzinfo=None)
+
+def fetch_reddit_posts(subreddit_name: str, limit: int=100, query: str="disaster",
+                       since: Optional[Dict] = None) -> Tuple[List[Dict], bool]:
     """
-    Fetch latest posts matching the query.
+    Fetch posts matching the query, newest first, stopping at the `since`
+    checkpoint ({"created_utc", "fullname"}) so only posts newer than the last
+    run are returned. `limit` caps the number of posts scanned.
+
+    Returns (posts, complete). `complete` is False when `limit` cut the scan
+    short before it reached the checkpoint, i.e. posts between the checkpoint
+    and the oldest one returned were left out.
     """
-    posts = []
-    for post in reddit.subreddit(subreddit_name).search(query=query, sort="new", limit=limit):
+    posts, complete = [], True
+    for post in get_reddit().subreddit(subreddit_name).search(query=query, sort="new", limit=limit):
+        if since and (post.fullname == since.get("fullname") or post.created_utc < since["created_utc"]):
+            break
         posts.append({
             "title": post.title,
             "description": post.selftext[:200],
             "content": post.selftext,
             "url": post.url,
             "source": post.subreddit.display_name,
-            "publishedAt": datetime.utcfromtimestamp(post.created_utc)
+            "publishedAt": utc_datetime(post.created_utc),
+            "_subreddit": subreddit_name,
+            "_created_utc": post.created_utc,
+            "_fullname": post.fullname,
         })
-    return posts
+    else:
+        # the listing ran out: it only missed the checkpoint if it stopped because of `limit`
+        complete = not since or limit is None or len(posts) < limit
+    return posts, complete
+
+def fetch_all_subreddits(subreddits: List[str], limit: int=100, query: str="disaster",
+                         checkpoints: CheckpointStore = None) -> Tuple[Dict[str, List[Dict]], Set[str]]:
+    """
+    Fetch every subreddit concurrently, each from its own checkpoint.
+    Returns ({subreddit: posts}, subreddits whose scan stopped at `limit` before the checkpoint).
+    """
+    def fetch_one(name):
+        since = checkpoints.get(checkpoint_key(name, query)) if checkpoints else None
+        try:
+            posts, complete = fetch_reddit_posts(name, limit=limit, query=query, since=since)
+        except Exception as e:
+            logging.error("Failed to fetch r/%s: %s", name, e)
+            return name, [], False
+        logging.info("r/%s: %d posts newer than checkpoint %s%s", name, len(posts),
+                     since and since.get("fullname"), "" if complete else " (limit reached before it)")
+        return name, posts, complete
+
+    with timed_stage("fetch") as span, \
+            ThreadPoolExecutor(max_workers=max(1, min(REDDIT_FETCH_WORKERS, len(subreddits)))) as pool:
+        results = list(pool.map(fetch_one, subreddits))
+        span["records"] = sum(len(posts) for _, posts, _ in results)
+    by_subreddit = {name: posts for name, posts, _ in results}
+    incomplete = {name for name, _, complete in results if not complete}
+    return by_subreddit, incomplete
+
+def advance_checkpoints(checkpoints: CheckpointStore, by_subreddit: Dict[str, List[Dict]],
+                        query: str, failed_urls=(), incomplete=()):
+    """
+    Move each subreddit's high-water mark to its newest fetched post, but never
+    past a post that failed to index, so that post is fetched again next run.
+    Subreddits in `incomplete` keep their mark: their scan did not reach it, and
+    moving it would skip the posts in between for good (the next full scan
+    covers them; the dedup index drops what this run already indexed).
+    """
+    failed_urls = set(failed_urls)
+    for name, posts in by_subreddit.items():
+        if not posts or name in incomplete:
+            continue
+        failed = [p for p in posts if p["url"] in failed_urls]
+        if failed:
+            oldest = min(failed, key=lambda p: p["_created_utc"])
+            older = [p for p in posts if p["_created_utc"] < oldest["_created_utc"]]
+            if not older:
+                continue
+            newest = max(older, key=lambda p: p["_created_utc"])
+        else:
+            newest = max(posts, key=lambda p: p["_created_utc"])
+        key = checkpoint_key(name, query)
+        current = checkpoints.get(key)
+        if current and current["created_utc"] >= newest["_created_utc"]:
+            continue
+        checkpoints.set(key, {"created_utc": newest["_created_utc"], "fullname": newest["_fullname"]})
+
+def compute_enrichment(posts: List[Dict]) -> List[Dict]:
+    with timed_stage("ner", len(posts)):
+        locs = extract_locations_batch(registry.ner, [(p["title"], p["content"]) for p in posts],
+                                       batch_size=NER_BATCH_SIZE)
+    with timed_stage("sentiment", len(posts)):
+        severities = compute_severities_batch(registry.sentiment, [p["title"]+" "+p["content"] for p in posts],
+                                              batch_size=BATCH_SIZE)
+    with timed_stage("keywords", len(posts)):
+        types = keyword_matcher.match_many([p["title"]+" "+p["content"] for p in posts])
+    return [{"disaster_type": dtypes, "location": loc, "severity": severity}
+            for loc, severity, dtypes in zip(locs, severities, types)]
+
+def enrichment_version() -> str:
+    # types come from keywords only, so the synonym table is part of the result
+    return f"{registry.version()};config={config_fingerprint(DISASTER_TYPES, SYNONYMS)}"
 
 def enrich_reddit_posts(raw_posts: List[Dict]) -> pd.DataFrame:
     records = []
-    for p in raw_posts:
-        loc = extract_location(p["title"], p["content"])
+    results = get_enrichment_cache().enrich(raw_posts, compute_enrichment, enrichment_version(), "reddit")
+    # geocoded after the cache so the fallback location is never stored with the result
+    with timed_stage("geocode", len(raw_posts)):
+        geos = get_geo_batch([res["location"] for res in results])
+    for p, res, geo in zip(raw_posts, results, geos):
         rec = {
             "title": p["title"],
             "description": p["description"],
@@ -133,47 +236,68 @@ def enrich_reddit_posts(raw_posts: List[Dict]) -> pd.DataFrame:
             "url": p["url"],
             "source": "reddit",
             "publishedAt": p["publishedAt"],
-            "disaster_type": synonym_keyword_fallback(p["title"]+" "+p["content"]),
-            "location": loc,
-            "severity": compute_severity(p["title"]+" "+p["content"]),
-            "geo": get_geo(loc)
+            "disaster_type": res["disaster_type"],
+            "location": res["location"],
+            "severity": res["severity"],
+            "geo": geo
         }
         records.append(rec)
+    logging.info("Geocode cache: %s", get_geocoder().stats())
     return pd.DataFrame(records)
 
 # -----------------------
 # Elasticsearch Indexing
 # -----------------------
 def index_into_es(df: pd.DataFrame, es_client: Elasticsearch, index_name: str):
-    actions = [
-        {
-            "_op_type":"index",
-            "_index":index_name,
-            "_id":r["url"],
-            "_source":r.to_dict() if isinstance(r,pd.Series) else r
-        }
-        for _,r in df.iterrows()
-    ]
-    if actions:
-        helpers.bulk(es_client, actions)
-        logging.info("Indexed %d documents into '%s'.", len(actions), index_name)
+    result = index_dataframe(es_client, df, index_name)
+    return result["success"]
 
 # -----------------------
 # Main Runner
 # -----------------------
-def main(limit: int=100, query: str="disaster"):
+def main(limit: int=100, query: str="disaster", subreddits: List[str] = None, profile: bool = None):
     """
-    :param limit: number of latest posts to fetch
+    :param limit: max posts to scan per subreddit (the checkpoint usually stops earlier)
     :param query: search query string
+    :param subreddits: subreddits to search (default: REDDIT_SUBREDDITS)
+    :param profile: stack-sample the run (default: PROFILE_RUNS)
+    :return: run summary {"fetched", "new", "indexed", "failed"}; also appended to METRICS_RUN_LOG
     """
-    logging.info("Fetching Reddit posts...")
-    raw_posts = fetch_reddit_posts("naturaldisasters", limit=limit, query=query)
+    with record_run("reddit", profile) as run:
+        run["result"] = run_batch(limit=limit, query=query, subreddits=subreddits)
+    return run["result"]
+
+def run_batch(limit: int=100, query: str="disaster", subreddits: List[str] = None) -> Dict:
+    subreddits = subreddits or REDDIT_SUBREDDITS
+    checkpoints = get_checkpoints()
+    logging.info("Fetching Reddit posts from %d subreddit(s)...", len(subreddits))
+    by_subreddit, incomplete = fetch_all_subreddits(subreddits, limit=limit, query=query, checkpoints=checkpoints)
+    raw_posts = [p for posts in by_subreddit.values() for p in posts]
+    summary = {"fetched": len(raw_posts), "new": 0, "indexed": 0, "failed": 0}
     if not raw_posts:
-        logging.info("No Reddit posts found.")
-        return
+        logging.info("No new Reddit posts since the last run.")
+        return summary
+
+    dedup = get_dedup_index()
+    seen = dedup.contains_many([p["url"] for p in raw_posts])
+    new_posts, batch_urls = [], set()
+    for p, was_seen in zip(raw_posts, seen):
+        if not was_seen and p["url"] not in batch_urls:  # cross-posts share a URL
+            new_posts.append(p)
+            batch_urls.add(p["url"])
+    logging.info("Fetched %d posts, %d not seen before.", len(raw_posts), len(new_posts))
+    summary["new"] = len(new_posts)
+    if not new_posts:
+        advance_checkpoints(checkpoints, by_subreddit, query, incomplete=incomplete)
+        return summary
 
-    df = enrich_reddit_posts(raw_posts)
-    index_into_es(df, es, ES_INDEX)
+    df = enrich_reddit_posts(new_posts)
+    result = index_dataframe(get_es(), df, ES_INDEX)
+    failed = set(result["failed_ids"])
+    dedup.add_many([u for u in df["url"].tolist() if u not in failed])
+    advance_checkpoints(checkpoints, by_subreddit, query, failed_urls=failed, incomplete=incomplete)
+    summary.update(indexed=result["success"], failed=result["failed"])
+    return summary
 
 if __name__ == "__main__":
     main()
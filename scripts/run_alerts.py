@@ -3,6 +3,8 @@ import uuid
 from datetime import datetime, timedelta
 from elasticsearch import Elasticsearch
 
+from query_cache import invalidate
+
 ES_HOST = "http://localhost:9200"
 INDEX_NAME = "alerts"
 
@@ -36,6 +38,7 @@ def generate_sample_alerts(count=2):
 def insert_alert(alert):
     """Insert alert into Elasticsearch."""
     es.index(index=INDEX_NAME, id=alert["id"], document=alert)
+    invalidate(INDEX_NAME)
     print(f"Inserted alert: {alert['id']}")
 
 def cleanup_old_alerts(max_count=50):
@@ -50,6 +53,7 @@ def cleanup_old_alerts(max_count=50):
         for hit in hits[max_count:]:
             es.delete(index=INDEX_NAME, id=hit["_id"])
             print(f"Deleted old alert: {hit['_id']}")
+        invalidate(INDEX_NAME)
 
 # ----------------------
 # Main loop
@@ -0,0 +1,205 @@
+import os
+import time
+import queue
+import logging
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
+
+# -----------------------
+# Config
+# -----------------------
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", 256))          # items per stage inbox
+PIPELINE_BATCH_TIMEOUT = float(os.getenv("PIPELINE_BATCH_TIMEOUT", 0.5))  # seconds to fill a batch
+PIPELINE_REPORT_INTERVAL = float(os.getenv("PIPELINE_REPORT_INTERVAL", 10))
+
+_STOP = object()
+
+
+class Stage:
+    """
+    One step of a StreamingPipeline: `fn` takes a list of items and returns the
+    list to hand to the next stage (it may drop items). Each stage owns a bounded
+    inbox and `workers` threads that pull up to `batch_size` items at a time,
+    waiting at most `batch_timeout` seconds for a batch to fill.
+    """
+
+    def __init__(self, name: str, fn: Callable[[List], List], workers: int = 1, batch_size: int = 1,
+                 queue_size: int = PIPELINE_QUEUE_SIZE, batch_timeout: float = PIPELINE_BATCH_TIMEOUT):
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+        self.inbox = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._alive = workers
+        self.items_in = 0
+        self.items_out = 0
+        self.batches = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.max_batch_seconds = 0.0
+        self.max_depth = 0
+
+    def _next_batch(self):
+        """Block for the first item, then top the batch up until full or timed out."""
+        first = self.inbox.get()
+        if first is _STOP:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.batch_timeout
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self.inbox.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                self.inbox.put(_STOP)  # let the next get() (ours or a sibling's) see it
+                break
+            batch.append(item)
+        return batch
+
+    def stats(self) -> Dict:
+        return {
+            "queue_depth": self.inbox.qsize(),
+            "max_queue_depth": self.max_depth,
+            "workers": self.workers,
+            "items_in": self.items_in,
+            "items_out": self.items_out,
+            "batches": self.batches,
+            "errors": self.errors,
+            "avg_batch_seconds": round(self.busy_seconds / self.batches, 4) if self.batches else 0.0,
+            "max_batch_seconds": round(self.max_batch_seconds, 4),
+        }
+
+
+class StreamingPipeline:
+    """
+    Runs `source` (an iterable of items) through `stages` concurrently.
+
+    Every stage inbox is a bounded queue, so a slow stage blocks the ones in
+    front of it (back to the source) instead of letting items pile up in memory;
+    items reach the last stage as soon as each stage has handled their batch.
+    """
+
+    def __init__(self, source: Iterable, stages: List[Stage],
+                 report_interval: float = PIPELINE_REPORT_INTERVAL):
+        self.source = source
+        self.stages = stages
+        self.report_interval = report_interval
+        self.source_items = 0
+        self._done = threading.Event()
+
+    def _put(self, stage: Stage, item):
+        stage.inbox.put(item)  # blocks when full: backpressure
+        depth = stage.inbox.qsize()
+        if depth > stage.max_depth:
+            stage.max_depth = depth
+
+    def _feed(self):
+        first = self.stages[0]
+        try:
+            for item in self.source:
+                self.source_items += 1
+                self._put(first, item)
+        except Exception as e:
+            logging.error("Pipeline source failed: %s", e)
+        finally:
+            for _ in range(first.workers):
+                first.inbox.put(_STOP)
+
+    def _work(self, idx: int):
+        stage = self.stages[idx]
+        nxt = self.stages[idx + 1] if idx + 1 < len(self.stages) else None
+        while True:
+            batch = stage._next_batch()
+            if batch is None:
+                break
+            start = time.perf_counter()
+            try:
+                out = stage.fn(batch) or []
+            except Exception as e:
+                logging.exception("Stage %s failed on a batch of %d: %s", stage.name, len(batch), e)
+                out = []
+                with stage._lock:
+                    stage.errors += 1
+            elapsed = time.perf_counter() - start
+            with stage._lock:
+                stage.items_in += len(batch)
+                stage.items_out += len(out)
+                stage.batches += 1
+                stage.busy_seconds += elapsed
+                stage.max_batch_seconds = max(stage.max_batch_seconds, elapsed)
+            if nxt is not None:
+                for item in out:
+                    self._put(nxt, item)
+        with stage._lock:
+            stage._alive -= 1
+            last = stage._alive == 0
+        if last and nxt is not None:
+            for _ in range(nxt.workers):
+                nxt.inbox.put(_STOP)
+
+    def _report(self):
+        while not self._done.wait(self.report_interval):
+            logging.info("Pipeline: %s", self.depths())
+
+    def depths(self) -> Dict[str, int]:
+        return {s.name: s.inbox.qsize() for s in self.stages}
+
+    def stats(self) -> Dict[str, Dict]:
+        return {s.name: s.stats() for s in self.stages}
+
+    def run(self) -> Dict:
+        """Run to completion; returns per-stage stats."""
+        start = time.perf_counter()
+        threads = [threading.Thread(target=self._feed, name="pipeline-source", daemon=True)]
+        for idx, stage in enumerate(self.stages):
+            threads += [threading.Thread(target=self._work, args=(idx,), name=f"pipeline-{stage.name}-{w}",
+                                         daemon=True) for w in range(stage.workers)]
+        reporter = threading.Thread(target=self._report, name="pipeline-report", daemon=True)
+        for t in threads:
+            t.start()
+        reporter.start()
+        for t in threads:
+            t.join()
+        self._done.set()
+        stats = {"source_items": self.source_items, "seconds": round(time.perf_counter() - start, 3),
+                 "stages": self.stats()}
+        logging.info("Pipeline finished: %s", stats)
+        return stats
+
+
+def latency_tracker(clock_key: str = "_fetched_at"):
+    """
+    Returns (stamp, observe, summary): stamp(item) records when an item entered
+    the pipeline, observe(items) records end-to-end latency at the last stage.
+    """
+    lock = threading.Lock()
+    samples: List[float] = []
+
+    def stamp(item: dict) -> dict:
+        item[clock_key] = time.monotonic()
+        return item
+
+    def observe(items: List[dict]):
+        now = time.monotonic()
+        with lock:
+            samples.extend(now - it[clock_key] for it in items if clock_key in it)
+
+    def summary() -> Optional[Dict[str, float]]:
+        with lock:
+            if not samples:
+                return None
+            ordered = sorted(samples)
+        return {
+            "count": len(ordered),
+            "p50_seconds": round(ordered[len(ordered) // 2], 3),
+            "p95_seconds": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+            "max_seconds": round(ordered[-1], 3),
+        }
+
+    return stamp, observe, summary
@@ -0,0 +1,18 @@
+import os
+import sys
+import tempfile
+
+# The ingestion scripts import each other by plain name, as they do when run
+# from scripts/; the stubs live with the benchmarks; backend.app needs the root.
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+for path in (ROOT, os.path.join(ROOT, "scripts"), os.path.join(ROOT, "benchmarks")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+# Module-level defaults are read at import time: keep every store and cache out of data/
+WORKDIR = tempfile.mkdtemp(prefix="tests_")
+for var, name in (("QUERY_CACHE_PATH", "query_cache.sqlite"), ("GEOCACHE_PATH", "geocode.sqlite"),
+                  ("ENRICHMENT_CACHE_PATH", "enrichment.sqlite"), ("DEDUP_INDEX_PATH", "url_index"),
+                  ("DATASET_PATH", "disasters"), ("PARQUET_PATH", "legacy.parquet"),
+                  ("REDDIT_CHECKPOINT_PATH", "reddit_checkpoints.json"), ("METRICS_RUN_LOG", "pipeline_runs.jsonl")):
+    os.environ.setdefault(var, os.path.join(WORKDIR, name))
@@ -0,0 +1,39 @@
+import os
+
+from dedup_index import UrlDedupIndex
+
+
+def test_add_and_contains(tmp_path):
+    index = UrlDedupIndex(str(tmp_path))
+    assert index.add_many(["https://a.test/1", "https://a.test/2", "https://a.test/1", "", None]) == 2
+    assert index.contains_many(["https://a.test/1", "https://a.test/3", "", None]) == [True, False, False, False]
+    assert index.add_many(["https://a.test/2", "https://a.test/3"]) == 1
+    assert len(index) == 3
+
+
+def test_persists_across_reopen_and_merge(tmp_path):
+    index = UrlDedupIndex(str(tmp_path), merge_threshold=4)
+    index.add_many([f"https://a.test/{i}" for i in range(3)])
+    assert not os.path.exists(index.base_path)  # below the threshold: still only in the log
+    index.add_many([f"https://a.test/{i}" for i in range(3, 6)])
+    assert os.path.getsize(index.base_path) == 6 * 8 and os.path.getsize(index.log_path) == 0
+
+    reopened = UrlDedupIndex(str(tmp_path))
+    assert all(reopened.contains_many([f"https://a.test/{i}" for i in range(6)]))
+    assert not reopened.contains("https://a.test/6")
+
+
+def test_sees_writes_from_another_instance(tmp_path):
+    first = UrlDedupIndex(str(tmp_path))
+    second = UrlDedupIndex(str(tmp_path))
+    first.add_many(["https://a.test/1"])
+    assert second.contains("https://a.test/1")
+    assert second.add_many(["https://a.test/1", "https://a.test/2"]) == 1
+    assert first.contains("https://a.test/2")
+
+
+def test_bootstrap_only_seeds_an_empty_index(tmp_path):
+    index = UrlDedupIndex(str(tmp_path))
+    assert index.bootstrap(["https://a.test/1", "https://a.test/2"]) == 2
+    assert index.bootstrap(["https://a.test/3"]) == 0
+    assert not index.contains("https://a.test/3")
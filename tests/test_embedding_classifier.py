@@ -0,0 +1,28 @@
+import numpy as np
+
+import enrichment
+from enrichment import EmbeddingClassifier
+
+# unit vectors: the label prototypes are the axes, texts are mixes of them
+VECTORS = {
+    "flood": [1.0, 0.0, 0.0],
+    "wildfire": [0.0, 1.0, 0.0],
+    "rivers burst their banks": [0.9, 0.1, 0.42],
+    "floods and then fires": [0.6, 0.55, 0.58],
+    "election results": [0.1, 0.12, 0.99],
+}
+
+
+def fake_embed_texts(embedder, texts, **kwargs):
+    rows = np.array([VECTORS[t] for t in texts], dtype=np.float32)
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+def test_cosine_cutoffs(monkeypatch):
+    monkeypatch.setattr(enrichment, "embed_texts", fake_embed_texts)
+    clf = EmbeddingClassifier(None, {"flood": "flood", "wildfire": "wildfire"})
+    texts = ["rivers burst their banks", "floods and then fires", "election results"]
+    sims = clf.scores(texts)
+    assert np.allclose(sims[0], [0.904, 0.1], atol=0.01)
+    assert clf.classify_top2(texts, 0.35, 0.25) == [["flood"], ["flood", "wildfire"], ["unknown"]]
+    assert clf.labels_for(sims, 0.95, 0.95) == [["unknown"]] * 3
@@ -0,0 +1,59 @@
+import pytest
+
+from enrichment_cache import EnrichmentCache, config_fingerprint
+
+STORY = {"title": "Floods hit Assam", "description": "Rivers overflow", "content": "Thousands displaced."}
+
+
+class Compute:
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+
+    def __call__(self, items):
+        self.calls += len(items)
+        return [dict(self.result) for _ in items]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return EnrichmentCache(str(tmp_path / "enrichment.sqlite"))
+
+
+def test_repeat_content_under_another_url_is_a_hit(cache):
+    compute = Compute({"disaster_type": ["flood"], "location": "Assam", "severity": "high"})
+    first = cache.enrich([dict(STORY, url="a")], compute, "v1", "newsapi")
+    again = cache.enrich([dict(STORY, url="b", title="FLOODS hit Assam!")], compute, "v1", "newsapi")
+    assert compute.calls == 1
+    assert again == first == [{"disaster_type": ["flood"], "location": "Assam", "severity": "high"}]
+
+
+def test_pipelines_do_not_share_results(cache):
+    news = Compute({"disaster_type": ["flood"], "location": "Assam", "severity": "high"})
+    reddit = Compute({"disaster_type": [], "location": "Guwahati", "severity": "low"})
+    cache.enrich([STORY], news, "v1", "newsapi")
+    assert cache.enrich([STORY], reddit, "v1", "reddit")[0]["location"] == "Guwahati"
+    assert reddit.calls == 1
+    assert cache.enrich([STORY], news, "v1", "newsapi")[0]["location"] == "Assam"
+    assert news.calls == 1
+
+
+def test_config_change_misses():
+    assert config_fingerprint(["flood"], {"deluge": "flood"}, 0.25) != config_fingerprint(["flood"], {}, 0.25)
+    assert config_fingerprint(["flood"], {}, 0.25) != config_fingerprint(["flood"], {}, 0.3)
+    assert config_fingerprint(["flood"], {"a": 1, "b": 2}) == config_fingerprint(["flood"], {"b": 2, "a": 1})
+
+
+def test_geo_is_not_stored(cache):
+    compute = Compute({"disaster_type": ["flood"], "location": "Nowhere", "severity": "low",
+                       "geo": {"lat": 20.5937, "lon": 78.9629}})
+    cache.enrich([STORY], compute, "v1", "newsapi")
+    assert "geo" not in cache.enrich([STORY], compute, "v1", "newsapi")[0]
+
+
+def test_duplicates_in_one_batch_are_computed_once(cache):
+    compute = Compute({"disaster_type": ["flood"], "location": "", "severity": "low"})
+    results = cache.enrich([STORY, dict(STORY, url="x"), STORY], compute, "v1", "newsapi")
+    assert compute.calls == 1
+    assert len(results) == 3
+    assert cache.stats()["hits"] == 0 and cache.stats()["misses"] == 3
@@ -0,0 +1,44 @@
+import difflib
+
+import pytest
+
+import gazetteer
+from gazetteer import Gazetteer, FUZZY_CUTOFF
+
+
+@pytest.fixture(scope="module")
+def gaz():
+    return Gazetteer()
+
+
+def typos(key):
+    """Single-character deletions, substitutions and transpositions of `key`."""
+    for i in range(len(key)):
+        yield key[:i] + key[i + 1:]
+        yield key[:i] + "x" + key[i + 1:]
+        if i + 1 < len(key):
+            yield key[:i] + key[i + 1] + key[i] + key[i + 2:]
+
+
+def test_exact_and_suffixed_names(gaz):
+    assert gaz.lookup("India") == gaz.lookup("Bharat")
+    assert gaz.lookup("Assam State") == gaz.lookup("assam")
+    assert gaz.lookup("Atlantis") is None
+
+
+def test_fuzzy_matches_a_full_difflib_scan(gaz):
+    checked = 0
+    for key in gaz._keys[::3]:
+        for query in typos(key):
+            if len(query) < gazetteer.FUZZY_MIN_LENGTH or gaz._exact(query) is not None:
+                continue
+            full = difflib.get_close_matches(query, gaz._keys, n=1, cutoff=FUZZY_CUTOFF)
+            expected = gaz._exact(full[0]) if full else None
+            assert gaz.lookup_id(query) == expected, query
+            checked += 1
+    assert checked > 1000
+
+
+def test_fuzzy_can_be_disabled(gaz):
+    assert gaz.lookup("Bangladsh") == gaz.lookup("Bangladesh")
+    assert gaz.lookup("Bangladsh", fuzzy=False) is None
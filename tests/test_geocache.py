@@ -0,0 +1,76 @@
+from collections import namedtuple
+
+import pytest
+
+from geocache import CachedGeocoder, GeoCache, RateLimiter
+from gazetteer import Gazetteer
+from model_registry import ModelRegistry
+
+Location = namedtuple("Location", "latitude longitude")
+
+
+class StubGeolocator:
+    def __init__(self, places):
+        self.places = places
+        self.queries = []
+
+    def geocode(self, query):
+        self.queries.append(query)
+        return self.places.get(query)
+
+
+@pytest.fixture
+def geolocator():
+    return StubGeolocator({"Springfield": Location(39.8, -89.6)})
+
+
+def geocoder(tmp_path, geolocator, gazetteer):
+    return CachedGeocoder(GeoCache(str(tmp_path / "geo.sqlite")), RateLimiter(0), gazetteer, geolocator=geolocator)
+
+
+def test_gazetteer_then_cache_then_remote(tmp_path, geolocator):
+    geo = geocoder(tmp_path, geolocator, Gazetteer())
+    assert geo.geocode_many(["Assam", "Springfield", "Nowhere", "springfield!"]) == [
+        Gazetteer().lookup("Assam"), {"lat": 39.8, "lon": -89.6}, None, {"lat": 39.8, "lon": -89.6}]
+    assert geolocator.queries == ["Springfield", "Nowhere"]  # deduplicated; the gazetteer answered Assam
+
+    again = geocoder(tmp_path, geolocator, Gazetteer())  # fresh counters, same on-disk cache
+    again.geocode_many(["Springfield", "Nowhere"])
+    assert geolocator.queries == ["Springfield", "Nowhere"]
+    assert again.stats()["hits"] == 1 and again.stats()["negative_hits"] == 1
+
+
+def test_geolocator_can_be_swapped_on_a_running_geocoder(tmp_path, geolocator):
+    geo = geocoder(tmp_path, None, Gazetteer())
+    geo.geolocator = geolocator
+    assert geo.geocode("Springfield") == {"lat": 39.8, "lon": -89.6}
+
+
+def test_registry_set_replaces_a_model_without_loading():
+    registry = ModelRegistry()
+    fake = object()
+    registry.set("ner", fake)
+    assert registry.ner is fake
+    assert registry.is_loaded("ner") and not registry.is_loaded("classifier")
+    with pytest.raises(KeyError):
+        registry.set("translator", fake)
+
+
+class FailingGeolocator:
+    def __init__(self):
+        self.calls = 0
+
+    def geocode(self, query):
+        self.calls += 1
+        raise TimeoutError("nominatim unavailable")
+
+
+def test_remote_retries_sleep_only_between_attempts(tmp_path, monkeypatch):
+    import geocache
+    sleeps = []
+    monkeypatch.setattr(geocache.time, "sleep", sleeps.append)
+    failing = FailingGeolocator()
+    geo = geocoder(tmp_path, failing, Gazetteer())
+    assert geo._resolve_remote("Nowhere") == (False, None)
+    assert failing.calls == geocache.NOMINATIM_RETRIES
+    assert len(sleeps) == geocache.NOMINATIM_RETRIES - 1
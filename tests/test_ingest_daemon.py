@@ -0,0 +1,86 @@
+import threading
+import time
+
+from ingest_daemon import IngestDaemon, Job
+
+
+def test_daemon_jobs_never_run_concurrently():
+    active, overlaps = [], []
+
+    def work():
+        active.append(1)
+        if len(active) > 1:
+            overlaps.append(len(active))
+        time.sleep(0.2)
+        active.pop()
+        return {}
+
+    jobs = [Job("a", work, 3600), Job("b", work, 3600)]
+    IngestDaemon(jobs, port=0)
+    threads = [threading.Thread(target=job.run_once) for job in jobs for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert overlaps == []
+    assert [job.runs for job in jobs] == [1, 1]  # each job's second call was skipped, not queued
+    assert [job.skipped for job in jobs] == [1, 1]
+
+
+def test_waiting_job_reports_it():
+    release = threading.Event()
+    a = Job("a", lambda: release.wait(5) and {}, 3600)
+    b = Job("b", lambda: {}, 3600)
+    IngestDaemon([a, b], port=0)
+    ta = threading.Thread(target=a.run_once)
+    ta.start()
+    while not a.running:
+        time.sleep(0.01)
+    tb = threading.Thread(target=b.run_once)
+    tb.start()
+    while not b.waiting:
+        time.sleep(0.01)
+    assert b.status()["waiting"] and not b.status()["running"]
+    release.set()
+    ta.join()
+    tb.join()
+    assert b.runs == 1 and not b.waiting
+
+
+def test_waiting_job_does_not_start_after_stop():
+    release = threading.Event()
+    a = Job("a", lambda: release.wait(5) and {}, 3600)
+    b = Job("b", lambda: {}, 3600)
+    daemon = IngestDaemon([a, b], port=0)
+    ta = threading.Thread(target=a.run_once)
+    ta.start()
+    while not a.running:
+        time.sleep(0.01)
+    results = []
+    tb = threading.Thread(target=lambda: results.append(b.run_once()))
+    tb.start()
+    while not b.waiting:
+        time.sleep(0.01)
+    daemon.stop_event.set()
+    release.set()
+    ta.join()
+    tb.join()
+    assert results == [False] and b.runs == 0 and a.runs == 1
+
+
+def test_shutdown_waits_for_manual_runs():
+    finished = []
+
+    def work():
+        time.sleep(0.3)
+        finished.append(1)
+        return {}
+
+    daemon = IngestDaemon([Job("a", work, 3600)], port=0)
+    assert daemon.trigger("a")
+    while not daemon.jobs["a"].running:
+        time.sleep(0.01)
+    daemon.stop_event.set()
+    assert not daemon.trigger("a")
+    daemon.shutdown()
+    assert finished == [1]
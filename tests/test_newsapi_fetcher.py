@@ -0,0 +1,82 @@
+import json
+import asyncio
+
+import pytest
+
+import stub_newsapi
+from newsapi_fetcher import NewsApiFetcher
+
+
+@pytest.fixture(scope="module")
+def fixture_urls():
+    with open(stub_newsapi.FIXTURE, encoding="utf-8") as f:
+        return [a["url"] for a in json.load(f)["articles"]]
+
+
+def fetch(server, budget: int, page_size: int):
+    fetcher = NewsApiFetcher("stub", base_url=f"http://127.0.0.1:{server.server_port}/v2/everything",
+                             rate_per_sec=1000, burst=1000, page_size=page_size)
+    return fetcher, asyncio.run(fetcher.fetch_async([""], budget))  # "" matches every fixture article
+
+
+def test_budget_spanning_pages_is_contiguous(fixture_urls):
+    server = stub_newsapi.serve(0)
+    try:
+        fetcher, articles = fetch(server, budget=25, page_size=10)
+    finally:
+        server.shutdown()
+    assert [a["url"] for a in articles] == fixture_urls[:25]
+    assert fetcher.requests_made == 3
+
+
+def test_budget_smaller_than_page_is_one_request(fixture_urls):
+    server = stub_newsapi.serve(0)
+    try:
+        fetcher, articles = fetch(server, budget=7, page_size=100)
+    finally:
+        server.shutdown()
+    assert [a["url"] for a in articles] == fixture_urls[:7]
+    assert fetcher.requests_made == 1
+
+
+def test_stops_at_last_page(fixture_urls):
+    server = stub_newsapi.serve(0)
+    try:
+        fetcher, articles = fetch(server, budget=500, page_size=20)
+    finally:
+        server.shutdown()
+    assert [a["url"] for a in articles] == fixture_urls
+    assert fetcher.requests_made == 3
+
+
+def test_result_cap_ends_query(fixture_urls):
+    server = stub_newsapi.serve(0, max_results=20)
+    try:
+        _, articles = fetch(server, budget=40, page_size=10)
+    finally:
+        server.shutdown()
+    assert [a["url"] for a in articles] == fixture_urls[:20]
+
+
+def test_html_error_page_is_retried(fixture_urls):
+    server = stub_newsapi.serve(0, fail_every=2)
+    try:
+        fetcher, articles = fetch(server, budget=20, page_size=10)
+    finally:
+        server.shutdown()
+    assert [a["url"] for a in articles] == fixture_urls[:20]
+    assert server.RequestHandlerClass.counters["failed"] >= 1
+
+
+def test_iter_pages_yields_each_page_as_fetched(fixture_urls):
+    server = stub_newsapi.serve(0)
+    try:
+        fetcher = NewsApiFetcher("stub", base_url=f"http://127.0.0.1:{server.server_port}/v2/everything",
+                                 rate_per_sec=1000, burst=1000, page_size=10)
+        pages = list(fetcher.iter_pages(["", ""], 25))  # the second query repeats the first: all duplicates
+    finally:
+        server.shutdown()
+    assert [len(p) for p in pages] == [10, 10, 5]
+    assert [a["url"] for p in pages for a in p] == fixture_urls[:25]
+    stamps = [p[0]["_fetched_at"] for p in pages]
+    assert stamps == sorted(stamps)
@@ -0,0 +1,109 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+import stub_elasticsearch
+from backend.app.services import elastic
+from backend.app.services.pagination import encode_cursor, decode_cursor
+
+DEFAULTS = {"q": "", "severity": "", "limit": 50, "fields": "list"}
+
+
+def test_cursor_round_trip():
+    token = encode_cursor({"params": {"q": "flood", "limit": 5}, "after": [1718000000000, "https://a.test/1"]})
+    params, state = decode_cursor(token, DEFAULTS)
+    assert params == {"q": "flood", "severity": "", "limit": 5, "fields": "list"}
+    assert state["after"] == [1718000000000, "https://a.test/1"]
+
+
+def test_cursor_params_are_coerced_and_unknown_keys_dropped():
+    token = encode_cursor({"params": {"limit": "7", "index": "secrets"}, "after": []})
+    params, _ = decode_cursor(token, DEFAULTS)
+    assert params["limit"] == 7
+    assert "index" not in params
+
+
+@pytest.mark.parametrize("token", [
+    "not base64 !",
+    encode_cursor(["a", "list"]),
+    encode_cursor({"params": {}}),
+    encode_cursor({"params": {}, "after": "x"}),
+    encode_cursor({"params": {"limit": "many"}, "after": []}),
+    encode_cursor({"params": {"limit": 0}, "after": []}),
+    encode_cursor({"params": {"limit": -5}, "after": []}),
+    encode_cursor({"params": {"limit": 10 ** 6}, "after": []}),
+])
+def test_malformed_cursor_is_400(token):
+    with pytest.raises(HTTPException) as e:
+        decode_cursor(token, DEFAULTS)
+    assert e.value.status_code == 400
+
+
+@pytest.fixture(scope="module")
+def es():
+    server = stub_elasticsearch.serve(0, keep=True)
+    store = server.RequestHandlerClass.state["store"]
+    for i in range(23):
+        url = f"https://news.test/{i:02d}"
+        store[("disasters", url)] = {"title": f"t{i}", "url": url, "severity": "high", "content": "long text",
+                                     "publishedAt": f"2024-01-{i % 9 + 1:02d}T00:00:00Z"}
+    for i in range(7):
+        store[("alerts", f"a{i}")] = {"id": f"a{i}", "severity": "high", "description": "d",
+                                      "created_at": f"2024-02-0{i % 3 + 1}T00:00:00"}
+    yield server
+    server.shutdown()
+
+
+def walk(es, monkeypatch, path):
+    monkeypatch.setattr(elastic, "ELASTICSEARCH_HOST", f"http://127.0.0.1:{es.server_port}")
+    from backend.app.main import app
+
+    async def run():
+        pages = []
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://api") as client:
+                cursor = None
+                while True:
+                    r = await client.get(path, params={"cursor": cursor} if cursor else None)
+                    assert r.status_code == 200, r.text
+                    pages.append(r.json())
+                    cursor = r.headers.get("X-Next-Cursor")
+                    if not cursor:
+                        return pages
+    return asyncio.run(run())
+
+
+def test_disaster_pages_cover_every_hit_once_newest_first(es, monkeypatch):
+    pages = walk(es, monkeypatch, "/disasters/search?limit=5")
+    assert [len(p) for p in pages] == [5, 5, 5, 5, 3]
+    hits = [h for page in pages for h in page]
+    assert len({h["id"] for h in hits}) == 23
+    keys = [(h["publishedAt"], h["url"]) for h in hits]
+    assert keys == sorted(keys, key=lambda k: (-int(k[0][8:10]), k[1]))
+    assert "content" not in hits[0]  # list projection
+
+
+def test_alert_pages(es, monkeypatch):
+    pages = walk(es, monkeypatch, "/alerts/search?limit=3")
+    assert [len(p) for p in pages] == [3, 3, 1]
+    assert len({a["id"] for page in pages for a in page}) == 7
+
+
+def test_exact_page_multiple_has_no_empty_last_page(es, monkeypatch):
+    pages = walk(es, monkeypatch, "/alerts/search?limit=7")
+    assert [len(p) for p in pages] == [7]
+
+
+@pytest.mark.parametrize("path", ["/disasters/search", "/alerts/search"])
+@pytest.mark.parametrize("limit", [0, -1, 10 ** 6])
+def test_out_of_range_limit_is_rejected(es, monkeypatch, path, limit):
+    monkeypatch.setattr(elastic, "ELASTICSEARCH_HOST", f"http://127.0.0.1:{es.server_port}")
+    from backend.app.main import app
+
+    async def run():
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://api") as client:
+                return await client.get(path, params={"limit": limit})
+    assert asyncio.run(run()).status_code == 422
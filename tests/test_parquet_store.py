@@ -0,0 +1,41 @@
+import pandas as pd
+
+import fetch_and_index
+from parquet_store import ParquetStore
+
+
+def rows(day, n, start=0):
+    return pd.DataFrame([{
+        "title": f"t{i}", "description": "", "content": "", "url": f"https://news.test/{day}/{i}",
+        "source": "test", "publishedAt": f"2024-01-{day:02d}T12:00:00", "disaster_type": ["flood"],
+        "location": "Assam", "severity": "high", "geo": None,
+    } for i in range(start, start + n)])
+
+
+def test_partitions_to_compact_counts_per_partition(tmp_path):
+    store = ParquetStore(str(tmp_path))
+    for day in range(1, 5):  # four partitions of one fragment each
+        store.append(rows(day, 1))
+    assert len(store.fragments()) == 4
+    assert store.partitions_to_compact(3) == []
+
+    for i in range(2):
+        store.append(rows(1, 1, start=i + 1))
+    assert store.partitions_to_compact(3) == ["2024-01-01"]
+
+
+def test_append_compacts_only_when_a_partition_reaches_the_threshold(tmp_path, monkeypatch):
+    monkeypatch.setattr(fetch_and_index, "COMPACT_MIN_FRAGMENTS", 3)
+    store = ParquetStore(str(tmp_path))
+    merged = []
+    monkeypatch.setattr(store, "compact_in_background", lambda n: merged.append(store.compact(n)))
+    for day in range(1, 5):
+        fetch_and_index.append_to_parquet(rows(day, 1), store)
+    assert merged == []  # four fragments, but spread over four partitions
+
+    fetch_and_index.append_to_parquet(rows(1, 1, start=1), store)
+    assert merged == []
+    fetch_and_index.append_to_parquet(rows(1, 2, start=2), store)
+    assert merged == [3]
+    assert len(store.fragments("2024-01-01")) == 1
+    assert len(store.read(columns=["url"])) == 7
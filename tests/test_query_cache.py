@@ -0,0 +1,150 @@
+import asyncio
+import time
+
+import pytest
+
+import query_cache
+from query_cache import QueryCache, cache_key
+from backend.app.services import cache as api_cache
+
+
+@pytest.fixture
+def qc(tmp_path):
+    return QueryCache(str(tmp_path / "qc.sqlite"), ttl=60, max_entries=3)
+
+
+def test_cache_key_normalizes_params():
+    assert cache_key("/disasters", {"q": " flood ", "severity": "", "limit": 5}) == \
+        cache_key("/disasters", {"limit": 5, "q": "flood", "after": None})
+    assert cache_key("/disasters", {"q": "flood"}) != cache_key("/alerts", {"q": "flood"})
+
+
+def test_put_get_and_bump_invalidates(qc):
+    gen = qc.generation("disasters")
+    qc.put("k", "disasters", b"v", gen)
+    assert qc.get("k") == b"v"
+    assert qc.bump("disasters") == gen + 1
+    assert qc.get("k") is None
+
+
+def test_result_computed_before_a_bump_is_never_current(qc):
+    gen = qc.generation("disasters")
+    qc.bump("disasters")  # an index write lands while the query runs
+    qc.put("k", "disasters", b"stale", gen)
+    assert qc.get("k") is None
+
+
+def test_ttl_expiry(qc):
+    qc.ttl = 0.05
+    qc.put("k", "disasters", b"v", qc.generation("disasters"))
+    time.sleep(0.1)
+    assert qc.get("k") is None
+
+
+def test_lru_eviction(qc, monkeypatch):
+    monkeypatch.setattr(query_cache, "TOUCH_INTERVAL", 0)
+    for i in range(3):
+        qc.put(f"k{i}", "disasters", b"v", 0)
+        time.sleep(0.01)
+    assert qc.get("k0") == b"v"  # k0 is now the most recently used
+    qc.put("k3", "disasters", b"v", 0)
+    assert len(qc) == 3
+    assert qc.get("k1") is None
+    assert qc.get("k0") == b"v"
+
+
+def test_unusable_database_is_a_miss(qc):
+    qc.close()
+    assert qc.get("k") is None
+    assert qc.generation("disasters") is None
+    qc.put("k", "disasters", b"v", 0)  # must not raise
+    assert qc.errors == 3
+
+
+def run_cached(endpoint, params, compute):
+    async def run():
+        response = await api_cache.cached_json(endpoint, "disasters", params, compute)
+        return response.headers["X-Cache"], response.body
+    return asyncio.run(run())
+
+
+def counting_compute(calls):
+    async def compute():
+        calls.append(1)
+        return [{"n": len(calls)}]
+    return compute
+
+
+def test_cached_json_hit_after_miss_and_miss_after_bump(tmp_path, monkeypatch):
+    import scripts.query_cache
+    shared = QueryCache(str(tmp_path / "api.sqlite"), ttl=60)
+    monkeypatch.setattr(scripts.query_cache, "_cache", shared)
+    calls = []
+    compute = counting_compute(calls)
+
+    assert run_cached("/disasters", {"q": "flood"}, compute) == ("miss", b'[{"n":1}]')
+    assert run_cached("/disasters", {"q": "flood"}, compute) == ("hit", b'[{"n":1}]')
+    shared.bump("disasters")
+    assert run_cached("/disasters", {"q": "flood"}, compute) == ("miss", b'[{"n":2}]')
+
+
+def test_cached_json_serves_results_when_the_cache_is_broken(tmp_path, monkeypatch):
+    import scripts.query_cache
+    broken = QueryCache(str(tmp_path / "api.sqlite"), ttl=60)
+    broken.close()
+    monkeypatch.setattr(scripts.query_cache, "_cache", broken)
+    calls = []
+    compute = counting_compute(calls)
+
+    assert run_cached("/disasters", {"q": "flood"}, compute) == ("miss", b'[{"n":1}]')
+    assert run_cached("/disasters", {"q": "flood"}, compute) == ("miss", b'[{"n":2}]')
+
+
+def test_shared_in_flight_query_runs_once(tmp_path, monkeypatch):
+    import scripts.query_cache
+    monkeypatch.setattr(scripts.query_cache, "_cache", QueryCache(str(tmp_path / "api.sqlite"), ttl=60))
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return []
+
+    async def run():
+        responses = await asyncio.gather(*(api_cache.cached_json("/disasters", "disasters", {"q": "x"}, compute)
+                                           for _ in range(5)))
+        return sorted(r.headers["X-Cache"] for r in responses)
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert results.count("miss") == 1
+    assert set(results) <= {"miss", "shared", "hit"}
+
+
+def test_bulk_indexing_invalidates_the_index_scope(monkeypatch):
+    import pandas as pd
+    from elasticsearch import Elasticsearch
+    import es_indexing
+    import stub_elasticsearch
+
+    server = stub_elasticsearch.serve(0)
+    try:
+        es = Elasticsearch(f"http://127.0.0.1:{server.server_port}")
+        shared = query_cache.get_query_cache()
+        before = shared.generation("disasters")
+        df = pd.DataFrame([{"url": f"https://news.test/{i}", "title": "t", "publishedAt": "2024-01-01T00:00:00"}
+                           for i in range(3)])
+        result = es_indexing.index_dataframe(es, df, "disasters", thread_count=1)
+        assert result["success"] == 3
+        assert shared.generation("disasters") == before + 1
+        assert shared.generation("alerts") == 0
+    finally:
+        server.shutdown()
+
+
+def test_api_invalidate_bumps_the_shared_generation(tmp_path, monkeypatch):
+    import scripts.query_cache
+    shared = QueryCache(str(tmp_path / "api.sqlite"), ttl=60)
+    monkeypatch.setattr(scripts.query_cache, "_cache", shared)
+    asyncio.run(api_cache.invalidate("alerts"))
+    assert shared.generation("alerts") == 1
@@ -0,0 +1,85 @@
+from types import SimpleNamespace
+
+import pytest
+
+import reddit
+from checkpoints import CheckpointStore
+
+QUERY = "disaster"
+
+
+def make_posts(n: int):
+    """n posts, newest first, one minute apart."""
+    return [SimpleNamespace(title=f"post {i}", selftext="flood", url=f"https://reddit.test/{i}",
+                            subreddit=SimpleNamespace(display_name="test"),
+                            created_utc=1_700_000_000.0 + i * 60, fullname=f"t3_{i}")
+            for i in reversed(range(n))]
+
+
+@pytest.fixture
+def listing(monkeypatch):
+    posts = make_posts(30)
+
+    def search(query, sort, limit):
+        return iter(posts[:limit] if limit is not None else posts)
+
+    client = SimpleNamespace(subreddit=lambda name: SimpleNamespace(search=search))
+    monkeypatch.setattr(reddit, "get_reddit", lambda: client)
+    return posts
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CheckpointStore(str(tmp_path / "checkpoints.json"))
+
+
+def mark_of(post):
+    return {"created_utc": post.created_utc, "fullname": post.fullname}
+
+
+def test_scan_stops_at_checkpoint(listing, store):
+    store.set(reddit.checkpoint_key("test", QUERY), mark_of(listing[10]))
+    by_subreddit, incomplete = reddit.fetch_all_subreddits(["test"], limit=100, query=QUERY, checkpoints=store)
+    assert [p["_fullname"] for p in by_subreddit["test"]] == [p.fullname for p in listing[:10]]
+    assert incomplete == set()
+
+    reddit.advance_checkpoints(store, by_subreddit, QUERY, incomplete=incomplete)
+    assert store.get(reddit.checkpoint_key("test", QUERY)) == mark_of(listing[0])
+
+
+def test_limit_before_checkpoint_keeps_mark(listing, store):
+    key = reddit.checkpoint_key("test", QUERY)
+    store.set(key, mark_of(listing[20]))
+    by_subreddit, incomplete = reddit.fetch_all_subreddits(["test"], limit=5, query=QUERY, checkpoints=store)
+    assert len(by_subreddit["test"]) == 5
+    assert incomplete == {"test"}
+
+    reddit.advance_checkpoints(store, by_subreddit, QUERY, incomplete=incomplete)
+    assert store.get(key) == mark_of(listing[20])
+
+    # a later full scan still sees posts 5..19 and then moves the mark
+    by_subreddit, incomplete = reddit.fetch_all_subreddits(["test"], limit=100, query=QUERY, checkpoints=store)
+    assert len(by_subreddit["test"]) == 20
+    reddit.advance_checkpoints(store, by_subreddit, QUERY, incomplete=incomplete)
+    assert store.get(key) == mark_of(listing[0])
+
+
+def test_cold_start_sets_mark(listing, store):
+    by_subreddit, incomplete = reddit.fetch_all_subreddits(["test"], limit=5, query=QUERY, checkpoints=store)
+    assert incomplete == set()
+    reddit.advance_checkpoints(store, by_subreddit, QUERY, incomplete=incomplete)
+    assert store.get(reddit.checkpoint_key("test", QUERY)) == mark_of(listing[0])
+
+
+def test_failed_post_holds_mark_below_it(listing, store):
+    by_subreddit, _ = reddit.fetch_all_subreddits(["test"], limit=10, query=QUERY, checkpoints=store)
+    reddit.advance_checkpoints(store, by_subreddit, QUERY, failed_urls=[listing[3].url])
+    assert store.get(reddit.checkpoint_key("test", QUERY)) == mark_of(listing[4])
+
+
+def test_store_survives_reload(tmp_path):
+    path = str(tmp_path / "checkpoints.json")
+    CheckpointStore(path).set("reddit:test:disaster", {"created_utc": 1.0, "fullname": "t3_a"})
+    assert CheckpointStore(path).all() == {"reddit:test:disaster": {"created_utc": 1.0, "fullname": "t3_a"}}
+    (tmp_path / "broken.json").write_text("{not json")
+    assert CheckpointStore(str(tmp_path / "broken.json")).all() == {}
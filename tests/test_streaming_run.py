@@ -0,0 +1,55 @@
+import pytest
+from elasticsearch import Elasticsearch
+
+import bench_ingestion
+import fetch_and_index
+import stub_elasticsearch
+import stub_newsapi
+from dedup_index import UrlDedupIndex
+from enrichment_cache import EnrichmentCache
+from geocache import CachedGeocoder, GeoCache, RateLimiter
+from model_registry import registry
+from newsapi_fetcher import NewsApiFetcher
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    news, es = stub_newsapi.serve(0), stub_elasticsearch.serve(0)
+    models = {"classifier": bench_ingestion.CountingModel(bench_ingestion.FakeClassifier()),
+              "ner": bench_ingestion.CountingModel(bench_ingestion.FakeNer()),
+              "sentiment": bench_ingestion.CountingModel(bench_ingestion.FakeSentiment())}
+    for name, model in models.items():
+        registry.set(name, model)
+    cache = EnrichmentCache(str(tmp_path / "enrichment.sqlite"))
+    geocoder = CachedGeocoder(GeoCache(str(tmp_path / "geo.sqlite")), RateLimiter(0),
+                              geolocator=bench_ingestion.StubGeolocator())
+    monkeypatch.setattr(fetch_and_index, "get_fetcher", lambda: NewsApiFetcher(
+        "stub", base_url=f"http://127.0.0.1:{news.server_port}/v2/everything", rate_per_sec=1000, burst=1000,
+        page_size=10))
+    monkeypatch.setattr(fetch_and_index, "get_es", lambda: Elasticsearch(f"http://127.0.0.1:{es.server_port}"))
+    monkeypatch.setattr(fetch_and_index, "get_enrichment_cache", lambda: cache)
+    monkeypatch.setattr(fetch_and_index, "get_geocoder", lambda: geocoder)
+    monkeypatch.setattr(fetch_and_index, "get_store", lambda: fetch_and_index.ParquetStore(str(tmp_path / "ds")))
+    monkeypatch.setattr(fetch_and_index, "open_dedup_index", lambda: UrlDedupIndex(str(tmp_path / "urls")))
+    yield models, cache
+    news.shutdown()
+    es.shutdown()
+
+
+def test_streaming_run_indexes_pages_and_reuses_the_enrichment_cache(pipeline, tmp_path, monkeypatch):
+    models, cache = pipeline
+    first = fetch_and_index.run_streaming(limit=25)
+    n = first["fetched"]
+    assert n > 0
+    assert first["stages"]["index"]["items_out"] == n
+    assert first["fetch_to_index_latency"]["count"] == n
+    ner_items = models["ner"].items
+    assert ner_items == n
+    assert cache.stats()["misses"] == n
+
+    # same content under a fresh dedup index: every record is a cache hit, no inference runs
+    monkeypatch.setattr(fetch_and_index, "open_dedup_index", lambda: UrlDedupIndex(str(tmp_path / "urls2")))
+    second = fetch_and_index.run_streaming(limit=25)
+    assert second["stages"]["index"]["items_out"] == n
+    assert models["ner"].items == ner_items
+    assert cache.stats()["hits"] == n